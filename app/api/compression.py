@@ -0,0 +1,46 @@
+from typing import Any
+
+import brotli_asgi
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Where the server's own `send` is kept in the scope, for responses that bypass compression
+SEND_KEY = "compression.send"
+
+
+class BrotliMiddleware(brotli_asgi.BrotliMiddleware):
+    """
+    Compresses responses with brotli (or gzip), except for the ones that are already encoded
+
+    Neither brotli-asgi 1.2 nor the starlette gzip fallback check the response's Content-Encoding, so the cached lists
+    (which come pre-compressed) would be compressed a second time.
+    """
+
+    def __init__(self, app: ASGIApp, **kwargs: Any):
+        super().__init__(self.skip_encoded, **kwargs)
+        self.inner = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.inner(scope, receive, send)
+        await super().__call__({**scope, SEND_KEY: send}, receive, send)
+
+    async def skip_encoded(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Function to run the app, sending responses that are already encoded straight to the server
+
+        :param scope: The request scope
+        :param receive: The receive channel
+        :param send: The compressing send channel
+        :return: Nothing
+        """
+        server_send: Send = scope[SEND_KEY]
+        encoded = False
+
+        async def send_unless_encoded(message: Message) -> None:
+            nonlocal encoded
+            if message["type"] == "http.response.start":
+                encoded = "content-encoding" in Headers(raw=message["headers"])
+            await (server_send if encoded else send)(message)
+
+        await self.inner(scope, receive, send_unless_encoded)
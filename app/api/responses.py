@@ -0,0 +1,205 @@
+import json
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from starlette import status
+
+from app import cache, utils
+from app.core.config import settings
+
+# In order of preference
+ENCODINGS = ("br", "gzip")
+
+
+def pick_encoding(accept_encoding: str) -> str | None:
+    """
+    Function to pick which of our pre-compressed variants a client can take
+
+    :param accept_encoding: The Accept-Encoding header
+    :return: The content encoding to use, or None for plain JSON
+    """
+    accepted: set[str] = set()
+    rejected: set[str] = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        try:
+            quality = float(params.strip()[2:]) if params.strip().startswith("q=") else 1.0
+        except ValueError:
+            quality = 1.0
+        (accepted if quality > 0 else rejected).add(coding.strip())
+
+    for encoding in ENCODINGS:
+        # An encoding turned down by name isn't brought back by "*"
+        if encoding in accepted or ("*" in accepted and encoding not in rejected):
+            return encoding
+    return None
+
+
+def wants_ndjson(request: Request) -> bool:
+    """
+    Function to check if a client asked for newline delimited JSON instead of a JSON list
+
+    :param request: The incoming request
+    :return: Whether it did
+    """
+    return "application/x-ndjson" in request.headers.get("accept", "")
+
+
+def ndjson(batches: AsyncIterator[list[bytes]] | AsyncIterator[list[str]]) -> StreamingResponse:
+    """
+    Function to stream JSON encoded items as newline delimited JSON, as they're read
+
+    :param batches: The items, a batch at a time
+    :return: The response
+    """
+
+    async def lines() -> AsyncIterator[bytes]:
+        async for batch in batches:
+            yield b"".join((item.encode() if isinstance(item, str) else item) + b"\n" for item in batch)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def cached_list(request: Request, name: str, refresh: Callable[[], Awaitable[Any]]) -> Response:
+    """
+    Function to respond with one of the cached list payloads, already compressed if the client supports it
+
+    The cron stores exactly what the response model would serialize to, so there's no validation or encoding to do.
+    Clients that accept application/x-ndjson get the items streamed one per line instead.
+
+    :param request: The incoming request
+    :param name: The name of the list
+    :param refresh: Coroutine function that scrapes the list and stores it
+    :return: The response
+    """
+    if wants_ndjson(request):
+        await cache.ensure_list_items(name, refresh)
+        return ndjson(cache.iter_list_items(name, settings.EXPORT_BATCH_SIZE))
+
+    data, encoding = await cache.get_list(name, refresh, pick_encoding(request.headers.get("accept-encoding", "")))
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(data, media_type="application/json", headers=headers)
+
+
+def filtering(request: Request, *params: str) -> bool:
+    """
+    Function to check if a request asked for a filtered page of a list, rather than the full cached one
+
+    Anything else in the query string (like a cache buster) still gets the full list.
+
+    :param request: The incoming request
+    :param params: The names of the filtering and paging parameters the endpoint takes, as they appear in the URL
+    :return: Whether any of them was given
+    """
+    return any(param in request.query_params for param in params)
+
+
+def timestamp(value: datetime | None) -> float | None:
+    """
+    Function to get the score to filter a list by from a datetime parameter
+
+    :param value: The parameter, taken to be in UTC if it has no timezone
+    :return: The timestamp, None if the parameter wasn't given
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+async def list_page(
+    name: str,
+    refresh: Callable[[], Awaitable[Any]],
+    facets: list[str],
+    low: float | None = None,
+    high: float | None = None,
+    limit: int = 50,
+    cursor: str | None = None,
+    reverse: bool = False,
+) -> Response:
+    """
+    Function to respond with a filtered page of one of the cached lists, see `cache.query_list`
+
+    The body is a list just like the full one, the cursor for the next page (if any) is in the X-Next-Cursor header.
+
+    :param name: The name of the list
+    :param refresh: Coroutine function that scrapes the list and stores it
+    :param facets: The facets the items must all have
+    :param low: The lowest score, if any
+    :param high: The highest score, if any
+    :param limit: The most items to return
+    :param cursor: The cursor from the previous page, if any
+    :param reverse: Whether to go from the highest score to the lowest
+    :return: The response
+    """
+    try:
+        after = cache.parse_cursor(cursor) if cursor is not None else None
+    except ValueError:
+        raise HTTPException(detail="Invalid cursor", status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    items, next_cursor = await cache.query_list(name, refresh, facets, low, high, limit, after, reverse)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor is not None else None
+    return Response(b"[" + b",".join(items) + b"]", media_type="application/json", headers=headers)
+
+
+def check_id(id: str) -> None:
+    """
+    Function to reject entity IDs that could be confused with the cache ID of a partial entity, see `entity`
+
+    :param id: The entity's ID
+    :return: Nothing
+    """
+    if ":" in id:
+        raise HTTPException(detail=f"Invalid ID `{id}`", status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+async def entity(
+    kind: str,
+    id: str,
+    model: type[BaseModel],
+    load: Callable[[frozenset[str]], Awaitable[Any]],
+    ttl: Callable[[Any], int],
+    fields: str | None = None,
+    skipped: Callable[[dict[str, Any]], frozenset[str]] | None = None,
+) -> Any:
+    """
+    Function to respond with one of the cached entities, with only some of its fields if asked to
+
+    Sections of the page that none of the fields need aren't scraped. Such a partial entity is cached separately (as
+    "<id>:<skipped sections>", so IDs can't have a ":"), and only if the full one isn't cached already.
+
+    :param kind: The kind of entity (match, event, team, player)
+    :param id: The entity's ID
+    :param model: The entity's response model, to check the fields against
+    :param load: Coroutine function that scrapes the entity, given the sections to skip
+    :param ttl: Function that decides the TTL based on the scraped entity
+    :param fields: The `fields` parameter, see `utils.parse_fields`
+    :param skipped: Function that decides which sections can be skipped for a tree of fields
+    :return: The entity, or a response with the pruned entity
+    """
+    check_id(id)
+    if fields is None:
+        return await cache.read_through(kind, id, lambda: load(frozenset()), ttl)
+
+    if not (tree := utils.parse_fields(fields)):
+        raise HTTPException(detail="No fields given", status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    try:
+        utils.check_fields(model, tree)
+    except ValueError as e:
+        raise HTTPException(detail=f"Unknown field `{e}`", status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    if not (skip := skipped(tree) if skipped is not None else frozenset()):
+        data = await cache.read_through(kind, id, lambda: load(skip), ttl)
+    else:
+        try:
+            data = json.loads(await cache.get_entity(kind, id))
+        except cache.CacheMiss:
+            data = await cache.read_through(kind, f"{id}:{','.join(sorted(skip))}", lambda: load(skip), ttl)
+    # Validated the way the response model would be, pruned entities don't fit it anymore
+    return Response(utils.to_json(utils.prune(model.validate(data).dict(), tree)), media_type="application/json")
@@ -1,10 +1,12 @@
 from fastapi import APIRouter
 
 from app.api.v1.endpoints.events import router as events_router
+from app.api.v1.endpoints.export import router as export_router
 from app.api.v1.endpoints.matches import router as matches_router
 from app.api.v1.endpoints.news import router as news_router
 from app.api.v1.endpoints.player import router as player_router
 from app.api.v1.endpoints.rankings import router as rankings_router
+from app.api.v1.endpoints.stats import router as stats_router
 from app.api.v1.endpoints.team import router as team_router
 
 router = APIRouter()
@@ -15,3 +17,5 @@ router.include_router(news_router, prefix="/news", tags=["News"])
 router.include_router(team_router, prefix="/team", tags=["Team"])
 router.include_router(player_router, prefix="/player", tags=["Player"])
 router.include_router(rankings_router, prefix="/rankings", tags=["Rankings"])
+router.include_router(stats_router, prefix="/stats", tags=["Stats"])
+router.include_router(export_router, prefix="/export", tags=["Export"])
@@ -1,22 +1,29 @@
-import json
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, Request
 
-from app import cache, schemas
+from app import cache, cron, schemas
+from app.api import responses
 from app.services import events
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[schemas.Event])
-async def list_events() -> Any:
-    try:
-        return [schemas.Event.parse_obj(event) for event in json.loads(await cache.get("events"))]
-    except cache.CacheMiss:
-        return await events.get_events()
+async def list_events(
+    request: Request,
+    event_status: str | None = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
+) -> Any:
+    if not responses.filtering(request, "status", "limit", "cursor"):
+        return await responses.cached_list(request, "events", lambda: cron.events_cron({}))
+
+    facets = [cache.facet("status", event_status)] if event_status is not None else []
+    return await responses.list_page("events", lambda: cron.events_cron({}), facets, limit=limit, cursor=cursor)
 
 
 @router.get("/{id}", response_model=schemas.EventWithDetails)
 async def event_by_id(id: str) -> Any:
-    return await events.get_event_by_id(id)
+    responses.check_id(id)
+    return await cache.read_through("event", id, lambda: events.get_event_by_id(id), cache.event_ttl)
@@ -0,0 +1,51 @@
+from enum import Enum
+from typing import Any, AsyncIterator
+
+from fastapi import APIRouter
+
+from app import cache, cron, metrics, store, utils
+from app.api import responses
+from app.core.config import settings
+
+router = APIRouter()
+
+
+class Dataset(str, Enum):
+    MATCHES = "matches"
+    EVENTS = "events"
+    NEWS = "news"
+    RANKINGS = "rankings"
+    RESULTS = "results"
+    MATCH_DETAILS = "match-details"
+    EVENT_DETAILS = "event-details"
+    TEAM_DETAILS = "team-details"
+    PLAYER_DETAILS = "player-details"
+
+
+LISTS = {
+    Dataset.MATCHES: cron.matches_cron,
+    Dataset.EVENTS: cron.events_cron,
+    Dataset.NEWS: cron.news_cron,
+    Dataset.RANKINGS: cron.rankings_cron,
+}
+
+
+async def entities(kind: str) -> AsyncIterator[list[str]]:
+    """
+    Function to read every cached entity of a kind as JSON lines, as entities don't have their ID in them
+    :param kind: The kind of entity
+    :return: Batches of lines
+    """
+    async for batch in cache.iter_entities(kind, settings.EXPORT_BATCH_SIZE):
+        yield [f'{{"id":{utils.to_json(id)},"data":{data.decode()}}}' for id, data in batch]
+
+
+@router.get("/{dataset}")
+async def export(dataset: Dataset) -> Any:
+    metrics.incr(f"export.{dataset.value}")
+    if (refresh := LISTS.get(dataset)) is not None:
+        await cache.ensure_list_items(dataset.value, lambda: refresh({}))
+        return responses.ndjson(cache.iter_list_items(dataset.value, settings.EXPORT_BATCH_SIZE))
+    if dataset == Dataset.RESULTS:
+        return responses.ndjson(store.iter_results(settings.EXPORT_BATCH_SIZE))
+    return responses.ndjson(entities(dataset.value.removesuffix("-details")))
@@ -1,22 +1,116 @@
-import json
+import logging
+from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette import status
 
-from app import cache, schemas
+from app import cache, cron, live, schemas, store, upstream, utils
+from app.api import responses
+from app.constants import MatchStatus
+from app.core.config import settings
 from app.services import matches
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[schemas.Match])
-async def get_matches() -> Any:
-    try:
-        return [schemas.Match.parse_obj(match) for match in json.loads(await cache.get("matches"))]
-    except cache.CacheMiss:
-        return await matches.match_list()
+async def get_matches(
+    request: Request,
+    match_status: MatchStatus | None = Query(None, alias="status"),
+    team: str | None = None,
+    event: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
+) -> Any:
+    if not responses.filtering(request, "status", "team", "event", "since", "until", "limit", "cursor"):
+        return await responses.cached_list(request, "matches", lambda: cron.matches_cron({}))
+
+    facets = []
+    if match_status is not None:
+        facets.append(cache.facet("status", match_status))
+    if team is not None:
+        facets.append(cache.facet("team", team))
+    if event is not None:
+        facets.append(cache.facet("event", event))
+    return await responses.list_page(
+        "matches",
+        lambda: cron.matches_cron({}),
+        facets,
+        responses.timestamp(since),
+        responses.timestamp(until),
+        limit,
+        cursor,
+    )
+
+
+@router.get("/results", response_model=schemas.MatchResults)
+async def get_results(limit: int = Query(50, ge=1, le=100), cursor: str | None = None) -> Any:
+    results, next_cursor = await store.get_results(limit, cursor)
+    # Results are stored as JSON already
+    content = f'{{"results":[{",".join(results)}],"next":{utils.to_json(next_cursor)}}}'
+    return Response(content=content, media_type="application/json")
+
+
+@router.get("/batch", response_model=schemas.MatchBatch)
+async def get_matches_batch(ids: str = Query(..., description="Comma separated match IDs")) -> Any:
+    wanted = list(dict.fromkeys(id.strip() for id in ids.split(",") if id.strip()))
+    if not wanted or len(wanted) > settings.MATCH_BATCH_MAX_IDS:
+        raise HTTPException(
+            detail=f"Between 1 and {settings.MATCH_BATCH_MAX_IDS} match IDs are needed",
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    for id in wanted:
+        responses.check_id(id)
+
+    found = await cache.read_through_many(
+        "match", wanted, matches.match_by_id, cache.match_ttl, settings.MATCH_BATCH_CONCURRENCY
+    )
+    results, errors = [], []
+    for id, data in found.items():
+        if isinstance(data, bytes):
+            results.append(f"{utils.to_json(id)}:{data.decode()}")
+            continue
+        match data:
+            case HTTPException():
+                error = {"status": data.status_code, "detail": data.detail}
+            case upstream.Unavailable():
+                error = {
+                    "status": status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "detail": "VLR is unavailable, please retry later",
+                }
+            case _:
+                logging.error(f"Failed to get match `{id}`", exc_info=data)
+                error = {"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "detail": "Failed to get the match"}
+        errors.append(f"{utils.to_json(id)}:{utils.to_json(error)}")
+    # Cached matches are stored as JSON already
+    content = f'{{"results":{{{",".join(results)}}},"errors":{{{",".join(errors)}}}}}'
+    return Response(content=content, media_type="application/json")
 
 
 @router.get("/{id}", response_model=schemas.MatchWithDetails)
-async def get_match_by_id(id: str) -> Any:
-    return await matches.match_by_id(id)
+async def get_match_by_id(
+    id: str, fields: str | None = Query(None, description="Comma separated fields to return, like teams,data.map")
+) -> Any:
+    return await responses.entity(
+        "match",
+        id,
+        schemas.MatchWithDetails,
+        lambda skip: matches.match_by_id(id, skip),
+        cache.match_ttl,
+        fields,
+        matches.skipped_sections,
+    )
+
+
+@router.get("/{id}/live")
+async def get_match_live(id: str) -> StreamingResponse:
+    # Server-sent events: a `snapshot` of the match, then a `diff` whenever it changes, and an `end` once it's over
+    return StreamingResponse(
+        live.stream(id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
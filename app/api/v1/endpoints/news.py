@@ -1,17 +1,33 @@
-import json
+from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, Request
 
-from app import cache, schemas
-from app.services import news
+from app import cron, schemas
+from app.api import responses
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[schemas.NewsItem])
-async def get_news() -> Any:
-    try:
-        return [schemas.NewsItem.parse_obj(news) for news in json.loads(await cache.get("news"))]
-    except cache.CacheMiss:
-        return await news.news_list()
+async def get_news(
+    request: Request,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
+) -> Any:
+    if not responses.filtering(request, "since", "until", "limit", "cursor"):
+        return await responses.cached_list(request, "news", lambda: cron.news_cron({}))
+
+    # Newest first
+    return await responses.list_page(
+        "news",
+        lambda: cron.news_cron({}),
+        [],
+        responses.timestamp(since),
+        responses.timestamp(until),
+        limit,
+        cursor,
+        reverse=True,
+    )
@@ -1,13 +1,19 @@
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 
-from app import schemas
+from app import cache, schemas
+from app.api import responses
 from app.services import player
 
 router = APIRouter()
 
 
 @router.get("/{player_id}", response_model=schemas.Player)
-async def get_player_by_id(player_id: str) -> Any:
-    return await player.get_player_data(player_id)
+async def get_player_by_id(
+    player_id: str,
+    fields: str | None = Query(None, description="Comma separated fields to return, like alias,current_team"),
+) -> Any:
+    return await responses.entity(
+        "player", player_id, schemas.Player, lambda _: player.get_player_data(player_id), cache.player_ttl, fields
+    )
@@ -2,23 +2,20 @@ import json
 from typing import Any
 
 import semver
-from fastapi import APIRouter, Header
+from fastapi import APIRouter, Header, Request
 
-from app import cache, schemas
-from app.services import rankings
+from app import cache, cron, schemas
+from app.api import responses
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[schemas.Ranking])
-async def get_rankings(app_version: str | None = Header(None)) -> Any:
-    try:
-        response = [schemas.Ranking.parse_obj(ranking) for ranking in json.loads(await cache.get("rankings"))]
-    except cache.CacheMiss:
-        response = await rankings.ranking_list()
-
+async def get_rankings(request: Request, app_version: str | None = Header(None)) -> Any:
     # TODO: revert after a month or so
     if app_version and semver.compare("0.2.12", app_version[1:]) > -1:
+        data, _ = await cache.get_list("rankings", lambda: cron.rankings_cron({}))
+        response = [schemas.Ranking.parse_obj(ranking) for ranking in json.loads(data)]
         ranking_replace = {
             "Asia-Pacific": "Asia Pacific",
             "Latin America South": "Latin America - South",
@@ -28,4 +25,6 @@ async def get_rankings(app_version: str | None = Header(None)) -> Any:
             if region := ranking_replace.get(ranking.region):
                 ranking.region = region
 
-    return response
+        return response
+
+    return await responses.cached_list(request, "rankings", lambda: cron.rankings_cron({}))
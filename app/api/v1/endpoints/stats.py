@@ -0,0 +1,12 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from app import metrics, schemas
+
+router = APIRouter()
+
+
+@router.get("/", response_model=schemas.Metrics)
+async def get_stats() -> Any:
+    return metrics.snapshot()
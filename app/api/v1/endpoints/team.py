@@ -1,13 +1,24 @@
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 
-from app import schemas
+from app import cache, schemas
+from app.api import responses
 from app.services import team
 
 router = APIRouter()
 
 
 @router.get("/{team_id}", response_model=schemas.Team)
-async def get_team_by_id(team_id: str) -> Any:
-    return await team.get_team_data(team_id)
+async def get_team_by_id(
+    team_id: str, fields: str | None = Query(None, description="Comma separated fields to return, like name,roster")
+) -> Any:
+    return await responses.entity(
+        "team",
+        team_id,
+        schemas.Team,
+        lambda skip: team.get_team_data(team_id, skip),
+        cache.team_ttl,
+        fields,
+        team.skipped_sections,
+    )
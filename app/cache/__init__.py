@@ -1 +1,5 @@
 from .cache import *
+from .entity import *
+from .lists import *
+from .local import *
+from .singleflight import *
@@ -4,17 +4,59 @@ from app.core.config import settings
 
 from .exceptions import CacheMiss
 
+_pool: redis.BlockingConnectionPool | None = None
+
+
+def create_pool() -> redis.BlockingConnectionPool:
+    """
+    Function to build the connection pool shared by every redis client in this process
+
+    :return: The connection pool
+    """
+    return redis.BlockingConnectionPool(
+        host=settings.REDIS_HOST,
+        password=settings.REDIS_PASSWORD,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+    )
+
+
+async def start() -> None:
+    """
+    Function to create the process-wide connection pool, should be called once on startup
+
+    :return: Nothing
+    """
+    global _pool
+    if _pool is None:
+        _pool = create_pool()
+
+
+async def stop() -> None:
+    """
+    Function to close all the pooled connections
+
+    :return: Nothing
+    """
+    global _pool
+    if _pool is not None:
+        await _pool.disconnect()
+        _pool = None
+
 
 def get_client() -> redis.Redis:
     """
-    Function to get a redis client
+    Function to get a redis client backed by the process-wide connection pool
 
     :return: The redis client object
     """
-    return redis.Redis(host=settings.REDIS_HOST, password=settings.REDIS_PASSWORD)
+    global _pool
+    if _pool is None:
+        _pool = create_pool()
+    return redis.Redis(connection_pool=_pool)
 
 
-async def get(key: str) -> str:
+async def get(key: str) -> bytes:
     """
     Function to get a value from the cache
 
@@ -26,6 +68,18 @@ async def get(key: str) -> str:
     raise CacheMiss(f"`{key}` not found")
 
 
+async def mget(keys: list[str]) -> list[bytes | None]:
+    """
+    Function to get multiple values from the cache in a single round trip
+
+    :param keys: The keys to retrieve
+    :return: The values from redis, in the same order as the keys, with None for missing keys
+    """
+    if not keys:
+        return []
+    return await get_client().mget(keys)
+
+
 async def set(key: str, value: str, ttl: int = 60) -> None:
     """
     Function to set a value in the cache
@@ -36,3 +90,47 @@ async def set(key: str, value: str, ttl: int = 60) -> None:
     :return: Nothing
     """
     await get_client().set(key, value, ttl)
+
+
+async def mset(mapping: dict[str, str | bytes | int], ttls: int | dict[str, int] | None = None) -> None:
+    """
+    Function to set multiple values in the cache in a single round trip
+
+    :param mapping: Mapping of key to value
+    :param ttls: The number of seconds before the items should expire, either the same for all of them or per key (keys
+    left out never expire), None for none of them to expire
+    :return: Nothing
+    """
+    if not mapping:
+        return
+    async with get_client().pipeline(transaction=False) as pipe:
+        for key, value in mapping.items():
+            pipe.set(key, value, ex=ttls.get(key) if isinstance(ttls, dict) else ttls)
+        await pipe.execute()
+
+
+async def delete_prefix(prefix: str) -> int:
+    """
+    Function to delete every key starting with a prefix, without blocking redis on a KEYS call
+
+    Every worker drops its local copies of the keys too.
+
+    :param prefix: The prefix to match
+    :return: The number of keys deleted
+    """
+    # Imported here, the local cache is built on top of this module
+    from .local import invalidate
+
+    client = get_client()
+    pattern = "".join(f"\\{char}" if char in "*?[]\\" else char for char in prefix) + "*"
+    deleted = 0
+    batch: list[bytes] = []
+    async for key in client.scan_iter(match=pattern, count=settings.REDIS_SCAN_BATCH_SIZE):
+        batch.append(key)
+        if len(batch) >= settings.REDIS_SCAN_BATCH_SIZE:
+            deleted += await client.unlink(*batch)
+            batch = []
+    if batch:
+        deleted += await client.unlink(*batch)
+    await invalidate(f"{prefix}*")
+    return deleted
@@ -0,0 +1,322 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+import pydantic.json
+from redis.exceptions import RedisError
+
+from app import metrics
+from app.constants import EventStatus, MatchStatus
+from app.core.config import settings
+
+from .cache import get_client, mget
+from .exceptions import CacheMiss
+from .local import invalidate, local_cache
+from .singleflight import single_flight
+
+ENTITY_KEY = "entity:{}:{}"
+# Set for as long as the entity is fresh, the entity itself is kept a while longer in case VLR can't be scraped
+ENTITY_FRESH_KEY = "entity:{}:{}:fresh"
+# Bookkeeping for each kind's memory budget, kept apart from the entities so that no ID can clash with it
+ENTITY_INDEX_KEY = "entity-meta:{}:index"
+ENTITY_SIZES_KEY = "entity-meta:{}:sizes"
+
+# Stores an entity while keeping every kind under its memory budget. The index sorted set scores each key by its
+# expiry, and the sizes hash tracks each key's size plus a running total, so that we can forget expired entries and
+# evict the ones closest to expiring until the new one fits.
+SET_ENTITY_SCRIPT = """
+local key, index, sizes, fresh = KEYS[1], KEYS[2], KEYS[3], KEYS[4]
+local value, ttl, grace = ARGV[1], tonumber(ARGV[2]), tonumber(ARGV[3])
+local now, budget = tonumber(ARGV[4]), tonumber(ARGV[5])
+
+local function forget(member)
+    local size = tonumber(redis.call('HGET', sizes, member) or '0')
+    redis.call('HDEL', sizes, member)
+    redis.call('HINCRBY', sizes, '__total__', -size)
+    redis.call('ZREM', index, member)
+    return size
+end
+
+for _, member in ipairs(redis.call('ZRANGEBYSCORE', index, '-inf', now)) do
+    forget(member)
+end
+forget(key)
+
+local size = string.len(value)
+if size > budget then
+    redis.call('UNLINK', key, fresh)
+    return 0
+end
+
+local total = tonumber(redis.call('HGET', sizes, '__total__') or '0')
+while total + size > budget do
+    local victim = redis.call('ZRANGE', index, 0, 0)[1]
+    if not victim then
+        break
+    end
+    total = total - forget(victim)
+    redis.call('UNLINK', victim, victim .. ':fresh')
+end
+
+redis.call('SET', key, value, 'EX', ttl + grace)
+redis.call('SET', fresh, 1, 'EX', ttl)
+redis.call('ZADD', index, now + ttl + grace, key)
+redis.call('HSET', sizes, key, size)
+redis.call('HINCRBY', sizes, '__total__', size)
+return 1
+"""
+
+
+def match_ttl(match: Any) -> int:
+    """
+    Function to decide how long a match should be cached, based on its status
+
+    :param match: The parsed match
+    :return: The TTL in seconds
+    """
+    match match.event.status:
+        case "final" | MatchStatus.COMPLETED:
+            return settings.MATCH_COMPLETED_TTL
+        case MatchStatus.LIVE | MatchStatus.ONGOING:
+            return settings.MATCH_LIVE_TTL
+        case _:
+            return settings.MATCH_UPCOMING_TTL
+
+
+def event_ttl(event: Any) -> int:
+    """
+    Function to decide how long an event should be cached, based on its status
+
+    :param event: The parsed event
+    :return: The TTL in seconds
+    """
+    if event.status == EventStatus.COMPLETED:
+        return settings.EVENT_COMPLETED_TTL
+    return settings.EVENT_TTL
+
+
+def team_ttl(_: Any) -> int:
+    """
+    Function to decide how long a team should be cached
+
+    :param _: The parsed team
+    :return: The TTL in seconds
+    """
+    return settings.TEAM_TTL
+
+
+def player_ttl(_: Any) -> int:
+    """
+    Function to decide how long a player should be cached
+
+    :param _: The parsed player
+    :return: The TTL in seconds
+    """
+    return settings.PLAYER_TTL
+
+
+async def get_entity(kind: str, id: str, stale: bool = False) -> bytes:
+    """
+    Function to get a cached entity
+
+    :param kind: The kind of entity (match, event, team, player)
+    :param id: The entity's ID
+    :param stale: Whether an entity past its TTL (but still within the stale grace) will do
+    :return: The JSON encoded entity
+    """
+    key = ENTITY_KEY.format(kind, id)
+    if (data := local_cache.get(key)) is not None:
+        if not stale:
+            metrics.incr(f"cache.entity.{kind}.hit")
+            metrics.incr(f"cache.local.entity.{kind}.hit")
+        return data
+    try:
+        data, fresh = await get_client().mget(key, ENTITY_FRESH_KEY.format(kind, id))
+    except RedisError:
+        if (data := local_cache.get(key, stale=True)) is None:
+            raise
+        logging.warning(f"Failed to read {kind} `{id}`, serving the local copy", exc_info=True)
+        metrics.incr(f"cache.local.entity.{kind}.fallback")
+        return data
+    if data and fresh:
+        local_cache.set(key, data, len(data))
+    if data and (fresh or stale):
+        if not stale:
+            metrics.incr(f"cache.entity.{kind}.hit")
+        return data
+    if not stale:
+        metrics.incr(f"cache.entity.{kind}.miss")
+    raise CacheMiss(f"{kind} `{id}` not found")
+
+
+async def set_entity(kind: str, id: str, value: str, ttl: int) -> bool:
+    """
+    Function to cache an entity, evicting others of the same kind if it would go over that kind's memory budget
+
+    :param kind: The kind of entity (match, event, team, player)
+    :param id: The entity's ID
+    :param value: The JSON encoded entity
+    :param ttl: The number of seconds before the entity should expire
+    :return: Whether the entity was stored, it won't be if it's bigger than the whole budget
+    """
+    stored = await get_client().eval(
+        SET_ENTITY_SCRIPT,
+        4,
+        ENTITY_KEY.format(kind, id),
+        ENTITY_INDEX_KEY.format(kind),
+        ENTITY_SIZES_KEY.format(kind),
+        ENTITY_FRESH_KEY.format(kind, id),
+        value,
+        ttl,
+        settings.ENTITY_STALE_GRACE,
+        time.time(),
+        settings.ENTITY_CACHE_BUDGETS.get(kind, settings.ENTITY_CACHE_DEFAULT_BUDGET),
+    )
+    if not stored:
+        metrics.incr(f"cache.entity.{kind}.over_budget")
+    await invalidate(ENTITY_KEY.format(kind, id))
+    return bool(stored)
+
+
+async def read_through(kind: str, id: str, load: Callable[[], Awaitable[Any]], ttl: Callable[[Any], int]) -> Any:
+    """
+    Function to get an entity from the cache, or load it from VLR and cache it on a miss
+
+    Concurrent misses for the same entity (in this process or others) share a single load. If the load fails, the
+    entity is served stale if it's still within its grace period.
+
+    :param kind: The kind of entity (match, event, team, player)
+    :param id: The entity's ID
+    :param load: Coroutine function that scrapes the entity
+    :param ttl: Function that decides the TTL based on the scraped entity
+    :return: The decoded cached entity on a hit, else whatever `load` returned
+    """
+    try:
+        return json.loads(await get_entity(kind, id))
+    except CacheMiss:
+        pass
+    return await load_through(kind, id, load, ttl)
+
+
+async def load_through(kind: str, id: str, load: Callable[[], Awaitable[Any]], ttl: Callable[[Any], int]) -> Any:
+    """
+    Function to load an entity that wasn't in the cache from VLR and cache it, see `read_through`
+
+    :param kind: The kind of entity (match, event, team, player)
+    :param id: The entity's ID
+    :param load: Coroutine function that scrapes the entity
+    :param ttl: Function that decides the TTL based on the scraped entity
+    :return: Whatever `load` returned, or the decoded stale entity if it failed
+    """
+    key = ENTITY_KEY.format(kind, id)
+
+    async def load_and_cache() -> Any:
+        try:
+            data = await load()
+        except Exception:
+            try:
+                stale = await get_entity(kind, id, stale=True)
+            except CacheMiss:
+                stale = None
+            if stale is None:
+                raise
+            logging.warning(f"Failed to load {kind} `{id}`, serving it stale", exc_info=True)
+            metrics.incr(f"cache.entity.{kind}.stale")
+            return json.loads(stale)
+        try:
+            await set_entity(kind, id, json.dumps(data, default=pydantic.json.pydantic_encoder), ttl(data))
+        except Exception:
+            # Failing to cache shouldn't fail the request, we already have the data
+            logging.exception(f"Failed to cache {kind} `{id}`")
+        return data
+
+    async def read() -> Any:
+        data, fresh = await get_client().mget(key, ENTITY_FRESH_KEY.format(kind, id))
+        if data and fresh:
+            return json.loads(data)
+        raise CacheMiss(f"{kind} `{id}` not found")
+
+    return await single_flight(key, load_and_cache, read)
+
+
+async def get_entities(kind: str, ids: list[str], count: bool = True) -> dict[str, bytes]:
+    """
+    Function to get the cached entities out of a list of IDs, in a single round trip
+
+    :param kind: The kind of entity (match, event, team, player)
+    :param ids: The entities' IDs
+    :param count: Whether to count the lookups as cache hits and misses, not for lookups that serve no client
+    :return: Mapping of ID to JSON encoded entity, for the ones that were cached and fresh
+    """
+    keys = [key.format(kind, id) for id in ids for key in (ENTITY_KEY, ENTITY_FRESH_KEY)]
+    values = await mget(keys)
+    found = {id: data for id, data, fresh in zip(ids, values[::2], values[1::2]) if data and fresh}
+    if count:
+        metrics.incr(f"cache.entity.{kind}.hit", len(found))
+        metrics.incr(f"cache.entity.{kind}.miss", len(ids) - len(found))
+    return found
+
+
+async def read_through_many(
+    kind: str,
+    ids: list[str],
+    load: Callable[[str], Awaitable[Any]],
+    ttl: Callable[[Any], int],
+    concurrency: int,
+) -> dict[str, bytes | Exception]:
+    """
+    Function to get several entities from the cache, loading the ones that aren't there like `read_through` does
+
+    :param kind: The kind of entity (match, event, team, player)
+    :param ids: The entities' IDs
+    :param load: Coroutine function that scrapes an entity given its ID
+    :param ttl: Function that decides the TTL based on a scraped entity
+    :param concurrency: How many entities may be loaded at once
+    :return: Mapping of ID to JSON encoded entity, or the exception raised while loading it
+    """
+    found: dict[str, bytes | Exception] = dict(await get_entities(kind, ids))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def load_one(id: str) -> None:
+        async with semaphore:
+            try:
+                data = await load_through(kind, id, lambda: load(id), ttl)
+            except Exception as e:
+                found[id] = e
+                return
+        found[id] = json.dumps(data, default=pydantic.json.pydantic_encoder).encode()
+
+    await asyncio.gather(*(load_one(id) for id in ids if id not in found))
+    return {id: found[id] for id in ids}
+
+
+async def iter_entities(kind: str, batch_size: int) -> AsyncIterator[list[tuple[str, bytes]]]:
+    """
+    Function to read every cached entity of a kind, fresh or stale, a batch at a time
+
+    Partial entities (see `api.responses.entity`) are left out.
+
+    :param kind: The kind of entity (match, event, team, player)
+    :param batch_size: How many entities to read at once
+    :return: Batches of IDs and JSON encoded entities, in no particular order
+    """
+    client = get_client()
+    prefix = ENTITY_KEY.format(kind, "")
+    keys: list[str] = []
+
+    async def read() -> list[tuple[str, bytes]]:
+        values = await mget(keys)
+        return [(key.removeprefix(prefix), data) for key, data in zip(keys, values) if data is not None]
+
+    async for key, _ in client.zscan_iter(ENTITY_INDEX_KEY.format(kind), count=batch_size):
+        if ":" in (key := key.decode()).removeprefix(prefix):
+            continue
+        keys.append(key)
+        if len(keys) == batch_size:
+            if entities := await read():
+                yield entities
+            keys.clear()
+    if keys and (entities := await read()):
+        yield entities
@@ -0,0 +1,506 @@
+import asyncio
+import gzip
+import hashlib
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, NamedTuple
+
+import brotli
+from redis.exceptions import RedisError
+
+from app import metrics
+from app.core.config import settings
+
+from .cache import get_client
+from .exceptions import CacheMiss
+from .local import invalidate, local_cache
+from .singleflight import single_flight
+
+LIST_KEY = "list:{}"
+# Lists made of items with IDs also keep each item, a fingerprint of it, and the order of the IDs
+ITEMS_KEY = "list:{}:items"
+FINGERPRINTS_KEY = "list:{}:fingerprints"
+INDEX_KEY = "list:{}:index"
+# They're also indexed for filtering, with a sorted set of every item, and one per facet (like "status:live") of the
+# items that have it, along with a set of which facets there are
+SORTED_KEY = "list:{}:sorted"
+FACET_KEY = "list:{}:facet:{}"
+FACETS_KEY = "list:{}:facets"
+
+# Only touch a list that's there, HSET would otherwise create one without any data. For lists made of items, the index
+# (the second key) has to be there too, and the rest of the keys are extended along with the payload.
+TOUCH_LIST_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 0 or (#KEYS > 1 and redis.call("EXISTS", KEYS[2]) == 0) then
+    return 0
+end
+redis.call("HSET", KEYS[1], "fresh_until", ARGV[1])
+for i = 1, #KEYS do
+    redis.call("EXPIRE", KEYS[i], ARGV[2])
+end
+return 1
+"""
+
+# Walks the smallest of the given sorted sets between two scores, keeping the items that are in all of them, until it
+# has one more than the limit (to know if there's a next page). Items come in score order then ID order, so the cursor
+# is the score and ID of the last item returned.
+QUERY_LIST_SCRIPT = """
+local driver, size = KEYS[1], redis.call('ZCARD', KEYS[1])
+for i = 2, #KEYS do
+    local n = redis.call('ZCARD', KEYS[i])
+    if n < size then
+        driver, size = KEYS[i], n
+    end
+end
+
+local low, high, after_score, after_id = ARGV[1], ARGV[2], ARGV[3], ARGV[4]
+local limit, reverse = tonumber(ARGV[5]), ARGV[6] == '1'
+local results, offset = {}, 0
+while #results < 2 * (limit + 1) do
+    local batch
+    if reverse then
+        batch = redis.call('ZREVRANGEBYSCORE', driver, high, low, 'WITHSCORES', 'LIMIT', offset, 100)
+    else
+        batch = redis.call('ZRANGEBYSCORE', driver, low, high, 'WITHSCORES', 'LIMIT', offset, 100)
+    end
+    if #batch == 0 then
+        break
+    end
+    offset = offset + #batch / 2
+
+    for i = 1, #batch, 2 do
+        local id, score = batch[i], batch[i + 1]
+        local wanted = true
+        if after_id ~= '' and tonumber(score) == tonumber(after_score) then
+            if reverse then
+                wanted = id < after_id
+            else
+                wanted = id > after_id
+            end
+        end
+        for k = 1, #KEYS do
+            if wanted and KEYS[k] ~= driver and not redis.call('ZSCORE', KEYS[k], id) then
+                wanted = false
+            end
+        end
+        if wanted then
+            table.insert(results, id)
+            table.insert(results, score)
+            if #results == 2 * (limit + 1) then
+                break
+            end
+        end
+    end
+end
+return results
+"""
+
+# Keep references to the background refreshes, the event loop only keeps weak ones
+_refreshes: set[asyncio.Task] = set()
+
+
+def compress(data: bytes) -> dict[str, bytes]:
+    """
+    Function to build the compressed variants of a payload
+
+    :param data: The payload
+    :return: Mapping of content encoding to compressed payload, empty if the payload is too small to bother
+    """
+    if len(data) < settings.COMPRESSION_MIN_SIZE:
+        return {}
+    return {
+        "br": brotli.compress(data, quality=settings.BROTLI_QUALITY),
+        "gzip": gzip.compress(data, compresslevel=settings.GZIP_LEVEL),
+    }
+
+
+async def set_list(name: str, data: str | bytes) -> None:
+    """
+    Function to store one of the list payloads and its compressed variants, along with when it should be refreshed
+
+    The payload is considered fresh for the list's soft TTL. After that it is still served while a refresh runs in the
+    background, until the hard TTL when redis drops it.
+
+    :param name: The name of the list
+    :param data: The JSON encoded list
+    :return: Nothing
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    variants = await asyncio.to_thread(compress, data)
+
+    key = LIST_KEY.format(name)
+    mapping: dict[str | bytes, bytes | float] = {
+        "data": data,
+        "fresh_until": time.time() + settings.LIST_SOFT_TTLS[name],
+    }
+    for encoding, variant in variants.items():
+        mapping[encoding] = variant
+    async with get_client().pipeline(transaction=True) as pipe:
+        # Clear out variants of the previous payload, in case this one is too small to have any
+        pipe.delete(key)
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, settings.LIST_HARD_TTLS[name])
+        await pipe.execute()
+    await invalidate(key)
+
+
+class ListItem(NamedTuple):
+    id: str
+    # The JSON encoded item
+    data: str
+    # Where the item sorts when filtering, like its time
+    score: float
+    # What it can be filtered by, like "status:live" or "team:sentinels"
+    facets: tuple[str, ...] = ()
+
+
+async def set_list_items(name: str, items: list[ListItem]) -> dict[str, int]:
+    """
+    Function to store a list payload made of items with IDs, only writing what changed since the last time
+
+    Each item is fingerprinted, and compared to what's stored to find the ones that were added, changed or removed.
+    Only those items are rewritten, along with the indexes used for filtering. If there are none and the order is the
+    same, the payload isn't rewritten either, it is only marked as fresh again.
+
+    :param name: The name of the list
+    :param items: Every item, in order
+    :return: How many items were added, changed and removed
+    """
+    client = get_client()
+    items_key, fingerprints_key, index_key, sorted_key, facets_key = (
+        key.format(name) for key in (ITEMS_KEY, FINGERPRINTS_KEY, INDEX_KEY, SORTED_KEY, FACETS_KEY)
+    )
+    # A match can briefly be on both the upcoming and the completed pages, so fingerprint every copy of an item
+    digests: dict[str, Any] = {}
+    for item in items:
+        digests.setdefault(item.id, hashlib.blake2b(digest_size=16)).update(item.data.encode())
+    fingerprints = {id: digest.hexdigest() for id, digest in digests.items()}
+    index = ",".join(item.id for item in items)
+
+    stored_fingerprints, stored_index, stored_facets = await asyncio.gather(
+        client.hgetall(fingerprints_key), client.get(index_key), client.smembers(facets_key)
+    )
+    stored_facet_keys = [FACET_KEY.format(name, facet.decode()) for facet in stored_facets]
+    stored = {id.decode(): fingerprint.decode() for id, fingerprint in stored_fingerprints.items()}
+    added = fingerprints.keys() - stored.keys()
+    changed = {id for id in fingerprints.keys() & stored.keys() if fingerprints[id] != stored[id]}
+    removed = stored.keys() - fingerprints.keys()
+    diff = {"added": len(added), "changed": len(changed), "removed": len(removed)}
+    for kind, count in diff.items():
+        metrics.incr(f"cache.list.{name}.{kind}", count)
+
+    # The index is written along with the other indexes, and unlike the sorted sets it's there even if the list is empty
+    unchanged = not (added or changed or removed) and stored_index == index.encode()
+    if unchanged and await touch_list(name, items=True):
+        metrics.incr(f"cache.list.{name}.unchanged")
+        return diff
+
+    # Lists are small, so the indexes are simply rebuilt from scratch
+    sorted_items: dict[str | bytes, float] = {}
+    facet_items: dict[str, dict[str | bytes, float]] = {}
+    for item in items:
+        sorted_items.setdefault(item.id, item.score)
+        for facet in item.facets:
+            facet_items.setdefault(facet, {}).setdefault(item.id, item.score)
+    facet_keys = [FACET_KEY.format(name, facet) for facet in facet_items]
+
+    # The payload goes first, if the rest fails the next run will see the same diff and try again
+    await set_list(name, "[" + ",".join(item.data for item in items) + "]")
+    async with client.pipeline(transaction=True) as pipe:
+        if removed:
+            pipe.hdel(items_key, *removed)
+            pipe.hdel(fingerprints_key, *removed)
+        if updated := added | changed:
+            pipe.hset(items_key, mapping={item.id: item.data for item in items if item.id in updated})
+            pipe.hset(fingerprints_key, mapping={id: fingerprints[id] for id in updated})
+        pipe.set(index_key, index)
+        pipe.delete(sorted_key, facets_key, *stored_facet_keys)
+        if sorted_items:
+            pipe.zadd(sorted_key, sorted_items)
+        for key, facet_members in zip(facet_keys, facet_items.values()):
+            pipe.zadd(key, facet_members)
+        if facet_items:
+            pipe.sadd(facets_key, *facet_items)
+        for key in (items_key, fingerprints_key, index_key, sorted_key, facets_key, *facet_keys):
+            pipe.expire(key, settings.LIST_HARD_TTLS[name])
+        await pipe.execute()
+    return diff
+
+
+async def ensure_list_items(name: str, refresh: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Function to make sure the items of a list made with `set_list_items` are cached, refreshing it like `get_list` does
+    if it's missing or stale
+
+    :param name: The name of the list
+    :param refresh: Coroutine function that scrapes the list and stores it with `set_list_items`
+    :return: Nothing
+    """
+    client = get_client()
+    # The index is there even if the list is empty
+    index_key = INDEX_KEY.format(name)
+
+    async def read() -> Any:
+        if not await client.exists(index_key):
+            raise CacheMiss(f"`{name}` index not found")
+
+    fresh_until, exists = await asyncio.gather(
+        client.hget(LIST_KEY.format(name), "fresh_until"), client.exists(index_key)
+    )
+    if fresh_until is None or not exists:
+        metrics.incr(f"cache.list.{name}.miss")
+        await single_flight(LIST_KEY.format(name), refresh, read)
+    elif float(fresh_until) < time.time():
+        metrics.incr(f"cache.list.{name}.stale")
+        refresh_in_background(name, refresh, read)
+    else:
+        metrics.incr(f"cache.list.{name}.hit")
+
+
+async def iter_list_items(name: str, batch_size: int) -> AsyncIterator[list[bytes]]:
+    """
+    Function to read the items of a list made with `set_list_items` in order, a batch at a time
+
+    :param name: The name of the list
+    :param batch_size: How many items to read at once
+    :return: Batches of JSON encoded items
+    """
+    client = get_client()
+    if not (index := await client.get(INDEX_KEY.format(name))):
+        return
+    ids = index.decode().split(",")
+    for start in range(0, len(ids), batch_size):
+        end = start + batch_size
+        # The list may be rebuilt while we go, in which case items that were removed are skipped
+        batch = await client.hmget(ITEMS_KEY.format(name), ids[start:end])
+        if items := [data for data in batch if data is not None]:
+            yield items
+
+
+def facet(name: str, value: str) -> str:
+    """
+    Function to name a facet items can be filtered by, the same way when indexing as when querying
+
+    :param name: What the facet is about, like "team"
+    :param value: The item's value for it
+    :return: The facet
+    """
+    return f"{name}:{value.strip().lower()}"
+
+
+def parse_cursor(cursor: str) -> tuple[float, str]:
+    """
+    Function to read a cursor returned by `query_list`
+
+    :param cursor: The cursor
+    :return: The score and ID of the item the page ended on, raises ValueError if the cursor isn't one of ours
+    """
+    score, _, id = cursor.partition(":")
+    return float(score), id
+
+
+async def count_list_items(
+    name: str, facet: str | None = None, low: float | None = None, high: float | None = None
+) -> int:
+    """
+    Function to count the items of a list made with `set_list_items`, without reading them
+
+    :param name: The name of the list
+    :param facet: Only count the items with this facet, see `facet`
+    :param low: Only count the items scored at least this
+    :param high: Only count the items scored at most this
+    :return: The number of items, 0 if the list isn't cached
+    """
+    key = FACET_KEY.format(name, facet) if facet is not None else SORTED_KEY.format(name)
+    return await get_client().zcount(key, "-inf" if low is None else low, "+inf" if high is None else high)
+
+
+async def query_list(
+    name: str,
+    refresh: Callable[[], Awaitable[Any]],
+    facets: list[str],
+    low: float | None = None,
+    high: float | None = None,
+    limit: int = 50,
+    after: tuple[float, str] | None = None,
+    reverse: bool = False,
+) -> tuple[list[bytes], str | None]:
+    """
+    Function to get a page of the items of a list made with `set_list_items`, filtered by facets and score
+
+    Only the indexes and the items on the page are read. The list is refreshed like `get_list` does if it's missing or
+    stale.
+
+    :param name: The name of the list
+    :param refresh: Coroutine function that scrapes the list and stores it with `set_list_items`
+    :param facets: The facets the items must all have
+    :param low: The lowest score, if any
+    :param high: The highest score, if any
+    :param limit: The most items to return
+    :param after: Where the previous page ended, see `parse_cursor`
+    :param reverse: Whether to go from the highest score to the lowest
+    :return: The JSON encoded items, and the cursor for the next page if there is one
+    """
+    client = get_client()
+    sorted_key = SORTED_KEY.format(name)
+    await ensure_list_items(name, refresh)
+
+    after_score: float | str = ""
+    after_id = ""
+    if after is not None:
+        after_score, after_id = after
+        # Resume from the last item's score, the ones before it on that score are skipped by ID
+        if reverse:
+            high = after_score if high is None else min(high, after_score)
+        else:
+            low = after_score if low is None else max(low, after_score)
+
+    found = await client.eval(
+        QUERY_LIST_SCRIPT,
+        1 + len(facets),
+        sorted_key,
+        *(FACET_KEY.format(name, facet) for facet in facets),
+        "-inf" if low is None else low,
+        "+inf" if high is None else high,
+        after_score,
+        after_id,
+        limit,
+        int(reverse),
+    )
+    ids, scores = found[::2], found[1::2]
+    next_cursor = None
+    if len(ids) > limit:
+        ids = ids[:limit]
+        next_cursor = f"{scores[limit - 1].decode()}:{ids[-1].decode()}"
+    if not ids:
+        return [], next_cursor
+    # The list may have been rebuilt in between, in which case the page is only missing what was removed
+    return [data for data in await client.hmget(ITEMS_KEY.format(name), ids) if data is not None], next_cursor
+
+
+async def touch_list(name: str, items: bool = False) -> bool:
+    """
+    Function to mark one of the list payloads as fresh again without rewriting it, for when it's known to be up to date
+
+    :param name: The name of the list
+    :param items: Whether the list is made with `set_list_items`, in which case its items and indexes are kept too
+    :return: Whether the list (and its items) was there to touch
+    """
+    client = get_client()
+    keys = [LIST_KEY.format(name)]
+    if items:
+        facets = await client.smembers(FACETS_KEY.format(name))
+        keys.extend(key.format(name) for key in (INDEX_KEY, ITEMS_KEY, FINGERPRINTS_KEY, SORTED_KEY, FACETS_KEY))
+        keys.extend(FACET_KEY.format(name, facet.decode()) for facet in facets)
+    touched = await client.eval(
+        TOUCH_LIST_SCRIPT,
+        len(keys),
+        *keys,
+        time.time() + settings.LIST_SOFT_TTLS[name],
+        settings.LIST_HARD_TTLS[name],
+    )
+    if touched:
+        # Copies in other workers have the old freshness
+        await invalidate(LIST_KEY.format(name))
+    return bool(touched)
+
+
+async def read_list(name: str, encoding: str | None = None) -> tuple[bytes, str | None, bool]:
+    """
+    Function to read one of the list payloads
+
+    :param name: The name of the list
+    :param encoding: The preferred content encoding (br or gzip), if any
+    :return: The list, the content encoding it's in (None if it's plain JSON), and whether it is past its soft expiry
+    """
+    key = LIST_KEY.format(name)
+    if (cached := local_cache.get(key, encoding or "")) is not None:
+        metrics.incr(f"cache.local.list.{name}.hit")
+    else:
+        try:
+            cached = await _read_list(name, encoding)
+        except RedisError:
+            if (cached := local_cache.get(key, encoding or "", stale=True)) is None:
+                raise
+            logging.warning(f"Failed to read `{name}`, serving the local copy", exc_info=True)
+            metrics.incr(f"cache.local.list.{name}.fallback")
+        else:
+            local_cache.set(key, cached, len(cached[0]), encoding or "")
+    data, data_encoding, fresh_until = cached
+    return data, data_encoding, fresh_until < time.time()
+
+
+async def _read_list(name: str, encoding: str | None) -> tuple[bytes, str | None, float]:
+    client = get_client()
+    key = LIST_KEY.format(name)
+    if encoding is not None:
+        data, fresh_until = await client.hmget(key, [encoding, "fresh_until"])
+        if data is not None:
+            return data, encoding, float(fresh_until or 0)
+
+    # Either no encoding was asked for, or the payload was too small to have compressed variants
+    data, fresh_until = await client.hmget(key, ["data", "fresh_until"])
+    if data is None:
+        raise CacheMiss(f"`{name}` not found")
+    return data, None, float(fresh_until or 0)
+
+
+async def get_list(
+    name: str, refresh: Callable[[], Awaitable[Any]], encoding: str | None = None
+) -> tuple[bytes, str | None]:
+    """
+    Function to get one of the list payloads written by the crons
+
+    Whatever is cached is returned straight away. If it is stale, a refresh is started in the background. Only when
+    nothing is cached do we refresh on the request path. Either way, concurrent refreshes (in this process or others)
+    are coalesced into one.
+
+    :param name: The name of the list
+    :param refresh: Coroutine function that scrapes the list and stores it with `set_list`
+    :param encoding: The preferred content encoding (br or gzip), if any
+    :return: The list, and the content encoding it's in (None if it's plain JSON)
+    """
+
+    async def read() -> Any:
+        return await read_list(name)
+
+    try:
+        data, data_encoding, stale = await read_list(name, encoding)
+    except CacheMiss:
+        metrics.incr(f"cache.list.{name}.miss")
+        # Whoever we end up waiting on may want a different encoding, so read our own once the refresh is done
+        await single_flight(LIST_KEY.format(name), refresh, read)
+        return (await read_list(name, encoding))[:2]
+
+    if stale:
+        metrics.incr(f"cache.list.{name}.stale")
+        refresh_in_background(name, refresh, read)
+    else:
+        metrics.incr(f"cache.list.{name}.hit")
+    return data, data_encoding
+
+
+def refresh_in_background(name: str, refresh: Callable[[], Awaitable[Any]], read: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Function to start refreshing a stale list without waiting for it
+
+    :param name: The name of the list
+    :param refresh: Coroutine function that scrapes the list and stores it
+    :param read: Coroutine function that reads the list from the cache, raising CacheMiss if it isn't there yet
+    :return: Nothing
+    """
+    task = asyncio.create_task(single_flight(LIST_KEY.format(name), refresh, read))
+    _refreshes.add(task)
+    task.add_done_callback(_refresh_done)
+
+
+def _refresh_done(task: asyncio.Task) -> None:
+    """
+    Callback for background refreshes, so that failures get logged instead of lost
+
+    :param task: The finished refresh
+    :return: Nothing
+    """
+    _refreshes.discard(task)
+    if not task.cancelled() and (exc := task.exception()) is not None:
+        logging.error("Background list refresh failed", exc_info=exc)
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+from redis.asyncio.client import PubSub
+from redis.exceptions import RedisError
+
+from app import metrics
+from app.core.config import settings
+
+from .cache import get_client
+
+# Keys written to redis are published here, so that every worker drops its own copy
+INVALIDATE_CHANNEL = "cache:invalidate"
+
+
+class LocalCache:
+    """
+    Bounded LRU of values read from redis, kept in the worker to skip the round trip for hot keys
+
+    Entries are only served for a few seconds, and only while invalidations are being received. Past that they're kept
+    (until evicted) to be served when redis can't be reached.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries: OrderedDict[tuple[str, str], tuple[float, int, Any]] = OrderedDict()
+        self.size = 0
+        self.enabled = False
+
+    def get(self, key: str, variant: str = "", stale: bool = False) -> Any:
+        """
+        Function to get a value
+
+        :param key: The redis key the value was read from
+        :param variant: Which of the values read from the key, if there are several
+        :param stale: Whether a value past its TTL (or that may have missed an invalidation) will do
+        :return: The value, None if there isn't one
+        """
+        if (entry := self.entries.get((key, variant))) is None:
+            return None
+        expires, _, value = entry
+        if not stale and (not self.enabled or expires < time.monotonic()):
+            return None
+        self.entries.move_to_end((key, variant))
+        return value
+
+    def set(self, key: str, value: Any, size: int, variant: str = "") -> None:
+        """
+        Function to keep a value, evicting the least recently used ones if there's no room for it
+
+        :param key: The redis key the value was read from
+        :param value: The value
+        :param size: Roughly how many bytes the value takes
+        :param variant: Which of the values read from the key, if there are several
+        :return: Nothing
+        """
+        if not self.enabled or size > self.max_bytes:
+            return
+        self.drop((key, variant))
+        self.entries[(key, variant)] = (time.monotonic() + self.ttl, size, value)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted, _) = self.entries.popitem(last=False)
+            self.size -= evicted
+
+    def drop(self, entry: tuple[str, str]) -> None:
+        """
+        Function to remove an entry
+
+        :param entry: The key and variant of the entry
+        :return: Nothing
+        """
+        if (dropped := self.entries.pop(entry, None)) is not None:
+            self.size -= dropped[1]
+
+    def invalidate(self, key: str) -> None:
+        """
+        Function to remove every value read from a key
+
+        :param key: The redis key, or a prefix followed by "*" to match several
+        :return: Nothing
+        """
+        if key.endswith("*"):
+            prefix = key.removesuffix("*")
+            matches = [entry for entry in self.entries if entry[0].startswith(prefix)]
+        else:
+            matches = [entry for entry in self.entries if entry[0] == key]
+        for entry in matches:
+            self.drop(entry)
+
+    def expire(self) -> None:
+        """
+        Function to stop serving every value until it's read from redis again, keeping them for when redis is down
+
+        :return: Nothing
+        """
+        for entry, (_, size, value) in self.entries.items():
+            self.entries[entry] = (0.0, size, value)
+
+
+local_cache = LocalCache(settings.LOCAL_CACHE_MAX_BYTES, settings.LOCAL_CACHE_TTL)
+# Invalidations are published with this, so that a worker can skip its own (it has already applied them)
+_origin = uuid.uuid4().hex
+_listener: asyncio.Task | None = None
+_listening = False
+
+metrics.gauge("cache.local.bytes", lambda: local_cache.size)
+
+
+async def invalidate(*keys: str) -> None:
+    """
+    Function to make every worker drop the values they read from some keys, should be called after writing them
+
+    :param keys: The redis keys, or prefixes followed by "*"
+    :return: Nothing
+    """
+    for key in keys:
+        local_cache.invalidate(key)
+    try:
+        async with get_client().pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.publish(INVALIDATE_CHANNEL, f"{_origin}:{key}")
+            await pipe.execute()
+    except RedisError:
+        # Other workers' copies expire soon enough anyway
+        logging.warning("Failed to publish cache invalidations", exc_info=True)
+
+
+async def _listen() -> None:
+    """
+    Function to apply the invalidations published by every worker to this one's local cache
+
+    :return: Nothing
+    """
+    pubsub: PubSub = get_client().pubsub()
+    try:
+        while _listening:
+            try:
+                if not pubsub.subscribed:
+                    await pubsub.subscribe(INVALIDATE_CHANNEL)
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except Exception:
+                if local_cache.enabled:
+                    logging.exception("Lost the cache invalidations, not serving from the local cache")
+                    local_cache.enabled = False
+                await asyncio.sleep(1.0)
+                continue
+            if not local_cache.enabled:
+                # Whatever was published while we weren't listening is lost
+                local_cache.expire()
+                local_cache.enabled = True
+            if message is None or message["type"] != "message":
+                continue
+            origin, _, key = message["data"].decode().partition(":")
+            if origin != _origin:
+                local_cache.invalidate(key)
+    finally:
+        local_cache.enabled = False
+        await pubsub.close()
+
+
+async def start_local_cache() -> None:
+    """
+    Function to start listening for invalidations, the local cache is only used once this is called
+
+    :return: Nothing
+    """
+    global _listener, _listening
+    if _listener is None and settings.LOCAL_CACHE_MAX_BYTES:
+        _listening = True
+        _listener = asyncio.create_task(_listen())
+
+
+async def stop_local_cache() -> None:
+    """
+    Function to stop listening for invalidations, and with it using the local cache
+
+    :return: Nothing
+    """
+    global _listener, _listening
+    # The listener also stops by itself, a cancellation can get lost in a blocking read
+    _listening = False
+    if _listener is not None:
+        _listener.cancel()
+        await asyncio.gather(_listener, return_exceptions=True)
+        _listener = None
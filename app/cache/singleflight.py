@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from redis.exceptions import RedisError
+
+from app import metrics
+from app.core.config import settings
+
+from .cache import get_client
+from .exceptions import CacheMiss
+
+LOCK_KEY = "lock:{}"
+
+# Only delete the lock if we still hold it, it may have expired and been taken by someone else
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Likewise, only extend the lock (by ARGV[2] milliseconds) if we still hold it
+EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_inflight: dict[str, asyncio.Task] = {}
+
+
+async def renew_lock(lock_key: str, token: str, lease: float) -> None:
+    """
+    Function to keep extending a lock for as long as it's held, see `holding_lock`
+
+    :param lock_key: The lock's key
+    :param token: The token the lock was taken with
+    :param lease: How long the lock lasts without being renewed, in seconds (it's renewed a few times within that)
+    :return: Nothing, once the lock is lost
+    """
+    while True:
+        await asyncio.sleep(lease / 3)
+        try:
+            if not await get_client().eval(EXTEND_LOCK_SCRIPT, 1, lock_key, token, int(lease * 1000)):
+                logging.warning(f"Lost lock `{lock_key}`")
+                return
+        except RedisError:
+            # Tried again on the next beat, the lease only runs out if redis stays unreachable
+            logging.warning(f"Failed to renew lock `{lock_key}`", exc_info=True)
+
+
+@asynccontextmanager
+async def holding_lock(lock_key: str, token: str, lease: float) -> AsyncIterator[asyncio.Task]:
+    """
+    Context manager that renews a lock in the background for as long as the work it's held for runs
+
+    :param lock_key: The lock's key
+    :param token: The token the lock was taken with
+    :param lease: How long the lock lasts without being renewed, in seconds
+    :return: The renewal task, which is done if the lock was lost
+    """
+    renewal = asyncio.create_task(renew_lock(lock_key, token, lease))
+    try:
+        yield renewal
+    finally:
+        renewal.cancel()
+        await asyncio.gather(renewal, return_exceptions=True)
+
+
+async def single_flight(
+    key: str, load: Callable[[], Awaitable[Any]], read: Callable[[], Awaitable[Any]] | None = None
+) -> Any:
+    """
+    Function to make sure only one load runs per key at a time, with every concurrent caller getting its result
+
+    Callers in this process share a task. If `read` is given, callers in other processes are coalesced too: whoever
+    takes the redis lock runs `load` (which must populate the cache), and the rest wait for `read` to find the result.
+
+    :param key: The key identifying the work
+    :param load: Coroutine function doing the work
+    :param read: Coroutine function that reads the result from the cache, raising CacheMiss if it isn't there yet
+    :return: The result of the load
+    """
+    if (task := _inflight.get(key)) is not None:
+        metrics.incr("singleflight.coalesced")
+        return await asyncio.shield(task)
+
+    task = asyncio.create_task(_load(key, load, read))
+    _inflight[key] = task
+
+    def forget(_: asyncio.Task) -> None:
+        if _inflight.get(key) is task:
+            del _inflight[key]
+
+    task.add_done_callback(forget)
+    return await asyncio.shield(task)
+
+
+async def _load(key: str, load: Callable[[], Awaitable[Any]], read: Callable[[], Awaitable[Any]] | None) -> Any:
+    """
+    Function to run a load while holding the cross-process lock, or wait for another process that holds it
+
+    :param key: The key identifying the work
+    :param load: Coroutine function doing the work
+    :param read: Coroutine function that reads the result from the cache
+    :return: The result of the load
+    """
+    if read is None:
+        return await load()
+
+    client = get_client()
+    lock_key = LOCK_KEY.format(key)
+    token = uuid.uuid4().hex
+    if await client.set(lock_key, token, nx=True, px=int(settings.SINGLE_FLIGHT_LEASE * 1000)):
+        try:
+            async with holding_lock(lock_key, token, settings.SINGLE_FLIGHT_LEASE):
+                return await load()
+        finally:
+            try:
+                await client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except Exception:
+                # The lease will run out on its own
+                logging.exception(f"Failed to release lock for `{key}`")
+
+    metrics.incr("singleflight.coalesced_remote")
+    delay = settings.SINGLE_FLIGHT_POLL_INTERVAL
+    # Wait for as long as the other process holds the lock, it's renewed for as long as its load runs
+    while True:
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 1.0)
+        try:
+            return await read()
+        except CacheMiss:
+            pass
+        # The other process is done but didn't cache anything (it failed, or the result couldn't be stored), or died
+        if not await client.exists(lock_key):
+            break
+
+    metrics.incr("singleflight.remote_missed")
+    return await load()
@@ -16,6 +16,8 @@ UPCOMING_MATCHES_URL = f"{PREFIX}/matches"
 
 PAST_MATCHES_URL = f"{PREFIX}/matches/results"
 
+PAST_MATCHES_URL_WITH_PAGE = f"{PREFIX}/matches/results/?page={{}}"
+
 NEWS_URL = f"{PREFIX}/news"
 
 TEAM_URL = f"{PREFIX}/team/{{}}"
@@ -7,8 +7,155 @@ class Settings(BaseSettings):
 
     REDIS_HOST: str
     REDIS_PASSWORD: str
+    REDIS_MAX_CONNECTIONS: int = 50
+    # Seconds to wait for a free pooled connection before giving up
+    REDIS_POOL_TIMEOUT: float = 5.0
+    REDIS_SCAN_BATCH_SIZE: int = 500
+
+    # Detail endpoint cache TTLs, in seconds
+    MATCH_COMPLETED_TTL: int = 3 * 24 * 60 * 60
+    MATCH_LIVE_TTL: int = 15
+    MATCH_UPCOMING_TTL: int = 5 * 60
+    EVENT_COMPLETED_TTL: int = 3 * 24 * 60 * 60
+    EVENT_TTL: int = 10 * 60
+    TEAM_TTL: int = 30 * 60
+    PLAYER_TTL: int = 30 * 60
+    # Detail endpoint cache memory budgets per entity kind, in bytes
+    ENTITY_CACHE_BUDGETS: dict[str, int] = {
+        "match": 64 * 1024 * 1024,
+        "event": 32 * 1024 * 1024,
+        "team": 16 * 1024 * 1024,
+        "player": 16 * 1024 * 1024,
+    }
+    ENTITY_CACHE_DEFAULT_BUDGET: int = 16 * 1024 * 1024
+    # Most matches asked for at once on the batch endpoint, and how many that aren't cached are scraped at once
+    MATCH_BATCH_MAX_IDS: int = 50
+    MATCH_BATCH_CONCURRENCY: int = 5
+    # How long entities are kept after their TTL, to be served if VLR can't be scraped, in seconds
+    ENTITY_STALE_GRACE: int = 6 * 60 * 60
+
+    # Crons only run in the one cron worker (`python -m app.worker`) holding the leader lease, in seconds. The others
+    # stand by, and one of them takes over once the leader's lease runs out.
+    CRON_LEADER_LEASE: float = 30.0
+    CRON_LEADER_RENEW_INTERVAL: float = 10.0
+    CRON_LEADER_RETRY_INTERVAL: float = 5.0
+
+    # Lists are refreshed somewhere between these intervals, in seconds. As often as the lower bound while matches are
+    # live or about to start, and less often the less the list has been changing lately.
+    SCHEDULE_BOUNDS: dict[str, tuple[float, float]] = {
+        "matches": (30, 15 * 60),
+        "events": (5 * 60, 60 * 60),
+        "news": (5 * 60, 60 * 60),
+        "rankings": (10 * 60, 60 * 60),
+    }
+    # How much the last run weighs in the change and error rates, between 0 and 1
+    SCHEDULE_SMOOTHING: float = 0.3
+    # How much longer the interval gets while every run fails (up to the upper bound)
+    SCHEDULE_ERROR_BACKOFF: float = 4.0
+    # Upcoming matches are imminent from this long (in seconds) before their start time to this long after it
+    SCHEDULE_IMMINENT_WINDOW: int = 30 * 60
+
+    # After the matches list is refreshed, the details of the live and imminent matches (and their teams and events)
+    # are scraped ahead of the first request for them, within a budget of upstream pages per run
+    PREFETCH_BUDGET: int = 30
+    PREFETCH_CONCURRENCY: int = 4
+    PREFETCH_MAX_MATCHES: int = 20
+
+    # Lists and entities read from redis are also kept in each web worker for this long (in seconds), up to this many
+    # bytes (0 disables it). Writes are broadcast so that every worker drops its copy straight away, and copies are
+    # served past their TTL if redis can't be reached.
+    LOCAL_CACHE_TTL: float = 5.0
+    LOCAL_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # The lock for a scrape is renewed while the scrape runs, this is how long it outlives a worker that died holding it
+    SINGLE_FLIGHT_LEASE: float = 10.0
+    SINGLE_FLIGHT_POLL_INTERVAL: float = 0.05
+
+    # List payloads are served as-is until their soft TTL, then served while being refreshed in the background until
+    # their hard TTL. Soft TTLs are a bit longer than the longest refresh intervals, so that requests rarely beat the
+    # scheduler to it.
+    LIST_SOFT_TTLS: dict[str, int] = {
+        "matches": 16 * 60,
+        "events": 65 * 60,
+        "news": 65 * 60,
+        "rankings": 65 * 60,
+    }
+    LIST_HARD_TTLS: dict[str, int] = {
+        "matches": 24 * 60 * 60,
+        "events": 7 * 24 * 60 * 60,
+        "news": 7 * 24 * 60 * 60,
+        "rankings": 7 * 24 * 60 * 60,
+    }
+
+    # How many items are read from the cache (or the results database) at once when streaming them
+    EXPORT_BATCH_SIZE: int = 500
+
+    # Live matches are scraped this often (in seconds) while anyone is subscribed, and less often before they start
+    LIVE_POLL_INTERVAL: float = 10.0
+    LIVE_IDLE_POLL_INTERVAL: float = 60.0
+    # The poller lease is renewed while the poller runs, this is how long a match goes without updates (in seconds) if
+    # the worker polling it dies, before another one takes over
+    LIVE_POLLER_LEASE: float = 30.0
+    # Comments are sent on idle streams this often, so that proxies don't close them
+    LIVE_KEEPALIVE: float = 15.0
+    # How long the last scrape of a match is kept for new subscribers, in seconds
+    LIVE_STATE_TTL: int = 6 * 60 * 60
+
+    # Responses smaller than this (in bytes) aren't worth compressing
+    COMPRESSION_MIN_SIZE: int = 1024
+    BROTLI_QUALITY: int = 11
+    GZIP_LEVEL: int = 9
+
+    # HTML parsing runs on a "thread" or "process" pool, PARSE_WORKERS defaults to what the pool picks
+    PARSE_EXECUTOR: str = "thread"
+    PARSE_WORKERS: int | None = None
+    # "bs4", "lxml" (compiled XPath, same output) or "compare" (runs both, logs any difference and returns bs4's)
+    PARSER_BACKEND: str = "bs4"
 
     GOOGLE_APPLICATION_CREDENTIALS: str | None
+    # Users are notified about matches starting within this long, in seconds
+    FCM_NOTIFY_WINDOW: int = 15 * 60
+    FCM_MAX_MATCHES: int = 100
+    # How long a match is remembered as notified, in seconds
+    FCM_NOTIFIED_TTL: int = 24 * 60 * 60
+    # How long a match is claimed for while it's being notified, if the run dies before sending it's tried again after
+    FCM_PENDING_TTL: int = 5 * 60
+    # The most messages FCM takes in one batch
+    FCM_BATCH_SIZE: int = 500
+
+    # Match results crawled from VLR's paginated results are kept in a local SQLite database, which has to be on
+    # persistent storage shared by the API and the cron worker (a fly volume, see fly.toml)
+    RESULTS_DB_PATH: str = "results.sqlite3"
+    # Seconds to wait for the database to be unlocked
+    RESULTS_DB_TIMEOUT: float = 5.0
+    RESULTS_CRAWL_CONCURRENCY: int = 4
+    # Most pages walked per run, both for new results and for backfilling older ones
+    RESULTS_CRAWL_MAX_PAGES: int = 10
+
+    # HTTP/2 needs the `h2` package (`httpx[http2]`) to be installed
+    UPSTREAM_HTTP2: bool = False
+    UPSTREAM_MAX_CONNECTIONS: int = 20
+    UPSTREAM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    UPSTREAM_KEEPALIVE_EXPIRY: float = 30.0
+    UPSTREAM_TIMEOUT: float = 30.0
+    UPSTREAM_CONNECT_TIMEOUT: float = 5.0
+    # Requests per second to each upstream host, shared by every worker (0 disables it), and how many can go at once
+    UPSTREAM_RATE: float = 5.0
+    UPSTREAM_BURST: int = 10
+    # Requests that would have to wait longer than this (in seconds) for their turn fail instead
+    UPSTREAM_MAX_RATE_WAIT: float = 30.0
+    # Per worker
+    UPSTREAM_HOST_CONCURRENCY: int = 8
+    # Failed requests are retried after a random delay of up to RETRY_DELAY * 2^n seconds, capped at RETRY_MAX_DELAY
+    UPSTREAM_RETRIES: int = 2
+    UPSTREAM_RETRY_DELAY: float = 0.5
+    UPSTREAM_RETRY_MAX_DELAY: float = 4.0
+    # After this many failed requests in a row for a family of pages (matches, events, ...), requests for them fail
+    # straight away for the cooldown, in seconds
+    UPSTREAM_BREAKER_THRESHOLD: int = 5
+    UPSTREAM_BREAKER_COOLDOWN: float = 30.0
+    # How long the validators and body hash of a scraped page are kept for conditional requests, in seconds
+    UPSTREAM_PAGE_TTL: int = 7 * 24 * 60 * 60
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,16 @@
+import logging
+import sys
+
+
+def setup_logging() -> None:
+    """
+    Function to set up logging the same way in every process (the API and the cron worker)
+
+    :return: Nothing
+    """
+    logging.basicConfig(
+        format="[%(levelname)s] (%(asctime)s) %(module)s:%(pathname)s:%(funcName)s:%(lineno)s:: %(message)s",
+        level=logging.INFO,
+        datefmt="%d-%m-%y %H:%M:%S",
+        stream=sys.stdout,
+    )
@@ -1,47 +1,93 @@
 import asyncio
 import json
-import sys
+import logging
 from asyncio import Task
 from datetime import datetime
-from typing import Any
+from typing import Any, Awaitable, Callable
 from zoneinfo import ZoneInfo
 
-import pydantic.json
 from arq import cron
+from arq.connections import RedisSettings
 from arq.worker import Worker, create_worker
-from firebase_admin import delete_app, initialize_app, messaging
+from firebase_admin import App, delete_app, initialize_app, messaging
 
-from app.cache import cache
+from app import cache, metrics, schemas, upstream, utils
 from app.constants import MatchStatus
 from app.core.config import settings
-from app.services import events, matches, news, rankings
+from app.services import events, matches, news, rankings, results
+
+# Set for each match once users were notified about it
+NOTIFIED_KEY = "fcm:notified:{}"
+
+_firebase_app: App | None = None
+
+
+def get_firebase_app() -> App:
+    """
+    Function to get the Firebase app, initializing it the first time
+    :return: The app
+    """
+    global _firebase_app
+    if _firebase_app is None:
+        _firebase_app = initialize_app()
+    return _firebase_app
 
 
 async def fcm_notification_cron(_: dict) -> None:
     """
-    Function to notify users about upcoming matches
+    Function to notify users about upcoming matches, once per match
     :param _: Context dict
     :return: Nothing
     """
-    # Get the current time, so that we can filter for matches starting in the next 15 minutes
+    # Get the current time, so that we can filter for matches starting within the window
     current_time = datetime.now(tz=ZoneInfo("UTC"))
-    upcoming_matches = [
-        match
-        for match in await matches.get_upcoming_matches()
-        if match.status == MatchStatus.UPCOMING and 0 < (match.time - current_time).total_seconds() < 900
-    ]
+    found, _ = await cache.query_list(
+        "matches",
+        lambda: matches_cron({}),
+        [cache.facet("status", MatchStatus.UPCOMING)],
+        current_time.timestamp(),
+        current_time.timestamp() + settings.FCM_NOTIFY_WINDOW,
+        settings.FCM_MAX_MATCHES,
+    )
+    upcoming_matches = [schemas.Match.parse_raw(data) for data in found]
+
+    # Claim the matches first, so that a match that stays in the window over several runs is only notified once. The
+    # claim is short until the notification is sent, so that it isn't lost if this run dies in between.
+    client = cache.get_client()
+    async with client.pipeline(transaction=False) as pipe:
+        for match in upcoming_matches:
+            pipe.set(NOTIFIED_KEY.format(match.id), 1, nx=True, ex=settings.FCM_PENDING_TTL)
+        claimed = await pipe.execute()
+    upcoming_matches = [match for match, new in zip(upcoming_matches, claimed) if new]
+    if not upcoming_matches:
+        logging.info("No notifications to send")
+        return
+
+    # Matches that aren't notified in the end are released, to be tried again on the next run
+    failed: list[str] = []
+    sent: list[str] = []
+    details = await cache.read_through_many(
+        "match",
+        [match.id for match in upcoming_matches],
+        matches.match_by_id,
+        cache.match_ttl,
+        settings.MATCH_BATCH_CONCURRENCY,
+    )
 
     # Initialize an empty list of messages
-    messages = []
+    messages, notified = [], []
 
     # Iterate over upcoming matches
     for match in upcoming_matches:
-        print(f"Sending notification for {match=}")
-
-        match_details = await matches.match_by_id(match.id)
+        if not isinstance(data := details[match.id], bytes):
+            logging.error(f"Failed to get match `{match.id}` to notify about it", exc_info=data)
+            failed.append(match.id)
+            continue
+        logging.info(f"Sending notification for match `{match.id}`")
+        match_details = json.loads(data)
 
         # Retrieve team IDs by querying the match information
-        team1_id, team2_id = (team.id for team in match_details.teams)
+        team1_id, team2_id = (team["id"] for team in match_details["teams"])
 
         # Calculate the time left in minutes
         time_to_start = int((match.time - current_time).total_seconds() // 60)
@@ -52,75 +98,166 @@ async def fcm_notification_cron(_: dict) -> None:
             "body": f"Match is starting in {time_to_start} minutes",
             "match_id": match.id,
         }
-        streams = match_details.videos.streams
+        streams = match_details["videos"]["streams"]
 
         # Create the firebase message
         messages.append(
             messaging.Message(
-                data=payload | {"stream_url": streams[0].url if len(streams) > 0 else None},
+                data=payload | {"stream_url": streams[0]["url"] if len(streams) > 0 else None},
                 # Even if a person has subscribed to the event + match + both teams, they shouldn't receive multiple
                 # notifications
-                condition=f"'event-{match_details.event.id}' in topics || 'match-{match.id}' in topics || "
-                          f"'team-{team1_id}' in topics || 'team-{team2_id}' in topics",
+                condition=f"'event-{match_details['event']['id']}' in topics || 'match-{match.id}' in topics || "
+                f"'team-{team1_id}' in topics || 'team-{team2_id}' in topics",
             ),
         )
+        notified.append(match.id)
+
+    # FCM takes a limited number of messages per batch
+    for start in range(0, len(messages), settings.FCM_BATCH_SIZE):
+        end = start + settings.FCM_BATCH_SIZE
+        ids = notified[start:end]
+        try:
+            response = await asyncio.to_thread(messaging.send_all, messages[start:end], app=get_firebase_app())
+        except Exception:
+            logging.exception("Failed to send notifications")
+            failed.extend(ids)
+            continue
+        logging.info(f"Sent {response.success_count} notifications, {response.failure_count} failed")
+        metrics.incr("fcm.sent", response.success_count)
+        for id, result in zip(ids, response.responses):
+            (sent if result.success else failed).append(id)
 
-    # Don't bother sending if there's nothing to send
-    if messages:
-        app = initialize_app()
-        response = messaging.send_all(messages)
-        delete_app(app)
-        print(f"{vars(response)=}")
-    else:
-        print("No notifications to send")
+    # Set again rather than extended, in case the claim ran out while sending
+    await cache.mset({NOTIFIED_KEY.format(id): 1 for id in sent}, settings.FCM_NOTIFIED_TTL)
+    if failed:
+        metrics.incr("fcm.failed", len(failed))
+        await client.delete(*(NOTIFIED_KEY.format(id) for id in failed))
 
 
-async def rankings_cron(ctx: dict) -> None:
+def match_item(_: int, match: schemas.Match) -> cache.ListItem:
     """
-    Function to fetch rankings from VLR and update the cache
-    :param ctx: Context dict
-    :return: Nothing
+    Function to index a match of the matches list, by time
+    :param _: Its position in the list
+    :param match: The match
+    :return: The list item
     """
-    response = await rankings.ranking_list()
-    await ctx.get("redis", cache.get_client()).set(
-        "rankings", json.dumps([item.dict() for item in response], default=pydantic.json.pydantic_encoder)
+    return cache.ListItem(
+        match.id,
+        utils.to_json(match),
+        match.time.timestamp(),
+        tuple(
+            cache.facet(name, value)
+            for name, value in (
+                ("status", match.status),
+                ("team", match.team1.name),
+                ("team", match.team2.name),
+                ("event", match.event),
+            )
+            if value
+        ),
     )
 
 
-async def matches_cron(ctx: dict) -> None:
+def event_item(position: int, event: schemas.Event) -> cache.ListItem:
+    """
+    Function to index an event of the events list, by position as VLR doesn't give full dates
+    :param position: Its position in the list
+    :param event: The event
+    :return: The list item
+    """
+    return cache.ListItem(str(event.id), utils.to_json(event), position, (cache.facet("status", event.status),))
+
+
+def news_item(_: int, item: schemas.NewsItem) -> cache.ListItem:
+    """
+    Function to index an article of the news list, by date
+    :param _: Its position in the list
+    :param item: The article
+    :return: The list item
+    """
+    return cache.ListItem(item.url, utils.to_json(item), item.date.timestamp())
+
+
+def ranking_item(position: int, ranking: schemas.Ranking) -> cache.ListItem:
+    """
+    Function to index the rankings of a region, by position
+    :param position: Its position in the list
+    :param ranking: The region's rankings
+    :return: The list item
+    """
+    return cache.ListItem(ranking.region, utils.to_json(ranking), position)
+
+
+async def refresh_list(
+    name: str, build: Callable[..., Awaitable[Any]], item: Callable[[int, Any], cache.ListItem] | None = None
+) -> bool:
+    """
+    Function to rebuild one of the cached lists, unless none of the pages it's built from changed since the last time
+    :param name: The name of the list
+    :param build: Coroutine function building the list, taking a `conditional` flag (see `upstream.get_pages`)
+    :param item: For lists whose items have IDs, function to build the list item for each one, so that only the ones
+    that changed are written and the list can be filtered
+    :return: Whether the list changed
+    """
+    try:
+        response = await build(conditional=True)
+    except upstream.NotModified:
+        if await cache.touch_list(name, items=item is not None):
+            metrics.incr(f"cron.{name}.not_modified")
+            return False
+        # The list (or its items) is gone, so it has to be built again even though the pages are the same
+        response = await build()
+
+    if item is not None:
+        diff = await cache.set_list_items(name, [item(position, data) for position, data in enumerate(response)])
+        return any(diff.values())
+    await cache.set_list(name, utils.to_json(response))
+    return True
+
+
+async def rankings_cron(_: dict) -> bool:
+    """
+    Function to fetch rankings from VLR and update the cache
+    :param _: Context dict
+    :return: Whether the list changed
+    """
+    return await refresh_list("rankings", rankings.ranking_list, ranking_item)
+
+
+async def matches_cron(_: dict) -> bool:
     """
     Function to fetch matches from VLR and update the cache
-    :param ctx: Context dict
-    :return: Nothing
+    :param _: Context dict
+    :return: Whether the list changed
     """
-    response = await matches.match_list()
-    await ctx.get("redis", cache.get_client()).set(
-        "matches", json.dumps([item.dict() for item in response], default=pydantic.json.pydantic_encoder)
-    )
+    return await refresh_list("matches", matches.match_list, match_item)
 
 
-async def events_cron(ctx: dict) -> None:
+async def events_cron(_: dict) -> bool:
     """
     Function to fetch matches from VLR and update the cache
-    :param ctx: Context dict
-    :return: Nothing
+    :param _: Context dict
+    :return: Whether the list changed
     """
-    response = await events.get_events()
-    await ctx.get("redis", cache.get_client()).set(
-        "events", json.dumps([item.dict() for item in response], default=pydantic.json.pydantic_encoder)
-    )
+    return await refresh_list("events", events.get_events, event_item)
 
 
-async def news_cron(ctx: dict) -> None:
+async def news_cron(_: dict) -> bool:
     """
     Function to fetch matches from VLR and update the cache
-    :param ctx: Context dict
+    :param _: Context dict
+    :return: Whether the list changed
+    """
+    return await refresh_list("news", news.news_list, news_item)
+
+
+async def results_cron(_: dict) -> None:
+    """
+    Function to crawl new (and backfill old) match results from VLR into the local store
+    :param _: Context dict
     :return: Nothing
     """
-    response = await news.news_list()
-    await ctx.get("redis", cache.get_client()).set(
-        "news", json.dumps([item.dict() for item in response], default=pydantic.json.pydantic_encoder)
-    )
+    await results.crawl_results()
 
 
 class ArqWorker:
@@ -129,28 +266,30 @@ class ArqWorker:
         self.task: Task | None = None
 
     async def start(self, **kwargs: Any) -> None:
+        # The lists are refreshed by `app.scheduler` instead, as often as they need to be
         cron_jobs = [
-            cron("app.cron.rankings_cron", hour=None, minute={0, 30}),
-            cron("app.cron.matches_cron", hour=None, minute={0, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55}),
-            cron("app.cron.events_cron", hour=None, minute={0, 30}),
-            cron("app.cron.news_cron", hour=None, minute={0, 30}),
+            cron("app.cron.results_cron", hour=None, minute={2, 12, 22, 32, 42, 52}),
         ]
 
         # Only try to run the FCM cron if we have a service account JSON
         if settings.GOOGLE_APPLICATION_CREDENTIALS is not None:
-            cron_jobs.append(cron("app.cron.fcm_notification_cron", hour=None, minute={0, 15, 30, 45}))
+            # Every minute, so that users are notified as soon as a match is in the window
+            cron_jobs.append(cron("app.cron.fcm_notification_cron", hour=None, minute=None))
 
         self.worker = create_worker(
-            {
-                "cron_jobs": cron_jobs
-            },
+            {"cron_jobs": cron_jobs},
+            redis_settings=RedisSettings(host=settings.REDIS_HOST, password=settings.REDIS_PASSWORD),
             **kwargs,
         )
         self.task = asyncio.create_task(self.worker.async_run())
 
     async def stop(self) -> None:
+        global _firebase_app
         if self.worker:
             await self.worker.close()
+        if _firebase_app is not None:
+            delete_app(_firebase_app)
+            _firebase_app = None
 
 
 arq_worker = ArqWorker()
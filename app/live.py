@@ -0,0 +1,283 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, AsyncIterator
+
+from redis.asyncio.client import PubSub
+
+from app import cache, metrics, utils
+from app.constants import MatchStatus
+from app.core.config import settings
+from app.services import matches
+
+CHANNEL_KEY = "live:match:{}"
+# Held by whichever worker is polling VLR for a match, so that there's only ever one poller per match
+POLLER_KEY = "live:match:{}:poller"
+# The last scrape of a match, diffs are published against it and new subscribers start from it
+STATE_KEY = "live:match:{}:state"
+
+FINISHED = ("final", MatchStatus.COMPLETED)
+
+# Subscribers in this process, by match ID. Every worker has a single pubsub connection that fans out to them.
+_subscribers: dict[str, set[asyncio.Queue]] = {}
+_pubsub: PubSub | None = None
+_reader: asyncio.Task | None = None
+_pollers: dict[str, asyncio.Task] = {}
+
+metrics.gauge("live.subscribers", lambda: sum(len(queues) for queues in _subscribers.values()))
+metrics.gauge("live.pollers", lambda: len(_pollers))
+
+
+def diff_match(old: dict, new: dict) -> dict:
+    """
+    Function to work out what changed in a match between two scrapes
+
+    Only what live clients need to update is compared: the series score, status and map count, and for each map its
+    score, the rounds played since and the scoreboard lines that changed.
+
+    :param old: The previous scrape
+    :param new: The current scrape
+    :return: The changes, empty if there weren't any
+    """
+    diff: dict[str, Any] = {}
+    if new["teams"] != old["teams"]:
+        diff["teams"] = new["teams"]
+    if new["event"]["status"] != old["event"]["status"]:
+        diff["status"] = new["event"]["status"]
+    if new["map_count"] != old["map_count"]:
+        diff["map_count"] = new["map_count"]
+
+    played = {game["map"]: game for game in old["data"]}
+    maps = []
+    for game in new["data"]:
+        before = played.get(game["map"], {"teams": None, "rounds": [], "members": []})
+        changes: dict[str, Any] = {}
+        if game["teams"] != before["teams"]:
+            changes["teams"] = game["teams"]
+        if rounds := [round for round in game["rounds"] if round not in before["rounds"]]:
+            changes["rounds"] = rounds
+        if members := [member for member in game["members"] if member not in before["members"]]:
+            changes["members"] = members
+        if changes:
+            maps.append({"map": game["map"], **changes})
+    if maps:
+        diff["maps"] = maps
+    return diff
+
+
+async def publish(id: str, type: str, data: str) -> None:
+    """
+    Function to send a message to every subscriber of a match, in all workers
+
+    :param id: The match ID
+    :param type: The message type (snapshot, diff or end)
+    :param data: The message, as JSON
+    :return: Nothing
+    """
+    await cache.get_client().publish(CHANNEL_KEY.format(id), f"{type}\n{data}")
+
+
+async def poll(id: str, token: str) -> None:
+    """
+    Function to scrape a match at a fixed cadence and publish what changed, for as long as anyone is subscribed
+
+    :param id: The match ID
+    :param token: The token the poller lease was taken with
+    :return: Nothing
+    """
+    client = cache.get_client()
+    state_key, poller_key = STATE_KEY.format(id), POLLER_KEY.format(id)
+    previous = json.loads(state) if (state := await client.get(state_key)) is not None else None
+    try:
+        # Renewed in the background, so that a slow scrape (waiting on the rate limit, retrying) can't lose it
+        async with cache.holding_lock(poller_key, token, settings.LIVE_POLLER_LEASE) as renewal:
+            while not renewal.done():
+                interval = settings.LIVE_IDLE_POLL_INTERVAL
+                try:
+                    # Also keeps the match cached for the detail endpoint, and shares the scrape with it
+                    match = await cache.load_through("match", id, lambda: matches.match_by_id(id), cache.match_ttl)
+                except Exception:
+                    logging.exception(f"Failed to poll match `{id}`")
+                    metrics.incr("live.poll.error")
+                else:
+                    data = utils.to_json(match)
+                    current = json.loads(data)
+                    if previous is None:
+                        await publish(id, "snapshot", data)
+                    elif diff := diff_match(previous, current):
+                        await publish(id, "diff", utils.to_json(diff))
+                        metrics.incr("live.diff")
+                    await client.set(state_key, data, ex=settings.LIVE_STATE_TTL)
+                    previous = current
+
+                    status = current["event"]["status"]
+                    if status in FINISHED:
+                        await publish(id, "end", utils.to_json({"status": status}))
+                        break
+                    if status == MatchStatus.LIVE:
+                        interval = settings.LIVE_POLL_INTERVAL
+
+                await asyncio.sleep(interval)
+                [(_, subscribers)] = await client.pubsub_numsub(CHANNEL_KEY.format(id))
+                if not subscribers:
+                    break
+            else:
+                logging.warning(f"Lost the poller lease for match `{id}`")
+    finally:
+        await client.eval(cache.RELEASE_LOCK_SCRIPT, 1, poller_key, token)
+
+
+async def ensure_poller(id: str) -> None:
+    """
+    Function to start polling a match in this worker, unless some worker already is
+
+    :param id: The match ID
+    :return: Nothing
+    """
+    if id in _pollers:
+        return
+    token = uuid.uuid4().hex
+    if not await cache.get_client().set(
+        POLLER_KEY.format(id), token, px=int(settings.LIVE_POLLER_LEASE * 1000), nx=True
+    ):
+        return
+    task = asyncio.create_task(poll(id, token))
+    _pollers[id] = task
+    task.add_done_callback(lambda task: _poller_done(id, task))
+
+
+def _poller_done(id: str, task: asyncio.Task) -> None:
+    """
+    Callback for pollers, so that failures get logged instead of lost
+
+    :param id: The match ID
+    :param task: The finished poller
+    :return: Nothing
+    """
+    _pollers.pop(id, None)
+    if not task.cancelled() and (exc := task.exception()) is not None:
+        logging.error(f"Poller for match `{id}` failed", exc_info=exc)
+
+
+async def _read() -> None:
+    """
+    Function to hand the messages of this worker's pubsub connection to the local subscribers
+
+    :return: Nothing
+    """
+    prefix = CHANNEL_KEY.format("")
+    while (pubsub := _pubsub) is not None:
+        try:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+        except Exception:
+            # The connection is re-established (and the channels re-subscribed) on the next read
+            logging.exception("Failed to read live match messages")
+            await asyncio.sleep(1.0)
+            continue
+        if message is None or message["type"] != "message":
+            continue
+        id = message["channel"].decode().removeprefix(prefix)
+        for queue in _subscribers.get(id, ()):
+            queue.put_nowait(message["data"].decode())
+
+
+async def subscribe(id: str) -> asyncio.Queue:
+    """
+    Function to start receiving the messages published for a match
+
+    :param id: The match ID
+    :return: The queue the messages are put on
+    """
+    global _pubsub, _reader
+    queue: asyncio.Queue = asyncio.Queue()
+    if id not in _subscribers:
+        _subscribers[id] = set()
+        if _pubsub is None:
+            _pubsub = cache.get_client().pubsub()
+        await _pubsub.subscribe(CHANNEL_KEY.format(id))
+        # Reading before the first subscription fails, as there's no connection yet
+        if _reader is None:
+            _reader = asyncio.create_task(_read())
+    _subscribers[id].add(queue)
+    return queue
+
+
+async def unsubscribe(id: str, queue: asyncio.Queue) -> None:
+    """
+    Function to stop receiving the messages published for a match
+
+    :param id: The match ID
+    :param queue: The queue returned by `subscribe`
+    :return: Nothing
+    """
+    queues = _subscribers.get(id, set())
+    queues.discard(queue)
+    if not queues and _subscribers.pop(id, None) is not None and _pubsub is not None:
+        await _pubsub.unsubscribe(CHANNEL_KEY.format(id))
+
+
+def event(type: str, data: str) -> str:
+    """
+    Function to format a server-sent event
+
+    :param type: The event type
+    :param data: The event data, as single line JSON
+    :return: The event
+    """
+    return f"event: {type}\ndata: {data}\n\n"
+
+
+async def stream(id: str) -> AsyncIterator[str]:
+    """
+    Function to stream the live updates of a match as server-sent events
+
+    The stream starts with a snapshot of the match, followed by diffs as it changes, and ends with an `end` event once
+    the match is over.
+
+    :param id: The match ID
+    :return: The events
+    """
+    queue = await subscribe(id)
+    try:
+        if (state := await cache.get_client().get(STATE_KEY.format(id))) is not None:
+            yield event("snapshot", state.decode())
+            if (status := json.loads(state)["event"]["status"]) in FINISHED:
+                yield event("end", utils.to_json({"status": status}))
+                return
+        await ensure_poller(id)
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), settings.LIVE_KEEPALIVE)
+            except asyncio.TimeoutError:
+                # Take over if the worker that was polling went away
+                await ensure_poller(id)
+                yield ": keepalive\n\n"
+                continue
+            type, _, data = message.partition("\n")
+            yield event(type, data)
+            if type == "end":
+                return
+    finally:
+        await unsubscribe(id, queue)
+
+
+async def stop() -> None:
+    """
+    Function to stop polling and close the pubsub connection, should be called once on shutdown
+
+    :return: Nothing
+    """
+    global _pubsub, _reader
+    # The reader also stops by itself once the connection is gone, a cancellation can get lost in a blocking read
+    pubsub, _pubsub = _pubsub, None
+    tasks = list(_pollers.values())
+    if _reader is not None:
+        tasks.append(_reader)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if pubsub is not None:
+        await pubsub.close()
+    _reader = None
+    _subscribers.clear()
@@ -1,23 +1,20 @@
 import logging
-import sys
+import math
 
 import sentry_sdk
-from brotli_asgi import BrotliMiddleware
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse
 from sentry_sdk.integrations.fastapi import FastApiIntegration
 from sentry_sdk.integrations.starlette import StarletteIntegration
 
+from app import cache, live, parsing, store, upstream
 from app.api import deps
+from app.api.compression import BrotliMiddleware
 from app.api.v1.api import router
 from app.core.config import settings
-from app.cron import arq_worker
+from app.core.logs import setup_logging
 
-logging.basicConfig(
-    format="[%(levelname)s] (%(asctime)s) %(module)s:%(pathname)s:%(funcName)s:%(lineno)s:: %(message)s",
-    level=logging.INFO,
-    datefmt="%d-%m-%y %H:%M:%S",
-    stream=sys.stdout,
-)
+setup_logging()
 
 # Initialize Sentry SDK if a DSN is defined in our environment
 if settings.SENTRY_DSN:
@@ -31,19 +28,42 @@ if settings.SENTRY_DSN:
     )
 
 app = FastAPI(title="Scraper", description="Scraper for VLR.gg that exposes a REST API for some data available there")
-app.add_middleware(BrotliMiddleware)
+# Cached list payloads come pre-compressed, so responses that are already encoded are left alone. Live streams would
+# be buffered by it.
+app.add_middleware(
+    BrotliMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE, excluded_handlers=[r"/matches/[^/]+/live$"]
+)
+
+
+@app.exception_handler(upstream.Unavailable)
+async def upstream_unavailable(_: Request, exc: upstream.Unavailable) -> JSONResponse:
+    headers = {"Retry-After": str(math.ceil(exc.retry_after))} if exc.retry_after else None
+    return JSONResponse({"detail": "VLR is unavailable, please retry later"}, status_code=503, headers=headers)
 
 
 @app.on_event("startup")
 async def app_start() -> None:
-    logging.info("Starting arq worker")
-    await arq_worker.start(handle_signals=False)
+    logging.info("Starting redis connection pool")
+    await cache.start()
+    await cache.start_local_cache()
+    logging.info("Starting upstream HTTP client")
+    await upstream.start()
+    await parsing.start()
+    logging.info("Opening results database")
+    await store.start()
 
 
 @app.on_event("shutdown")
 async def app_stop() -> None:
-    logging.info("Stopping arq worker")
-    await arq_worker.stop()
+    logging.info("Stopping live match pollers")
+    await live.stop()
+    logging.info("Stopping parse executor")
+    await parsing.stop()
+    logging.info("Stopping upstream HTTP client")
+    await upstream.stop()
+    logging.info("Stopping redis connection pool")
+    await cache.stop_local_cache()
+    await cache.stop()
 
 
 if settings.SECRET_KEY:
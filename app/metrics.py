@@ -0,0 +1,57 @@
+import os
+from collections import defaultdict
+from typing import Callable
+
+counters: dict[str, int] = defaultdict(int)
+timings: dict[str, dict[str, float]] = {}
+gauges: dict[str, Callable[[], float]] = {}
+
+
+def incr(name: str, amount: int = 1) -> None:
+    """
+    Function to bump a counter
+
+    :param name: The counter name
+    :param amount: How much to add
+    :return: Nothing
+    """
+    counters[name] += amount
+
+
+def observe(name: str, value: float) -> None:
+    """
+    Function to record a duration (or any other sample) against a timing
+
+    :param name: The timing name
+    :param value: The sample, in seconds for durations
+    :return: Nothing
+    """
+    timing = timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+    timing["count"] += 1
+    timing["total"] += value
+    timing["max"] = max(timing["max"], value)
+
+
+def gauge(name: str, func: Callable[[], float]) -> None:
+    """
+    Function to register a gauge, which is read whenever a snapshot is taken
+
+    :param name: The gauge name
+    :param func: Callable returning the current value
+    :return: Nothing
+    """
+    gauges[name] = func
+
+
+def snapshot() -> dict:
+    """
+    Function to get the current metrics of this process
+
+    :return: The counters, timings and gauges
+    """
+    return {
+        "pid": os.getpid(),
+        "counters": dict(counters),
+        "timings": {name: dict(timing) for name, timing in timings.items()},
+        "gauges": {name: func() for name, func in gauges.items()},
+    }
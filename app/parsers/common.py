@@ -0,0 +1,107 @@
+import threading
+from typing import Any
+
+from lxml import etree
+
+# BeautifulSoup keeps the text of these elements (and everything in them) out of `get_text()`
+STRING_CONTAINERS = ("script", "style", "template", "rt", "rp")
+
+NEXT_DIV = etree.XPath("(descendant::div | following::div)[1]")
+# BeautifulSoup collapses whitespace-only strings into a newline (or a space), except inside these
+BLANK_TEXT = etree.XPath("//text()[normalize-space()=''][not(ancestor::pre or ancestor::textarea)]")
+
+_local = threading.local()
+
+
+def parse(content: bytes) -> Any:
+    """
+    Function to build an lxml tree out of a page, equivalent to the one BeautifulSoup builds with its lxml builder
+
+    :param content: The HTML
+    :return: The root element
+    """
+    if (parser := getattr(_local, "parser", None)) is None:
+        # Parsers aren't safe to share between threads, so each parse worker gets its own
+        parser = _local.parser = etree.HTMLParser(recover=True, strip_cdata=False, encoding="utf-8")
+
+    root = etree.fromstring(content, parser)
+    for blank in BLANK_TEXT(root):
+        collapsed = "\n" if "\n" in blank else " "
+        if blank == collapsed:
+            continue
+        if blank.is_tail:
+            blank.getparent().tail = collapsed
+        else:
+            blank.getparent().text = collapsed
+    for container in root.iter(*STRING_CONTAINERS):
+        for element in container.iter(etree.Element):
+            element.text = None
+            if element is not container:
+                element.tail = None
+    return root
+
+
+def text(element: Any) -> str:
+    """
+    Function to get the text of an element, the same way BeautifulSoup's `get_text()` does
+
+    :param element: The element
+    :return: The text
+    """
+    return "".join(element.itertext())
+
+
+def has_class(class_: str) -> str:
+    """
+    Function to build an XPath predicate that matches the `class` attribute like BeautifulSoup's `class_` does. A single
+    class matches any of the element's classes, several classes have to match the whole attribute.
+
+    :param class_: The class(es)
+    :return: The predicate
+    """
+    if " " in class_:
+        return f"normalize-space(@class)='{class_}'"
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_} ')"
+
+
+def find_all(name: str, class_: str | None = None) -> etree.XPath:
+    """
+    Function to compile a selector equivalent to BeautifulSoup's `find_all(name, class_=class_)`
+
+    :param name: The tag name
+    :param class_: The class(es) the elements should have
+    :return: The compiled selector
+    """
+    return etree.XPath(f".//{name}[{has_class(class_)}]" if class_ else f".//{name}")
+
+
+def find(name: str, class_: str | None = None) -> etree.XPath:
+    """
+    Function to compile a selector equivalent to BeautifulSoup's `find(name, class_=class_)`, use it with `first`
+
+    :param name: The tag name
+    :param class_: The class(es) the element should have
+    :return: The compiled selector
+    """
+    return etree.XPath(f"(.//{name}[{has_class(class_)}])[1]" if class_ else f"(.//{name})[1]")
+
+
+def first(selector: etree.XPath, element: Any) -> Any:
+    """
+    Function to get the first element a selector matches
+
+    :param selector: The compiled selector
+    :param element: The element to search in
+    :return: The first match, or None if nothing matched
+    """
+    return next(iter(selector(element)), None)
+
+
+def find_next(element: Any) -> Any:
+    """
+    Function to get the next div in the document, equivalent to BeautifulSoup's `find_next("div")`
+
+    :param element: The element to start from
+    :return: The next div, or None if there isn't one
+    """
+    return first(NEXT_DIV, element)
@@ -0,0 +1,234 @@
+import itertools
+from typing import Any
+
+from app import schemas, utils
+from app.constants import EventStatus
+from app.parsers.common import find, find_all, first, parse, text
+
+IMG = find("img")
+ALL_TRS = find_all("tr")
+ALL_TDS = find_all("td")
+ALL_ANCHORS = find_all("a")
+TBODY = find("tbody")
+
+EVENTS_COL = find_all("div", "events-container-col")
+EVENT_CARD = find_all("a", "wf-card")
+EVENT_TITLE = find_all("div", "event-item-title")
+EVENT_STATUS = find_all("span", "event-item-desc-item-status")
+PRIZE = find_all("div", "mod-prize")
+DATES = find_all("div", "mod-dates")
+LOCATION = find_all("div", "mod-location")
+FLAG = find_all("i", "flag")
+THUMB = find_all("div", "event-item-thumb")
+
+HEADER = find_all("div", "event-header")
+TITLE = find_all("h1", "wf-title")
+SUBTITLE = find_all("h2", "event-desc-subtitle")
+DESC_VALUE = find_all("div", "event-desc-item-value")
+HEADER_THUMB = find_all("div", "event-header-thumb")
+PRIZES_TABLE = find_all("table", "wf-table")
+TEAMS_CONTAINER = find_all("div", "event-teams-container")
+SIDEBAR_MATCHES = find("div", "event-sidebar-matches")
+LARGE_LABEL = find_all("h2", "wf-label mod-large")
+
+CARD = find_all("div", "wf-card")
+DAY_LABEL = find_all("div", "wf-label mod-large")
+STANDING_TEAM_NAME = find_all("div", "standing-item-team-name")
+TEXT_LIGHT = find_all("div", "ge-text-light")
+
+MATCH_ITEM = find_all("a", "match-item")
+MATCH_TIME = find_all("div", "match-item-time")
+MATCH_STATUS = find_all("div", "ml-status")
+MATCH_TEAM = find_all("div", "match-item-vs-team")
+MATCH_TEAM_NAME = find_all("div", "match-item-vs-team-name")
+MATCH_TEAM_FLAG = find_all("span", "flag")
+MATCH_TEAM_SCORE = find_all("div", "match-item-vs-team-score")
+MATCH_ETA = find_all("div", "ml-eta")
+MATCH_EVENT = find_all("div", "match-item-event text-of")
+
+EVENT_TEAM = find_all("div", "wf-card event-team")
+EVENT_TEAM_NAME = find_all("a", "event-team-name")
+EVENT_TEAM_IMG = find_all("img", "event-team-players-mask-team")
+SEED = find_all("div", "wf-module-item")
+
+
+def parse_events_page(content: bytes) -> list[schemas.Event]:
+    """
+    Parse the page with the list of events
+    :param content: The HTML
+    :return: Parsed list of events
+    """
+    root = parse(content)
+    return list(itertools.chain(*(convert_to_list(data) for data in EVENTS_COL(root))))
+
+
+def convert_to_list(events: Any) -> list[schemas.Event]:
+    """
+    Parse a list of events
+    :param events: The events
+    :return: The list of parsed events
+    """
+    return [parse_event(event) for event in EVENT_CARD(events)]
+
+
+def parse_event(event: Any) -> schemas.Event:
+    """
+    Parse an event
+    :param event: The HTML
+    :return: The event parsed
+    """
+    event_id = event.attrib["href"].split("/")[2]
+    title = text(EVENT_TITLE(event)[0]).strip()
+    status = text(EVENT_STATUS(event)[0]).strip()
+    prize = text(PRIZE(event)[0]).strip().replace("\t", "").split("\n")[0]
+    dates = text(DATES(event)[0]).strip().replace("\t", "").split("\n")[0]
+    location = FLAG(LOCATION(event)[0])[0].get("class").split()[1].replace("mod-", "")
+    img = utils.get_image_url(first(IMG, THUMB(event)[0]).attrib["src"])
+    return schemas.Event(id=event_id, title=title, status=status, prize=prize, dates=dates, location=location, img=img)
+
+
+def parse_event_page(content: bytes, id: str) -> dict:
+    """
+    Function to parse the page of a given event
+    :param content: The HTML
+    :param id: The ID of the event
+    :ret: Dict of the parsed data
+    """
+    event: dict[str, str | list] = {"id": id}
+    root = parse(content)
+
+    header = HEADER(root)[0]
+    event["title"] = text(TITLE(header)[0]).strip()
+    event["subtitle"] = text(SUBTITLE(header)[0]).strip()
+    event_desc_item_value = DESC_VALUE(header)
+    event["dates"] = text(event_desc_item_value[0]).strip()
+    event["prize"] = text(event_desc_item_value[1]).strip().replace("\t", "").replace("\n", " ")
+    event["location"] = text(event_desc_item_value[2]).strip() or FLAG(event_desc_item_value[2])[0].get(
+        "class"
+    ).split()[1].replace("mod-", "")
+    event["img"] = utils.get_image_url(first(IMG, HEADER_THUMB(header)[0]).attrib["src"])
+
+    if prizes_data := PRIZES_TABLE(root):
+        event["prizes"] = prizes_parser(prizes_data[-1])
+
+    if teams_container := TEAMS_CONTAINER(root):
+        event["teams"] = parse_team_data(teams_container[0])
+
+    match_data = LARGE_LABEL(first(SIDEBAR_MATCHES, root))
+
+    match len(match_data):
+        case 2:
+            event["status"] = EventStatus.ONGOING
+        case 1:
+            if text(match_data[0]).strip().split(" ")[0].lower() == "upcoming":
+                event["status"] = EventStatus.UPCOMING
+            else:
+                event["status"] = EventStatus.COMPLETED
+        case _:
+            event["status"] = EventStatus.UNKNOWN
+
+    return event
+
+
+def parse_event_matches_page(content: bytes) -> list:
+    """
+    Function to parse the matches page of a given event
+    :param content: The HTML
+    :return: The parsed matches
+    """
+    root = parse(content)
+    cards = CARD(root)
+    return list(
+        itertools.chain(
+            *(
+                match_parser(cards[day + 1], text(date).strip().replace("\n", "").replace("\t", ""))
+                for (day, date) in enumerate(DAY_LABEL(root))
+            )
+        )
+    )
+
+
+def prizes_parser(prizes_table: Any) -> list[dict[str, str | dict[str, str]]]:
+    """
+    Parse prize data
+    :param prizes_table: The HTML
+    :return: The parsed data as a list
+    """
+    prizes = []
+
+    for row in ALL_TRS(first(TBODY, prizes_table))[:3]:
+        prize = {}
+        row_data = ALL_TDS(row)
+        prize["position"] = text(row_data[0]).strip()
+        prize["prize"] = text(row_data[1]).strip().replace("\t", "")
+        team_row = row_data[2]
+        if team_row_anchor := ALL_ANCHORS(team_row):
+            prize["team"] = {
+                "name": text(STANDING_TEAM_NAME(team_row)[0]).strip().split("\n")[0].strip(),
+                "id": team_row_anchor[0].attrib["href"].split("/")[2],
+                "country": text(TEXT_LIGHT(team_row)[0]).strip(),
+                "img": utils.get_image_url(first(IMG, team_row).attrib["src"]),
+            }
+        prizes.append(prize)
+    return prizes
+
+
+def match_parser(day_matches: Any, date: str) -> list[dict[str, str | list[str]]]:
+    """
+    Parse match data
+    :param day_matches: The HTML
+    :param date: The match date
+    :return: The parsed data as a list
+    """
+    matches = []
+    for match_data in MATCH_ITEM(day_matches):
+        match = {
+            "id": match_data.attrib["href"].split("/")[1],
+            "time": text(MATCH_TIME(match_data)[0]).strip(),
+            "status": text(MATCH_STATUS(match_data)[0]).strip().lower(),
+            "date": date,
+        }
+        team_data = []
+        for team in MATCH_TEAM(match_data):
+            data = {
+                "name": text(MATCH_TEAM_NAME(team)[0]).strip(),
+                "region": MATCH_TEAM_FLAG(team)[0].get("class").split()[1].replace("mod-", ""),
+            }
+            score_data = text(MATCH_TEAM_SCORE(team)[0]).strip()
+            if score_data.isdigit():
+                data["score"] = int(score_data)
+            team_data.append(data)
+        match["teams"] = team_data
+        if match["status"] not in ("live", "tbd"):
+            match["eta"] = text(MATCH_ETA(match_data)[0]).strip()
+
+        match_item_event = text(MATCH_EVENT(match_data)[0]).strip().split("\n")
+        match["round"] = match_item_event[0].strip()
+        match["stage"] = match_item_event[1].strip()
+        matches.append(match)
+    return matches
+
+
+def parse_team_data(team_data: Any) -> list[dict[str, str]]:
+    """
+    Function to parse team data
+    :param team_data: The HTML
+    :return: The parsed result as a list
+    """
+    participants = []
+    for team in EVENT_TEAM(team_data):
+        event_team_name = EVENT_TEAM_NAME(team)[0]
+        name = text(event_team_name).strip()
+        if name.lower() == "tbd":
+            continue
+        participant = {
+            "name": name,
+            "id": event_team_name.attrib["href"].split("/")[2],
+            "img": utils.get_image_url(EVENT_TEAM_IMG(team)[0].attrib["src"]),
+        }
+
+        if seed_data := SEED(team):
+            participant["seed"] = text(seed_data[0]).strip()
+
+        participants.append(participant)
+    return participants
@@ -0,0 +1,390 @@
+from datetime import datetime
+from itertools import chain
+from typing import Any, Tuple
+from zoneinfo import ZoneInfo
+
+import dateutil.parser
+
+from app import schemas, utils
+from app.parsers.common import find, find_all, first, parse, text
+
+A = find("a")
+DIV = find("div")
+IMG = find("img")
+SPAN = find("span")
+ALL_DIVS = find_all("div")
+ALL_IMGS = find_all("img")
+ALL_TRS = find_all("tr")
+ALL_TBODIES = find_all("tbody")
+
+VM_STATS = find_all("div", "vm-stats")
+MATCH_HEADER_VS = find_all("div", "match-header-vs")
+MATCH_HEADER_NOTE = find_all("div", "match-header-note")
+STREAMS_BETS_CONTAINER = find("div", "match-streams-bets-container")
+H2H = find("div", "wf-card match-h2h")
+
+TITLE_MED = find_all("div", "wf-title-med")
+HEADER_LINK = find_all("a", "match-header-link")
+HEADER_VS_SCORE = find_all("div", "match-header-vs-score")
+SPOILER = find_all("div", "js-spoiler")
+
+HEADER_SUPER = find("div", "match-header-super")
+HEADER_EVENT = find("a", "match-header-event")
+MOMENT = find_all("div", "moment-tz-convert")
+VS_NOTE_UPCOMING = find("span", "match-header-vs-note mod-upcoming")
+VS_NOTE = find("div", "match-header-vs-note")
+EVENT_SERIES = find_all("div", "match-header-event-series")
+TOOLTIP = find_all("div", "wf-tooltip")
+
+STREAMS = find("div", "match-streams")
+STREAM_CARDS = find_all("div", "wf-card")
+STREAM_EXTERNAL = find("a", "match-streams-btn-external")
+VODS = find("div", "match-vods")
+VOD_CARDS = find_all("a", "wf-card")
+
+GAMESNAV_ITEM = find_all("div", "vm-stats-gamesnav-item")
+MAP = find_all("div", "map")
+GAME = find_all("div", "vm-stats-game")
+DISABLED = find_all("div", "mod-disabled")
+TEAM_NAME = find_all("div", "team-name")
+SCORE = find_all("div", "score")
+ROUNDS = find("div", "vlr-rounds")
+ROUNDS_TEAM = find_all("div", "team")
+ROUNDS_COL = find_all("div", "vlr-rounds-row-col")
+CURRENT_SCORE = find_all("div", "rnd-currscore")
+WIN = find_all("div", "mod-win")
+ROUND_NUMBER = find_all("div", "rnd-num")
+
+PLAYER = find_all("td", "mod-player")
+STAT = find_all("td", "mod-stat")
+AGENTS = find_all("td", "mod-agents")
+TEXT_LIGHT = find_all("div", "ge-text-light")
+TEXT_OF = find_all("div", "text-of")
+SIDE_BOTH = find("span", "side mod-side mod-both")
+T_SIDE_BOTH = find("span", "side mod-both")
+BOTH = find("span", "mod-both")
+
+H2H_TEAM = find_all("a", "match-h2h-header-team")
+H2H_ITEM = find_all("a", "wf-module-item mod-h2h")
+H2H_SCORE_A = find("span", "rf")
+H2H_SCORE_B = find("span", "ra")
+
+LABEL = find_all("div", "wf-label")
+CARD = find_all("div", "wf-card")
+MODULE_ITEM = find_all("a", "wf-module-item")
+STATUS = find("div", "ml-status")
+TIME = find("div", "match-item-time")
+EVENT = find("div", "match-item-event")
+EVENT_SERIES_TEXT = find("div", "match-item-event-series")
+TEAM_SCORE = find_all("div", "match-item-vs-team-score")
+
+
+def parse_match_page(content: bytes, skip: frozenset[str] = frozenset()) -> schemas.MatchWithDetails:
+    """
+    Function to parse a match's page
+    :param content: The HTML
+    :param skip: Sections that aren't needed and are left empty ("maps", "rounds", "members", "previous_encounters")
+    :return: The parsed match
+    """
+    root = parse(content)
+
+    map_ret = get_map_data(VM_STATS(root), skip) if "maps" not in skip else ([], 0)
+    return schemas.MatchWithDetails(
+        teams=get_team_data(MATCH_HEADER_VS(root)),
+        bans=get_ban_data(MATCH_HEADER_NOTE(root)),
+        event=get_event_data(root),
+        videos=get_video_data(first(STREAMS_BETS_CONTAINER, root)),
+        data=map_ret[0],
+        map_count=map_ret[1],
+        previous_encounters=get_previous_encounters_data(first(H2H, root)) if "previous_encounters" not in skip else [],
+    )
+
+
+def get_team_data(data: Any) -> list[dict]:
+    """
+    Function to parse team data
+    :param data: The data
+    :return: The parsed team data
+    """
+    match_header = data[0]
+    names = TITLE_MED(match_header)
+    images = HEADER_LINK(match_header)
+    if (match_data := HEADER_VS_SCORE(match_header)) and (match_data := SPOILER(match_data[0])):
+        match_score = (text(match_data[0]).replace("\n", "").replace("\t", "")).split(":")
+    else:
+        match_score = (None, None)
+
+    response = []
+    for i, score in enumerate(match_score):
+        data = {
+            "name": text(names[i]).strip().replace("\t", ""),
+            "img": utils.get_image_url(first(IMG, images[i]).attrib["src"]),
+            "score": score,
+        }
+        if team_url := images[i].get("href"):
+            data["id"] = team_url.split("/")[2]
+
+        response.append(data)
+    return response
+
+
+def get_ban_data(data: list) -> list:
+    """
+    Function to parse the notes from a match page on VLR
+    :param data: The notes
+    :return: The ban data from the notes
+    """
+    return [ban_data.strip() for ban_data in text(data[0]).split(";")] if data else []
+
+
+def get_event_data(root: Any) -> dict:
+    """
+    Function to extract event data from a match page on VLR
+    :param root: The page
+    :return: The parsed event data
+    """
+    event_data = first(HEADER_SUPER, root)
+    event_link = first(HEADER_EVENT, event_data)
+    event_date: datetime | None = None
+    if (date_str := " ".join([text(data).strip() for data in MOMENT(root)])) and "tbd" not in date_str.lower():
+        event_date = dateutil.parser.parse(date_str, ignoretz=True).astimezone(ZoneInfo("UTC"))
+
+    if first(VS_NOTE_UPCOMING, root) is not None:
+        status = "upcoming"
+    elif (status_data := first(VS_NOTE, root)) is not None:
+        status = text(status_data).strip().replace("\t", "").replace("\n", "").lower()
+    else:
+        status = None
+
+    ret = {
+        "id": event_link.attrib["href"].split("/")[2],
+        "img": utils.get_image_url(first(IMG, event_link).attrib["src"]),
+        "series": text(ALL_DIVS(ALL_DIVS(event_link)[0])[0]).strip(),
+        "stage": text(EVENT_SERIES(event_link)[0]).strip().replace("\t", "").replace("\n", ""),
+        "date": event_date,
+        "status": status,
+    }
+    if (patch_data := TOOLTIP(event_data)) and "patch" in (patch_data := text(patch_data[-1]).strip().lower()):
+        ret["patch"] = patch_data.split("\n")[0].replace("\t", "")
+    return ret
+
+
+def get_video_data(data: Any) -> dict[str, list]:
+    """
+    Function to extract information about stream/VOD links from a match page on VLR
+    :param data: The data about the videos
+    :return: The parsed URLs
+    """
+    response: dict[str, list] = {
+        "streams": [
+            {
+                "name": text(name).strip(),
+                "url": url.get("href"),
+            }
+            for stream in STREAM_CARDS(first(STREAMS, data))
+            if (name := first(SPAN, stream)) is not None and (url := first(STREAM_EXTERNAL, stream)) is not None
+        ],
+        "vods": [{"name": text(vod).strip(), "url": vod.get("href")} for vod in VOD_CARDS(first(VODS, data))],
+    }
+
+    return response
+
+
+def get_map_data(data: list, skip: frozenset[str] = frozenset()) -> Tuple[list, int]:
+    """
+    Function to extract information about a map from a match page on VLR
+    :param data: The data about the maps
+    :param skip: Sections that aren't needed and are left empty ("rounds", "members")
+    :return: The parsed data
+    """
+    stats = data[0]
+
+    maps = {
+        map_data.attrib["data-game-id"]: "".join(
+            i for i in text(map_data).strip().replace("\n", "").replace("\t", "") if not i.isdigit()
+        )
+        for map_data in GAMESNAV_ITEM(stats)
+    }
+    if maps == {}:
+        maps = {stats.attrib["data-game-id"]: text(first(SPAN, MAP(stats)[0])).strip()}
+        map_stats = GAME(stats)[0]
+        map_count = 1
+    else:
+        map_stats = GAME(stats)
+        map_count = len(maps) - 1 - len(DISABLED(stats))
+    map_ret = []
+    for map_data in map_stats:
+        if (match_map_id := map_data.attrib["data-game-id"]) == "all" or maps.get(match_map_id) == "TBD":
+            continue
+        teams = [
+            {
+                "name": text(TEAM_NAME(map_data)[i]).strip(),
+                "score": text(SCORE(map_data)[i]).strip(),
+            }
+            for i in range(2)
+        ]
+        team_short_name = [
+            text(elem).strip().replace("\n", "").replace("\t", "") for elem in ROUNDS_TEAM(first(ROUNDS, map_data))
+        ]
+        team_name_mapping = {short: long["name"] for short, long in zip(team_short_name, teams)}
+        rounds = []
+        prev: tuple[int, ...] = (0, 0)
+        for round_data in ROUNDS_COL(map_data)[1:] if "rounds" not in skip else []:
+            if round_current_score := CURRENT_SCORE(round_data):
+                round_score = text(round_current_score[0]).strip()
+                side, round_winner = "", ""
+                if round_score != "":
+                    current = tuple(map(int, round_score.split("-")))
+                    if prev[0] == current[0]:
+                        round_winner = "team2"
+                    elif prev[1] == current[1]:
+                        round_winner = "team1"
+
+                    prev = current
+                if round_win_data := WIN(round_data):
+                    side = {
+                        "mod-t": "attack",
+                        "mod-ct": "defense",
+                    }.get(round_win_data[0].get("class").split()[2], "Unknown")
+
+                    win_type = {
+                        "elim": "Elimination",
+                        "time": "Time out",
+                        "defuse": "Defused",
+                        "boom": "Spike exploded",
+                    }.get(first(IMG, round_win_data[0]).get("src", "").split("/")[-1].split(".")[0], "Not played")
+                else:
+                    win_type = "Not Played"
+                rounds.append(
+                    {
+                        "round_number": text(ROUND_NUMBER(round_data)[0]).strip(),
+                        "round_score": round_score,
+                        "winner": round_winner,
+                        "side": side,
+                        "win_type": win_type,
+                    }
+                )
+
+        map_ret.append(
+            {
+                "map": maps.get(match_map_id),
+                "teams": teams,
+                "members": list(
+                    chain(*(parse_scoreboard(element, team_name_mapping) for element in ALL_TBODIES(map_data)))
+                )
+                if "members" not in skip
+                else [],
+                "rounds": rounds,
+            }
+        )
+    return map_ret, map_count
+
+
+def parse_scoreboard(data: Any, team_name_mapping: dict[str, str]) -> list:
+    ret = []
+    for team in ALL_TRS(data):
+        data = PLAYER(team)[0]
+        stats = STAT(team)
+        team_name_short = text(TEXT_LIGHT(data)[0]).strip()
+        ret.append(
+            {
+                "id": first(A, data).get("href").split("/")[-2],
+                "name": text(TEXT_OF(data)[0]).strip(),
+                "team": team_name_mapping.get(team_name_short, team_name_short),
+                "agents": [
+                    {"title": agent.attrib["title"], "img": utils.get_image_url(agent.attrib["src"])}
+                    for agent in ALL_IMGS(AGENTS(team)[0])
+                ],
+                "acs": text(first(SIDE_BOTH, stats[0])).strip() or 0,
+                "kills": text(first(SIDE_BOTH, stats[1])).strip() or 0,
+                "deaths": text(first(T_SIDE_BOTH, stats[2])).strip().replace("/", "").replace("\xa0", "") or 0,
+                "assists": text(first(T_SIDE_BOTH, stats[3])).strip() or 0,
+                "kast": text(first(T_SIDE_BOTH, stats[5])).strip()[:-1] or 0,
+                "adr": text(first(T_SIDE_BOTH, stats[6])).strip() or 0,
+                "headshot_percent": text(first(T_SIDE_BOTH, stats[7])).strip()[:-1] or 0,
+                "first_kills": text(first(T_SIDE_BOTH, stats[8])).strip() or 0,
+                "first_deaths": text(first(T_SIDE_BOTH, stats[9])).strip() or 0,
+                "first_kills_diff": text(first(BOTH, stats[10])).strip() or 0,
+            }
+        )
+    return ret
+
+
+def get_previous_encounters_data(data: Any) -> list[dict]:
+    """
+    :param data: Previous encounters data
+    :return: List of match IDs
+    """
+    response = []
+    if data is not None:
+        team_a, team_b = [text(first(DIV, team)).strip() for team in H2H_TEAM(data)]
+        for match_link in H2H_ITEM(data):
+            match_obj = {
+                "match_id": match_link.attrib["href"].split("/")[1],
+                "teams": [
+                    {"name": team_a, "score": text(first(H2H_SCORE_A, match_link)).strip()},
+                    {"name": team_b, "score": text(first(H2H_SCORE_B, match_link)).strip()},
+                ],
+            }
+            response.append(match_obj)
+    return response
+
+
+def parse_matches_page(content: bytes) -> list[schemas.Match]:
+    """
+    Function to parse a page with a list of matches (upcoming or completed)
+    :param content: The HTML
+    :return: The parsed matches
+    """
+    root = parse(content)
+
+    return parse_matches(LABEL(root), CARD(root))
+
+
+def parse_matches(dates: list, match_data: list) -> list[schemas.Match]:
+    """
+    Function to parse a list of matches
+    :param dates: The dates on which the matches were/will be held
+    :param match_data: The matches
+    :return: The parsed matches
+    """
+    return [parse_match(date, match) for date, matches in zip(dates, match_data[1:]) for match in MODULE_ITEM(matches)]
+
+
+def parse_match(date: Any, match_info: Any) -> schemas.Match:
+    """
+    Function to parse a given match
+    :param date: The match's date
+    :param match_info: The match to parse
+    :return: The parsed match
+    """
+    team_names = TEXT_OF(match_info)
+    team_scores = TEAM_SCORE(match_info)
+    status = text(first(STATUS, match_info)).strip().lower()
+    date = text(date).split("\n")[1].strip().replace("\t", "").replace("\n", "")
+    time = text(first(TIME, match_info)).strip()
+    if time == "TBD":
+        date_string = date
+    else:
+        date_string = date + " " + time
+
+    return schemas.Match(
+        team1=schemas.MatchTeam(name=text(team_names[0]).strip(), score=parse_score(team_scores[0])),
+        team2=schemas.MatchTeam(name=text(team_names[1]).strip(), score=parse_score(team_scores[1])),
+        status=status,
+        time=dateutil.parser.parse(date_string, ignoretz=True).astimezone(ZoneInfo("UTC")),
+        id=match_info.get("href").split("/")[1],
+        event=text(first(EVENT, match_info)).split("\n")[-1].strip(),
+        series=text(first(EVENT_SERIES_TEXT, match_info)).strip(),
+    )
+
+
+def parse_score(data: Any) -> str | None:
+    """
+    Function that takes in an element to parse the score
+    :param data: The element
+    :return: The score if it exists, else None
+    """
+    if (score := text(data).strip()).isdigit():
+        return score
+    return None
@@ -0,0 +1,34 @@
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import dateutil.parser
+
+from app import schemas
+from app.constants import PREFIX
+from app.parsers.common import find_all, parse, text
+
+ALL_DIVS = find_all("div")
+NEWS_ITEM = find_all("a", "wf-module-item")
+
+
+def parse_news_page(content: bytes) -> list[schemas.NewsItem]:
+    """
+    Function to parse the news page
+    :param content: The HTML
+    :return: The parsed news
+    """
+    root = parse(content)
+
+    return [parse_news(news) for news in NEWS_ITEM(root)]
+
+
+def parse_news(data: Any) -> schemas.NewsItem:
+    title, description, metadata = [text(item).strip() for item in ALL_DIVS(ALL_DIVS(data)[0])]
+    metadata = metadata.split("•")
+    return schemas.NewsItem(
+        url=f"{PREFIX}{data.attrib['href']}",
+        title=title,
+        description=description,
+        author=metadata[-1].replace("by", "").strip(),
+        date=dateutil.parser.parse(metadata[1].strip(), ignoretz=True).astimezone(ZoneInfo("UTC")),
+    )
@@ -0,0 +1,113 @@
+from typing import Any
+
+from app import utils
+from app.parsers.common import find, find_all, find_next, first, parse, text
+
+A = find("a")
+DIV = find("div")
+H1 = find("h1")
+H2 = find("h2")
+IMG = find("img")
+SPAN = find("span")
+TBODY = find("tbody")
+ALL_ANCHORS = find_all("a")
+ALL_DIVS = find_all("div")
+ALL_H2S = find_all("h2")
+ALL_TDS = find_all("td")
+ALL_TRS = find_all("tr")
+
+HEADER = find("div", "player-header")
+SUMMARY_1 = find("div", "player-summary-container-1")
+SUMMARY_2 = find("div", "player-summary-container-2")
+COUNTRY = find("div", "ge-text-light")
+
+
+def parse_player_page(content: bytes) -> dict:
+    """
+    Function to parse a player's page
+    :param content: The HTML
+    :return: The parsed data
+    """
+    root = parse(content)
+    player_info = first(HEADER, root)
+    player_summary_container_1 = first(SUMMARY_1, root)
+    player_summary_container_2 = first(SUMMARY_2, root)
+
+    player_data = {
+        "alias": text(first(H1, player_info)).strip(),
+        "name": text(first(H2, player_info)).strip(),
+        "img": utils.get_image_url(first(IMG, player_info).attrib["src"]),
+        "country": text(first(COUNTRY, player_info)).strip(),
+        "agents": [parse_agent_data(ALL_TDS(agent)) for agent in ALL_TRS(first(TBODY, root))],
+    }
+
+    for header in ALL_H2S(player_summary_container_2):
+        if text(header).strip().lower() == "event placements":
+            player_data["total_winnings"] = text(first(SPAN, first(DIV, find_next(header))))[1:].replace(",", "")
+
+    for header in ALL_H2S(player_summary_container_1):
+        match text(header).strip().lower():
+            case "current teams":
+                current_team = first(A, find_next(header))
+                player_data["current_team"] = parse_team(current_team)
+            case "past teams":
+                player_data["past_teams"] = [
+                    parse_team(current_team) for current_team in ALL_ANCHORS(find_next(header))
+                ]
+
+    for link in ALL_ANCHORS(player_info):
+        if "twitter.com" in link.attrib["href"]:
+            player_data["twitter"] = text(link).strip()
+        elif "twitch.tv" in link.attrib["href"]:
+            player_data["twitch"] = link.attrib["href"]
+    return player_data
+
+
+def parse_team(team: Any) -> dict:
+    """
+    Function to parse one of a player's (current or past) teams
+    :param team: The team's link
+    :return: The parsed data
+    """
+    return {
+        "id": team.attrib["href"].split("/")[-2],
+        "name": text(first(DIV, ALL_DIVS(team)[1])).strip(),
+        "img": utils.get_image_url(first(IMG, team).attrib["src"]),
+    }
+
+
+def parse_agent_data(agent_data: list) -> dict:
+    """
+    Function to parse agent data from a player's page on VLR
+    :param agent_data: An agent table row
+    :return: The parsed data
+    """
+    img = first(IMG, agent_data[0])
+    count, percent = text(agent_data[1]).strip().split(" ")
+    response = {
+        "name": img.attrib["alt"],
+        "img": utils.get_image_url(img.attrib["src"]),
+        "count": count.replace("(", "").replace(")", ""),
+        "percent": percent[:-1],
+        "rounds": text(agent_data[2]).strip(),
+        "rating": text(agent_data[3]).strip() or 0,
+        "acs": text(agent_data[4]).strip(),
+        "kd": text(agent_data[5]).strip(),
+        "adr": text(agent_data[6]).strip() or 0,
+        "kast": text(agent_data[7]).strip()[:-1] or 0,
+        "kpr": text(agent_data[8]).strip(),
+        "apr": text(agent_data[9]).strip(),
+        "fkpr": text(agent_data[10]).strip(),
+        "fdpr": text(agent_data[11]).strip(),
+        "k": text(agent_data[12]).strip(),
+        "d": text(agent_data[13]).strip(),
+        "a": text(agent_data[14]).strip(),
+        "fk": text(agent_data[15]).strip(),
+        "fd": text(agent_data[16]).strip(),
+    }
+
+    # VLR, why would you put `nan` here instead of simply putting a 0?
+    if response["fdpr"] == "nan":
+        response["fdpr"] = 0
+
+    return response
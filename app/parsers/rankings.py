@@ -0,0 +1,58 @@
+from app import schemas, utils
+from app.constants import REGION_NAME_MAPPING
+from app.parsers.common import find, find_all, first, parse, text
+
+A = find("a")
+IMG = find("img")
+ALL_ANCHORS = find_all("a")
+
+REGIONS_NAV = find("div", "wf-nav mod-collapsible")
+RANK_ITEM = find_all("div", "rank-item wf-card fc-flex")
+RANK = find("div", "rank-item-rank")
+RATING = find("div", "rank-item-rating")
+COUNTRY = find("div", "rank-item-team-country")
+
+
+def parse_regions_page(content: bytes) -> list[str]:
+    """
+    Function to parse the paths of each region's page from the VLR.gg rankings page
+
+    :param content: The HTML
+    :return: The paths
+    """
+    root = parse(content)
+
+    return [
+        region.attrib["href"]
+        for region in ALL_ANCHORS(first(REGIONS_NAV, root))[1:]
+        if not region.attrib["href"].endswith("/gc")
+    ]
+
+
+def parse_rankings_page(content: bytes, path: str) -> schemas.Ranking:
+    """
+    Function to parse team data from a region's ranking page
+
+    :param content: The HTML
+    :param path: The path to the region's page on VLR
+    :return: The parsed data
+    """
+    root = parse(content)
+
+    region_name = path.split("/")[-1]
+    region_name = REGION_NAME_MAPPING.get(region_name.lower()) or " ".join(region_name.split("-")).title()
+
+    return schemas.Ranking(
+        region=region_name,
+        teams=[
+            schemas.TeamRanking(
+                name=first(A, team).attrib["data-sort-value"].strip(),
+                id=first(A, team).attrib["href"].split("/")[2],
+                logo=utils.get_image_url(first(IMG, team).attrib["src"]),
+                rank=text(first(RANK, team)),
+                points=text(first(RATING, team)).strip(),
+                country=text(first(COUNTRY, team)).strip(),
+            )
+            for team in RANK_ITEM(root)[:25]
+        ],
+    )
@@ -0,0 +1,141 @@
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import dateutil.parser
+
+from app import utils
+from app.parsers.common import find, find_all, find_next, first, parse, text
+
+A = find("a")
+H1 = find("h1")
+H2 = find("h2")
+IMG = find("img")
+ALL_ANCHORS = find_all("a")
+
+HEADER = find("div", "team-header")
+HEADER_LINKS = find("div", "team-header-links")
+HEADER_COUNTRY = find("div", "team-header-country")
+SUMMARY = find("div", "team-summary-container-1")
+RANK = find("div", "rank-num mod-")
+REGION = find("div", "rating-txt")
+ROSTER_ITEM = find_all("div", "team-roster-item")
+MATCH_ITEM = find_all("a", "wf-card fc-flex m-item")
+
+ALIAS = find("div", "team-roster-item-name-alias")
+PLAYER_IMG = find("div", "team-roster-item-img")
+REAL_NAME = find("div", "team-roster-item-name-real")
+ROLE = find("div", "team-roster-item-name-role")
+CAPTAIN = find("i", "fa fa-star")
+
+MATCH_EVENT = find("div", "m-item-event text-of")
+ETA = find("span", "rm-item-score-eta")
+RESULT = find("div", "m-item-result")
+DATE = find("div", "m-item-date")
+
+
+def parse_team_pages(
+    content: bytes, upcoming_matches_content: bytes | None, completed_matches_content: bytes | None
+) -> dict:
+    """
+    Function to parse a team's pages
+    :param content: The HTML of the team's page
+    :param upcoming_matches_content: The HTML of the team's upcoming matches page, None if they aren't needed
+    :param completed_matches_content: The HTML of the team's completed matches page, None if they aren't needed
+    :return: The parsed data
+    """
+    root = parse(content)
+    upcoming_matches = parse(upcoming_matches_content) if upcoming_matches_content is not None else None
+    completed_matches = parse(completed_matches_content) if completed_matches_content is not None else None
+
+    team_info = first(HEADER, root)
+    name = text(first(H1, team_info)).strip()
+    img = utils.get_image_url(first(IMG, team_info).attrib["src"])
+
+    tag = ""
+    website = None
+    twitter = None
+
+    if (tag_element := first(H2, team_info)) is not None:
+        tag = text(tag_element).strip()
+
+    for link in ALL_ANCHORS(first(HEADER_LINKS, root)):
+        if link := link.get("href"):
+            if "twitter.com" in link:
+                twitter = link
+            else:
+                website = link
+
+    country = text(first(HEADER_COUNTRY, root)).strip()
+
+    team_data = first(SUMMARY, root)
+
+    # Rank doesn't show up on VLR sometimes - not sure why. So we default to 0 if we can't find it.
+    if (rank_div := first(RANK, team_data)) is not None:
+        rank = text(rank_div).strip()
+    else:
+        rank = 0
+
+    if (region_div := first(REGION, team_data)) is not None:
+        region = text(region_div).strip()
+    else:
+        region = ""
+
+    return {
+        "name": name,
+        "tag": tag,
+        "img": img,
+        "website": website,
+        "twitter": twitter,
+        "country": country,
+        "rank": rank,
+        "region": region,
+        "roster": [parse_player(player) for player in ROSTER_ITEM(team_data)],
+        "upcoming": [parse_match(match) for match in MATCH_ITEM(upcoming_matches)]
+        if upcoming_matches is not None
+        else [],
+        "completed": [parse_match(match) for match in MATCH_ITEM(completed_matches)]
+        if completed_matches is not None
+        else [],
+    }
+
+
+def parse_player(player_data: Any) -> dict:
+    """
+    Function to parse a player's data from VLR
+    :param player_data: The HTML data
+    :return: The parsed data
+    """
+    response = {
+        "id": first(A, player_data).attrib["href"].split("/")[2],
+        "alias": text(first(ALIAS, player_data)).strip(),
+        "img": utils.get_image_url(first(IMG, first(PLAYER_IMG, player_data)).attrib["src"]),
+    }
+    if (name_div := first(REAL_NAME, player_data)) is not None:
+        response["name"] = text(name_div).strip()
+
+    if (role := first(ROLE, player_data)) is not None:
+        response["role"] = text(role).strip()
+    elif (role := first(CAPTAIN, player_data)) is not None:
+        response["role"] = role.attrib["title"]
+    return response
+
+
+def parse_match(match_data: Any) -> dict:
+    """
+    Function to parse a match's data from VLR
+    :param match_data: The HTML data
+    :return: The parsed data
+    """
+    event, *stage = [f for f in text(first(MATCH_EVENT, match_data)).strip().replace("\t", "").split("\n") if f]
+    response = {"event": event, "stage": "".join(stage), "id": match_data.attrib["href"].split("/")[1]}
+    if (eta := first(ETA, match_data)) is not None:
+        response["eta"] = text(eta).strip()
+        response["opponent"] = text(find_next(find_next(find_next(eta)))).strip().split("\n")[0].replace("\t", "")
+    elif (score := first(RESULT, match_data)) is not None:
+        response["score"] = text(score).strip().replace("\n", "")
+        response["opponent"] = (
+            text(find_next(find_next(find_next(find_next(score))))).strip().split("\n")[0].replace("\t", "")
+        )
+
+    response["date"] = dateutil.parser.parse(text(first(DATE, match_data)), ignoretz=True).astimezone(ZoneInfo("UTC"))
+    return response
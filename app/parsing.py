@@ -0,0 +1,158 @@
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app import metrics, utils
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_executor: Executor | None = None
+_pending = 0
+
+
+def create_executor() -> Executor:
+    """
+    Function to build the pool that HTML parsing runs on, so it never blocks the event loop
+
+    :return: The executor
+    """
+    if settings.PARSE_EXECUTOR == "process":
+        # Forking a process that's running an event loop (and possibly threads) isn't safe, so start clean ones
+        return ProcessPoolExecutor(max_workers=settings.PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers=settings.PARSE_WORKERS, thread_name_prefix="parser")
+
+
+async def start() -> None:
+    """
+    Function to create the process-wide parse executor, should be called once on startup
+
+    :return: Nothing
+    """
+    global _executor
+    if _executor is None:
+        logging.info(f"Starting {settings.PARSE_EXECUTOR} parse executor")
+        _executor = create_executor()
+
+
+async def stop() -> None:
+    """
+    Function to shut the parse executor down
+
+    :return: Nothing
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def get_executor() -> Executor:
+    """
+    Function to get the process-wide parse executor, creating it if startup hasn't run (scripts, shells)
+
+    :return: The executor
+    """
+    global _executor
+    if _executor is None:
+        _executor = create_executor()
+    return _executor
+
+
+def _timed(submitted: float, func: Callable[..., T], *args: Any) -> tuple[T, float, float]:
+    """
+    Function that wraps a parser on the executor's side, so that timings can be reported back from other processes
+
+    :param submitted: When the parser was submitted
+    :param func: The parser
+    :param args: The parser's arguments
+    :return: The parser's result, how long it waited in the queue and how long it took
+    """
+    started = time.time()
+    result = func(*args)
+    return result, started - submitted, time.time() - started
+
+
+def lxml_parser(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    Function to get the lxml version of a BeautifulSoup page parser, which lives in `app.parsers` under the same module
+    and function name
+
+    :param func: The BeautifulSoup parser
+    :return: The lxml parser
+    """
+    return getattr(importlib.import_module(f"app.parsers.{func.__module__.split('.')[-1]}"), func.__name__)
+
+
+def compare(func: Callable[..., T], alternative: Callable[..., T], *args: Any) -> tuple[T, bool]:
+    """
+    Function that runs a parser and its alternative on the same page, and checks that they agree
+
+    :param func: The parser whose result is returned
+    :param alternative: The parser to check
+    :param args: The parsers' arguments
+    :return: The parser's result, and whether the alternative produced the same output
+    """
+    result = func(*args)
+    name = f"{alternative.__module__}.{alternative.__name__}"
+    try:
+        alternative_result = alternative(*args)
+    except Exception:
+        logging.exception(f"{name} failed on a page {func.__module__}.{func.__name__} parsed")
+        return result, False
+
+    if not (same := utils.to_json(result) == utils.to_json(alternative_result)):
+        logging.warning(f"{name} doesn't match {func.__module__}.{func.__name__}: {alternative_result!r} != {result!r}")
+    return result, same
+
+
+async def run(func: Callable[..., T], *args: Any) -> T:
+    """
+    Function to run a parser on the parse executor, with the backend picked by `PARSER_BACKEND`
+
+    With a process pool, the parser must be a module level function and its arguments and result must be picklable.
+
+    :param func: The (BeautifulSoup) parser, should take the raw HTML (and anything else it needs)
+    :param args: The parser's arguments
+    :return: The parser's result
+    """
+    name = f"{func.__module__.split('.')[-1]}.{func.__name__}"
+    match settings.PARSER_BACKEND:
+        case "lxml":
+            return await _run(name, lxml_parser(func), *args)
+        case "compare":
+            # Timed apart from either parser, as it runs both
+            result, same = await _run(f"{name}.compare", compare, func, lxml_parser(func), *args)
+            metrics.incr(f"parse.compare.{'match' if same else 'mismatch'}")
+            return result
+        case _:
+            return await _run(name, func, *args)
+
+
+async def _run(name: str, func: Callable[..., T], *args: Any) -> T:
+    """
+    Function to run a function on the parse executor, keeping track of the queue and timings
+
+    :param name: The name the function is timed under
+    :param func: The function
+    :param args: The function's arguments
+    :return: The function's result
+    """
+    global _pending
+    _pending += 1
+    try:
+        result, waited, took = await asyncio.get_running_loop().run_in_executor(
+            get_executor(), _timed, time.time(), func, *args
+        )
+    finally:
+        _pending -= 1
+    metrics.observe("parse.queue_wait", waited)
+    metrics.observe(f"parse.{name}", took)
+    return result
+
+
+metrics.gauge("parse.queue_depth", lambda: _pending)
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, NamedTuple
+
+from app import cache, cron, metrics
+from app.constants import MatchStatus
+from app.core.config import settings
+from app.services import events, matches, team
+
+# How many upstream pages are scraped to load each kind of entity, how to load it and how long it's cached
+LOADERS: dict[str, tuple[int, Callable[[str], Awaitable[Any]], Callable[[Any], int]]] = {
+    "match": (1, lambda id: matches.match_by_id(id), cache.match_ttl),
+    "team": (3, lambda id: team.get_team_data(id), cache.team_ttl),
+    "event": (2, lambda id: events.get_event_by_id(id), cache.event_ttl),
+}
+
+
+class Job(NamedTuple):
+    # Lower goes first, and is dropped last when the budget runs out
+    priority: int
+    kind: str
+    id: str
+
+
+async def active_matches() -> tuple[list[str], list[str]]:
+    """
+    Function to find the matches worth prefetching, from the cached matches list
+
+    :return: The IDs of the live matches, and of the upcoming ones due to start soon (soonest first)
+    """
+    now = time.time()
+    window = settings.SCHEDULE_IMMINENT_WINDOW
+    (live, _), (imminent, _) = await asyncio.gather(
+        cache.query_list(
+            "matches",
+            lambda: cron.matches_cron({}),
+            [cache.facet("status", MatchStatus.LIVE)],
+            limit=settings.PREFETCH_MAX_MATCHES,
+        ),
+        cache.query_list(
+            "matches",
+            lambda: cron.matches_cron({}),
+            [cache.facet("status", MatchStatus.UPCOMING)],
+            now - window,
+            now + window,
+            settings.PREFETCH_MAX_MATCHES,
+        ),
+    )
+    return [json.loads(data)["id"] for data in live], [json.loads(data)["id"] for data in imminent]
+
+
+async def warm(jobs: list[Job], budget: int) -> int:
+    """
+    Function to load whichever of the entities aren't cached yet, in order of priority until the budget runs out
+
+    :param jobs: The entities to warm
+    :param budget: How many upstream pages may be scraped
+    :return: What's left of the budget
+    """
+    # Matches can share teams and events, which then go with the highest priority they have
+    unique: dict[tuple[str, str], Job] = {}
+    for job in sorted(jobs, key=lambda job: job.priority):
+        unique.setdefault((job.kind, job.id), job)
+    jobs = list(unique.values())
+    cached: set[tuple[str, str]] = set()
+    for kind in {job.kind for job in jobs}:
+        found = await cache.get_entities(kind, [job.id for job in jobs if job.kind == kind], count=False)
+        cached.update((kind, id) for id in found)
+
+    selected = []
+    for position, job in enumerate(jobs):
+        if (job.kind, job.id) in cached:
+            continue
+        cost = LOADERS[job.kind][0]
+        if cost > budget:
+            metrics.incr("prefetch.dropped", sum((later.kind, later.id) not in cached for later in jobs[position:]))
+            break
+        budget -= cost
+        selected.append(job)
+
+    semaphore = asyncio.Semaphore(settings.PREFETCH_CONCURRENCY)
+
+    async def load(job: Job) -> None:
+        _, loader, ttl = LOADERS[job.kind]
+        async with semaphore:
+            try:
+                await cache.load_through(job.kind, job.id, lambda: loader(job.id), ttl)
+            except Exception:
+                logging.warning(f"Failed to prefetch {job.kind} `{job.id}`", exc_info=True)
+                metrics.incr(f"prefetch.{job.kind}.error")
+            else:
+                metrics.incr(f"prefetch.{job.kind}.warmed")
+
+    await asyncio.gather(*(load(job) for job in selected))
+    return budget
+
+
+async def prefetch() -> None:
+    """
+    Function to warm the detail caches for the matches that are live or about to start, and their teams and events
+
+    Match pages go first, then teams, then events, the live ones before the upcoming ones. Whatever doesn't fit in the
+    budget of upstream pages is left for the next run.
+
+    :return: Nothing
+    """
+    live, imminent = await active_matches()
+    budget = await warm(
+        [Job(0, "match", id) for id in live] + [Job(1, "match", id) for id in imminent],
+        settings.PREFETCH_BUDGET,
+    )
+
+    # The teams and events are only known from the match pages
+    found = await cache.get_entities("match", live + imminent, count=False)
+    jobs: list[Job] = []
+    for id, data in found.items():
+        details = json.loads(data)
+        upcoming = id not in live
+        jobs.extend(Job(2 + upcoming, "team", side["id"]) for side in details["teams"] if side.get("id"))
+        if event_id := details["event"].get("id"):
+            jobs.append(Job(4 + upcoming, "event", event_id))
+    await warm(jobs, budget)
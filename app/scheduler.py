@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from asyncio import Task
+from typing import Awaitable, Callable
+
+from app import cache, cron, metrics, prefetch
+from app.constants import MatchStatus
+from app.core.config import settings
+
+
+class Schedule:
+    """
+    Refreshes a list over and over, waiting longer between runs the less it's been changing
+
+    The interval goes down to the lower bound while there's activity (live or imminent matches), and is pushed back up
+    while the runs fail. Runs never overlap, the next one is only scheduled once the last one is done.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[dict], Awaitable[bool]],
+        activity: Callable[[], Awaitable[int]] | None = None,
+        then: Callable[[], Awaitable[None]] | None = None,
+    ):
+        self.name = name
+        self.run = run
+        self.activity = activity
+        self.then = then
+        self.low, self.high = settings.SCHEDULE_BOUNDS[name]
+        # Start out eager, nothing is known about the list yet
+        self.change_rate = 1.0
+        self.error_rate = 0.0
+        self.interval = self.low
+        metrics.gauge(f"cron.{name}.interval", lambda: self.interval)
+
+    def update(self, changed: bool | None, active: int) -> float:
+        """
+        Function to pick the next interval based on the last run
+
+        :param changed: Whether the last run changed the list, None if it failed
+        :param active: How many things are going on that the list should keep up with
+        :return: The interval in seconds
+        """
+        weight = settings.SCHEDULE_SMOOTHING
+        self.error_rate += weight * ((changed is None) - self.error_rate)
+        if changed is not None:
+            self.change_rate += weight * (changed - self.change_rate)
+
+        if active:
+            interval = self.low
+        else:
+            interval = self.high - (self.high - self.low) * self.change_rate
+        interval *= 1 + self.error_rate * (settings.SCHEDULE_ERROR_BACKOFF - 1)
+        self.interval = min(max(interval, self.low), self.high)
+        return self.interval
+
+    async def loop(self) -> None:
+        """
+        Function to keep refreshing the list until cancelled
+
+        :return: Nothing
+        """
+        while True:
+            started = time.monotonic()
+            changed: bool | None
+            try:
+                changed = await self.run({})
+            except Exception:
+                logging.exception(f"Failed to refresh {self.name}")
+                metrics.incr(f"cron.{self.name}.error")
+                changed = None
+            if changed is not None and self.then is not None:
+                try:
+                    await self.then()
+                except Exception:
+                    logging.exception(f"Failed to run what follows refreshing {self.name}")
+            elapsed = time.monotonic() - started
+            metrics.observe(f"cron.{self.name}.duration", elapsed)
+
+            active = 0
+            if self.activity is not None:
+                try:
+                    active = await self.activity()
+                except Exception:
+                    logging.exception(f"Failed to check the activity for {self.name}")
+            interval = self.update(changed, active)
+            # The interval counts from the start of the run, a run that took longer is followed by the next one
+            await asyncio.sleep(max(interval - elapsed, 0))
+
+
+async def active_matches() -> int:
+    """
+    Function to count the matches that are live, or upcoming and due to start soon (or late to)
+
+    :return: The number of matches
+    """
+    now = time.time()
+    window = settings.SCHEDULE_IMMINENT_WINDOW
+    live, imminent = await asyncio.gather(
+        cache.count_list_items("matches", cache.facet("status", MatchStatus.LIVE)),
+        cache.count_list_items("matches", cache.facet("status", MatchStatus.UPCOMING), now - window, now + window),
+    )
+    return live + imminent
+
+
+class Scheduler:
+    def __init__(self) -> None:
+        self.tasks: list[Task] = []
+
+    async def start(self) -> None:
+        schedules = [
+            # Warming the detail pages counts towards the run, so they can't stack either
+            Schedule("matches", cron.matches_cron, active_matches, prefetch.prefetch),
+            Schedule("events", cron.events_cron),
+            Schedule("news", cron.news_cron),
+            Schedule("rankings", cron.rankings_cron),
+        ]
+        self.tasks = [asyncio.create_task(schedule.loop()) for schedule in schedules]
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+
+scheduler = Scheduler()
@@ -1,5 +1,6 @@
 from .events import Event, EventWithDetails
-from .matches import Match, MatchTeam, MatchWithDetails
+from .matches import Match, MatchBatch, MatchBatchError, MatchResults, MatchTeam, MatchWithDetails
+from .metrics import Metrics
 from .news import NewsItem
 from .player import Player
 from .rankings import Ranking, TeamRanking
@@ -100,3 +100,18 @@ class Match(BaseModel):
     time: datetime
     event: str
     series: str
+
+
+class MatchResults(BaseModel):
+    results: list[Match]
+    next: str | None
+
+
+class MatchBatchError(BaseModel):
+    status: int
+    detail: str
+
+
+class MatchBatch(BaseModel):
+    results: dict[str, MatchWithDetails]
+    errors: dict[str, MatchBatchError]
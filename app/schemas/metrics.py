@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class Timing(BaseModel):
+    count: int
+    total: float
+    max: float
+
+
+class Metrics(BaseModel):
+    pid: int
+    counters: dict[str, int]
+    timings: dict[str, Timing]
+    gauges: dict[str, float]
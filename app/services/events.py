@@ -1,45 +1,51 @@
 import asyncio
 import itertools
 
-import httpx
-from bs4 import BeautifulSoup, element
+from bs4 import BeautifulSoup, SoupStrainer, element
 from fastapi import HTTPException
 from starlette import status
 
-from app import schemas, utils
+from app import parsing, schemas, upstream, utils
 from app.constants import EVENT_URL_WITH_ID, EVENT_URL_WITH_ID_MATCHES, EVENTS_URL, EventStatus
 
+# The upcoming and completed columns
+EVENTS_PAGE = SoupStrainer("div", class_=utils.has_class("events-container-col"))
 
-async def get_events() -> list[schemas.Event]:
+
+async def get_events(conditional: bool = False) -> list[schemas.Event]:
     """
     Fetch a list of events from VLR, and return the parsed response
+    :param conditional: Raise `upstream.NotModified` if the page didn't change since the last time it was parsed
     :return: Parsed list of events
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(EVENTS_URL)
+    pages = await upstream.get_pages(EVENTS_URL, conditional=conditional)
+    response = await parsing.run(parse_events_page, pages[0].content)
+    await upstream.remember(*pages)
+    return response
+
 
-    soup = BeautifulSoup(response.content, "lxml")
+def parse_events_page(content: bytes) -> list[schemas.Event]:
+    """
+    Parse the page with the list of events
+    :param content: The HTML
+    :return: Parsed list of events
+    """
+    soup = BeautifulSoup(content, "lxml", parse_only=EVENTS_PAGE)
     return list(
-        itertools.chain(
-            *(
-                await asyncio.gather(
-                    *[convert_to_list(data) for data in soup.find_all("div", class_="events-container-col")]
-                )
-            )
-        )
+        itertools.chain(*(convert_to_list(data) for data in soup.find_all("div", class_="events-container-col")))
     )
 
 
-async def convert_to_list(events: element.Tag) -> list[schemas.Event]:
+def convert_to_list(events: element.Tag) -> list[schemas.Event]:
     """
     Parse a list of events
     :param events: The events
     :return: The list of parsed events
     """
-    return list(await asyncio.gather(*[parse_event(event) for event in events.find_all("a", class_="wf-card")]))
+    return [parse_event(event) for event in events.find_all("a", class_="wf-card")]
 
 
-async def parse_event(event: element.Tag) -> schemas.Event:
+def parse_event(event: element.Tag) -> schemas.Event:
     """
     Parse an event
     :param event: The HTML
@@ -77,10 +83,19 @@ async def parse_events_data(id: str) -> dict:
     :param id: The ID of the event
     :ret: Dict of the parsed data
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(EVENT_URL_WITH_ID.format(id))
+    response = await upstream.get(EVENT_URL_WITH_ID.format(id))
+    return await parsing.run(parse_event_page, response.content, id)
+
+
+def parse_event_page(content: bytes, id: str) -> dict:
+    """
+    Function to parse the page of a given event
+    :param content: The HTML
+    :param id: The ID of the event
+    :ret: Dict of the parsed data
+    """
     event: dict[str, str | list] = {"id": id}
-    soup = BeautifulSoup(response.content, "lxml")
+    soup = BeautifulSoup(content, "lxml")
 
     if (event_header := soup.find_all("div", class_="event-header")) is None:
         raise HTTPException(detail="Event header was missing, please retry", status_code=status.HTTP_400_BAD_REQUEST)
@@ -97,10 +112,10 @@ async def parse_events_data(id: str) -> dict:
     event["img"] = utils.get_image_url(header.find_all("div", class_="event-header-thumb")[0].find("img")["src"])
 
     if prizes_data := soup.find_all("table", class_="wf-table"):
-        event["prizes"] = await prizes_parser(prizes_data[-1])
+        event["prizes"] = prizes_parser(prizes_data[-1])
 
     if teams_container := soup.find_all("div", class_="event-teams-container"):
-        event["teams"] = await parse_team_data(teams_container[0])
+        event["teams"] = parse_team_data(teams_container[0])
 
     match_data = soup.find("div", class_="event-sidebar-matches").find_all("h2", class_="wf-label mod-large")
 
@@ -119,28 +134,36 @@ async def parse_events_data(id: str) -> dict:
 
 
 async def parse_match_data(id: str) -> list:
-    async with httpx.AsyncClient() as client:
-        response = await client.get(EVENT_URL_WITH_ID_MATCHES.format(id))
+    """
+    Function to fetch and parse the matches of a given event
+    :param id: The ID of the event
+    :return: The parsed matches
+    """
+    response = await upstream.get(EVENT_URL_WITH_ID_MATCHES.format(id))
+    return await parsing.run(parse_event_matches_page, response.content)
+
 
-    soup = BeautifulSoup(response.content, "lxml")
+def parse_event_matches_page(content: bytes) -> list:
+    """
+    Function to parse the matches page of a given event
+    :param content: The HTML
+    :return: The parsed matches
+    """
+    soup = BeautifulSoup(content, "lxml")
     return list(
         itertools.chain(
             *(
-                await asyncio.gather(
-                    *[
-                        match_parser(
-                            soup.find_all("div", class_="wf-card")[day + 1],
-                            date.get_text().strip().replace("\n", "").replace("\t", ""),
-                        )
-                        for (day, date) in enumerate(soup.find_all("div", class_="wf-label mod-large"))
-                    ]
+                match_parser(
+                    soup.find_all("div", class_="wf-card")[day + 1],
+                    date.get_text().strip().replace("\n", "").replace("\t", ""),
                 )
+                for (day, date) in enumerate(soup.find_all("div", class_="wf-label mod-large"))
             )
         )
     )
 
 
-async def prizes_parser(prizes_table: element.Tag) -> list[dict[str, str | dict[str, str]]]:
+def prizes_parser(prizes_table: element.Tag) -> list[dict[str, str | dict[str, str]]]:
     """
     Parse prize data
     :param prizes_table: The HTML
@@ -171,7 +194,7 @@ async def prizes_parser(prizes_table: element.Tag) -> list[dict[str, str | dict[
     return prizes
 
 
-async def match_parser(day_matches: element.Tag, date: str) -> list[dict[str, str | list[str]]]:
+def match_parser(day_matches: element.Tag, date: str) -> list[dict[str, str | list[str]]]:
     """
     Parse match data
     :param day_matches: The HTML
@@ -209,7 +232,7 @@ async def match_parser(day_matches: element.Tag, date: str) -> list[dict[str, st
     return matches
 
 
-async def parse_team_data(team_data: element.Tag) -> list[dict[str, str]]:
+def parse_team_data(team_data: element.Tag) -> list[dict[str, str]]:
     """
     Function to parse team data
     :param team_data: The HTML
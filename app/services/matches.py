@@ -1,49 +1,71 @@
 from asyncio import gather
 from datetime import datetime
 from itertools import chain
-from typing import Tuple
+from typing import Any, Tuple
 from zoneinfo import ZoneInfo
 
 import dateutil.parser
-import httpx
-from bs4 import BeautifulSoup, element
+from bs4 import BeautifulSoup, SoupStrainer, element
 from bs4.element import ResultSet
 
-from app import schemas, utils
+from app import parsing, schemas, upstream, utils
 from app.constants import MATCH_URL_WITH_ID, PAST_MATCHES_URL, UPCOMING_MATCHES_URL
 
+# The date labels, and the cards of the matches on each date
+MATCHES_PAGE = SoupStrainer("div", class_=utils.has_class("wf-label", "wf-card"))
 
-async def match_by_id(id: str) -> schemas.MatchWithDetails:
+
+async def match_by_id(id: str, skip: frozenset[str] = frozenset()) -> schemas.MatchWithDetails:
     """
     Function to fetch a match from VLR, and return the parsed response
     :param id: The match ID
+    :param skip: Sections that aren't needed, see `parse_match_page`
     :return: The parsed match
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(MATCH_URL_WITH_ID.format(id))
+    response = await upstream.get(MATCH_URL_WITH_ID.format(id))
+    return await parsing.run(parse_match_page, response.content, skip)
 
-    soup = BeautifulSoup(response.content, "lxml")
 
-    teams, bans, event, video_data, map_ret, h2h_matches = await gather(
-        get_team_data(soup.find_all("div", class_="match-header-vs")),
-        get_ban_data(soup.find_all("div", class_="match-header-note")),
-        get_event_data(soup),
-        get_video_data(soup.find("div", class_="match-streams-bets-container")),
-        get_map_data(soup.find_all("div", class_="vm-stats")),
-        get_previous_encounters_data(soup.find("div", class_="wf-card match-h2h")),
-    )
+def skipped_sections(fields: dict[str, Any]) -> frozenset[str]:
+    """
+    Function to work out which sections of a match's page don't need parsing for some fields
+    :param fields: The tree of fields wanted, see `utils.parse_fields`
+    :return: The sections to skip, see `parse_match_page`
+    """
+    skip = set()
+    if "previous_encounters" not in fields:
+        skip.add("previous_encounters")
+    if (maps := fields.get("data")) is None and "map_count" not in fields:
+        skip.add("maps")
+    elif maps is not True:
+        skip.update(section for section in ("rounds", "members") if maps is None or section not in maps)
+    return frozenset(skip)
+
+
+def parse_match_page(content: bytes, skip: frozenset[str] = frozenset()) -> schemas.MatchWithDetails:
+    """
+    Function to parse a match's page
+    :param content: The HTML
+    :param skip: Sections that aren't needed and are left empty ("maps", "rounds", "members", "previous_encounters")
+    :return: The parsed match
+    """
+    soup = BeautifulSoup(content, "lxml")
+
+    map_ret = get_map_data(soup.find_all("div", class_="vm-stats"), skip) if "maps" not in skip else ([], 0)
     return schemas.MatchWithDetails(
-        teams=teams,
-        bans=bans,
-        event=event,
-        videos=video_data,
+        teams=get_team_data(soup.find_all("div", class_="match-header-vs")),
+        bans=get_ban_data(soup.find_all("div", class_="match-header-note")),
+        event=get_event_data(soup),
+        videos=get_video_data(soup.find("div", class_="match-streams-bets-container")),
         data=map_ret[0],
         map_count=map_ret[1],
-        previous_encounters=h2h_matches,
+        previous_encounters=get_previous_encounters_data(soup.find("div", class_="wf-card match-h2h"))
+        if "previous_encounters" not in skip
+        else [],
     )
 
 
-async def get_team_data(data: ResultSet) -> list[dict]:
+def get_team_data(data: ResultSet) -> list[dict]:
     """
     Function to parse team data
     :param data: The data
@@ -73,7 +95,7 @@ async def get_team_data(data: ResultSet) -> list[dict]:
     return response
 
 
-async def get_ban_data(data: ResultSet) -> list:
+def get_ban_data(data: ResultSet) -> list:
     """
     Function to parse the notes from a match page on VLR
     :param data: The notes
@@ -83,7 +105,7 @@ async def get_ban_data(data: ResultSet) -> list:
     return [ban_data.strip() for ban_data in data[0].get_text().split(";")] if data else []
 
 
-async def get_event_data(soup: BeautifulSoup) -> dict:
+def get_event_data(soup: BeautifulSoup) -> dict:
     """
     Function to extract event data from a match page on VLR
     :param soup: The page
@@ -123,7 +145,7 @@ async def get_event_data(soup: BeautifulSoup) -> dict:
     return ret
 
 
-async def get_video_data(data: element.Tag) -> dict[str, list]:
+def get_video_data(data: element.Tag) -> dict[str, list]:
     """
     Function to extract information about stream/VOD links from a match page on VLR
     :param data: The data about the videos
@@ -147,10 +169,11 @@ async def get_video_data(data: element.Tag) -> dict[str, list]:
     return response
 
 
-async def get_map_data(data: ResultSet) -> Tuple[list, int]:
+def get_map_data(data: ResultSet, skip: frozenset[str] = frozenset()) -> Tuple[list, int]:
     """
     Function to extract information about a map from a match page on VLR
     :param data: The data about the maps
+    :param skip: Sections that aren't needed and are left empty ("rounds", "members")
     :return: The parsed data
     """
     stats = data[0]
@@ -187,7 +210,7 @@ async def get_map_data(data: ResultSet) -> Tuple[list, int]:
         rounds = []
         # TODO: find a better solution, only done to prevent warning at 201 (tuple[int, ...] vs tuple[int, int])
         prev: tuple[int, ...] = (0, 0)
-        for round_data in map_data.find_all("div", class_="vlr-rounds-row-col")[1:]:
+        for round_data in map_data.find_all("div", class_="vlr-rounds-row-col")[1:] if "rounds" not in skip else []:
             if round_current_score := round_data.find_all("div", class_="rnd-currscore"):
                 round_score = round_current_score[0].get_text().strip()
                 side, round_winner = "", ""
@@ -228,24 +251,17 @@ async def get_map_data(data: ResultSet) -> Tuple[list, int]:
                 "map": maps.get(match_map_id),
                 "teams": teams,
                 "members": list(
-                    chain(
-                        *(
-                            await gather(
-                                *[
-                                    parse_scoreboard(element, team_name_mapping)
-                                    for element in map_data.find_all("tbody")
-                                ]
-                            )
-                        )
-                    )
-                ),
+                    chain(*(parse_scoreboard(element, team_name_mapping) for element in map_data.find_all("tbody")))
+                )
+                if "members" not in skip
+                else [],
                 "rounds": rounds,
             }
         )
     return map_ret, map_count
 
 
-async def parse_scoreboard(data: element.Tag, team_name_mapping: dict[str, str]) -> list:
+def parse_scoreboard(data: element.Tag, team_name_mapping: dict[str, str]) -> list:
     ret = []
     for team in data.find_all("tr"):
         data = team.find_all("td", class_="mod-player")[0]
@@ -281,7 +297,7 @@ async def parse_scoreboard(data: element.Tag, team_name_mapping: dict[str, str])
     return ret
 
 
-async def get_previous_encounters_data(data: element.Tag) -> list[dict]:
+def get_previous_encounters_data(data: element.Tag) -> list[dict]:
     """
     :param data: Previous encounters data
     :return: List of match IDs
@@ -303,21 +319,16 @@ async def get_previous_encounters_data(data: element.Tag) -> list[dict]:
     return response
 
 
-async def match_list() -> list[schemas.Match]:
+async def match_list(conditional: bool = False) -> list[schemas.Match]:
     """
     Function to parse a list of matches from the VLR.gg homepage
+    :param conditional: Raise `upstream.NotModified` if neither page changed since the last time they were parsed
     :return: The parsed matches
     """
-    return list(
-        chain(
-            *(
-                await gather(
-                    get_upcoming_matches(),
-                    get_completed_matches(),
-                )
-            )
-        )
-    )
+    pages = await upstream.get_pages(UPCOMING_MATCHES_URL, PAST_MATCHES_URL, conditional=conditional)
+    response = list(chain(*(await gather(*(parsing.run(parse_matches_page, page.content) for page in pages)))))
+    await upstream.remember(*pages)
+    return response
 
 
 async def get_upcoming_matches() -> list[schemas.Match]:
@@ -325,15 +336,8 @@ async def get_upcoming_matches() -> list[schemas.Match]:
     Function get a list of upcoming matches from VLR
     :return: The list of matches
     """
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        upcoming_matches_response = await client.get(UPCOMING_MATCHES_URL)
-
-    upcoming_matches = BeautifulSoup(upcoming_matches_response.content, "lxml")
-
-    return await parse_matches(
-        upcoming_matches.find_all("div", class_="wf-label"),
-        upcoming_matches.find_all("div", class_="wf-card"),
-    )
+    upcoming_matches_response = await upstream.get(UPCOMING_MATCHES_URL)
+    return await parsing.run(parse_matches_page, upcoming_matches_response.content)
 
 
 async def get_completed_matches() -> list[schemas.Match]:
@@ -341,18 +345,25 @@ async def get_completed_matches() -> list[schemas.Match]:
     Function get a list of completed matches from VLR
     :return: The list of matches
     """
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        previous_matches_response = await client.get(PAST_MATCHES_URL)
+    previous_matches_response = await upstream.get(PAST_MATCHES_URL)
+    return await parsing.run(parse_matches_page, previous_matches_response.content)
 
-    previous_matches = BeautifulSoup(previous_matches_response.content, "lxml")
 
-    return await parse_matches(
-        previous_matches.find_all("div", class_="wf-label"),
-        previous_matches.find_all("div", class_="wf-card"),
+def parse_matches_page(content: bytes) -> list[schemas.Match]:
+    """
+    Function to parse a page with a list of matches (upcoming or completed)
+    :param content: The HTML
+    :return: The parsed matches
+    """
+    soup = BeautifulSoup(content, "lxml", parse_only=MATCHES_PAGE)
+
+    return parse_matches(
+        soup.find_all("div", class_="wf-label"),
+        soup.find_all("div", class_="wf-card"),
     )
 
 
-async def parse_matches(dates: ResultSet, match_data: ResultSet) -> list[schemas.Match]:
+def parse_matches(dates: ResultSet, match_data: ResultSet) -> list[schemas.Match]:
     """
     Function to parse a list of matches
     :param dates: The dates on which the matches were/will be held
@@ -360,21 +371,14 @@ async def parse_matches(dates: ResultSet, match_data: ResultSet) -> list[schemas
     :return: The parsed matches
     """
 
-    return list(
-        await gather(
-            *[
-                parse_match(date, match_info)
-                for date, match_info in [
-                    (date, match)
-                    for date, matches in zip(dates, match_data[1:])
-                    for match in matches.find_all("a", class_="wf-module-item")
-                ]
-            ]
-        )
-    )
+    return [
+        parse_match(date, match)
+        for date, matches in zip(dates, match_data[1:])
+        for match in matches.find_all("a", class_="wf-module-item")
+    ]
 
 
-async def parse_match(date: element.Tag, match_info: element.Tag) -> schemas.Match:
+def parse_match(date: element.Tag, match_info: element.Tag) -> schemas.Match:
     """
     Function to parse a given match
     :param date: The match's date
@@ -392,8 +396,8 @@ async def parse_match(date: element.Tag, match_info: element.Tag) -> schemas.Mat
         date_string = date + " " + time
 
     return schemas.Match(
-        team1=schemas.MatchTeam(name=team_names[0].get_text().strip(), score=await parse_score(team_scores[0])),
-        team2=schemas.MatchTeam(name=team_names[1].get_text().strip(), score=await parse_score(team_scores[1])),
+        team1=schemas.MatchTeam(name=team_names[0].get_text().strip(), score=parse_score(team_scores[0])),
+        team2=schemas.MatchTeam(name=team_names[1].get_text().strip(), score=parse_score(team_scores[1])),
         status=status,
         time=dateutil.parser.parse(date_string, ignoretz=True).astimezone(ZoneInfo("UTC")),
         id=match_info.get("href").split("/")[1],
@@ -402,7 +406,7 @@ async def parse_match(date: element.Tag, match_info: element.Tag) -> schemas.Mat
     )
 
 
-async def parse_score(data: element.Tag) -> str | None:
+def parse_score(data: element.Tag) -> str | None:
     """
     Function that takes in a tag to parse the score
     :param data: The tag
@@ -1,28 +1,39 @@
-import asyncio
 from zoneinfo import ZoneInfo
 
 import dateutil.parser
-import httpx
-from bs4 import BeautifulSoup, element
+from bs4 import BeautifulSoup, SoupStrainer, element
 
-from app import schemas
+from app import parsing, schemas, upstream, utils
 from app.constants import NEWS_URL, PREFIX
 
+# The link to each article
+NEWS_PAGE = SoupStrainer("a", class_=utils.has_class("wf-module-item"))
 
-async def news_list() -> list[schemas.NewsItem]:
+
+async def news_list(conditional: bool = False) -> list[schemas.NewsItem]:
     """
     Function to parse a list of matches from the VLR.gg homepage
+    :param conditional: Raise `upstream.NotModified` if the page didn't change since the last time it was parsed
     :return: The parsed matches
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(NEWS_URL)
+    pages = await upstream.get_pages(NEWS_URL, conditional=conditional)
+    response = await parsing.run(parse_news_page, pages[0].content)
+    await upstream.remember(*pages)
+    return response
+
 
-    soup = BeautifulSoup(response.content, "lxml")
+def parse_news_page(content: bytes) -> list[schemas.NewsItem]:
+    """
+    Function to parse the news page
+    :param content: The HTML
+    :return: The parsed news
+    """
+    soup = BeautifulSoup(content, "lxml", parse_only=NEWS_PAGE)
 
-    return list(await asyncio.gather(*[parse_news(news) for news in soup.find_all("a", class_="wf-module-item")]))
+    return [parse_news(news) for news in soup.find_all("a", class_="wf-module-item")]
 
 
-async def parse_news(data: element.Tag) -> schemas.NewsItem:
+def parse_news(data: element.Tag) -> schemas.NewsItem:
     title, description, metadata = [item.get_text().strip() for item in data.find_all("div")[0].find_all("div")]
     metadata = metadata.split("•")
     return schemas.NewsItem(
@@ -1,9 +1,6 @@
-import asyncio
-
-import httpx
 from bs4 import BeautifulSoup, element
 
-from app import utils
+from app import parsing, upstream, utils
 from app.constants import PLAYER_URL
 
 
@@ -14,10 +11,17 @@ async def get_player_data(id: str) -> dict:
     :return: The parsed data
     """
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(PLAYER_URL.format(id))
+    response = await upstream.get(PLAYER_URL.format(id))
+    return await parsing.run(parse_player_page, response.content)
+
 
-    soup = BeautifulSoup(response.content, "lxml")
+def parse_player_page(content: bytes) -> dict:
+    """
+    Function to parse a player's page
+    :param content: The HTML
+    :return: The parsed data
+    """
+    soup = BeautifulSoup(content, "lxml")
     player_info = soup.find("div", class_="player-header")
     player_summary_container_1 = soup.find("div", class_="player-summary-container-1")
     player_summary_container_2 = soup.find("div", class_="player-summary-container-2")
@@ -27,9 +31,7 @@ async def get_player_data(id: str) -> dict:
         "name": player_info.find("h2").get_text().strip(),
         "img": utils.get_image_url(player_info.find("img")["src"]),
         "country": player_info.find("div", class_="ge-text-light").get_text().strip(),
-        "agents": await asyncio.gather(
-            *[parse_agent_data(agent.find_all("td")) for agent in soup.find("tbody").find_all("tr")]
-        ),
+        "agents": [parse_agent_data(agent.find_all("td")) for agent in soup.find("tbody").find_all("tr")],
     }
 
     for header in player_summary_container_2.find_all("h2"):
@@ -65,7 +67,7 @@ async def get_player_data(id: str) -> dict:
     return player_data
 
 
-async def parse_agent_data(agent_data: element.ResultSet) -> dict:
+def parse_agent_data(agent_data: element.ResultSet) -> dict:
     """
     Function to parse agent data from a player's page on VLR
     :param agent_data: An agent table row
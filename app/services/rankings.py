@@ -1,46 +1,65 @@
 import asyncio
 
-import httpx
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
-from app import schemas, utils
+from app import parsing, schemas, upstream, utils
 from app.constants import RANKING_URL_REGION, RANKINGS_URL, REGION_NAME_MAPPING
 
+# The region links, and each team's row
+REGIONS_PAGE = SoupStrainer("div", class_=utils.has_class("wf-nav mod-collapsible"))
+RANKINGS_PAGE = SoupStrainer("div", class_=utils.has_class("rank-item wf-card fc-flex"))
 
-async def ranking_list() -> list[schemas.Ranking]:
+
+async def ranking_list(conditional: bool = False) -> list[schemas.Ranking]:
     """
     Function to parse a list of rankings from the VLR.gg rankings page
 
+    :param conditional: Raise `upstream.NotModified` if none of the pages changed since the last time they were parsed
     :return: The parsed ranks
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(RANKINGS_URL)
-
-    soup = BeautifulSoup(response.content, "lxml")
+    (page,) = await upstream.get_pages(RANKINGS_URL)
+    regions = await parsing.run(parse_regions_page, page.content)
+    region_pages = await upstream.get_pages(
+        *[RANKING_URL_REGION.format(region) for region in regions], conditional=conditional and not page.changed
+    )
 
     data = list(
         await asyncio.gather(
             *[
-                parse_rankings(region["href"])
-                for region in soup.find("div", class_="wf-nav mod-collapsible").find_all("a")[1:]
-                if not region["href"].endswith("/gc")
+                parsing.run(parse_rankings_page, region_page.content, region)
+                for region, region_page in zip(regions, region_pages)
             ]
         )
     )
+    await upstream.remember(page, *region_pages)
     return data
 
 
-async def parse_rankings(path: str) -> schemas.Ranking:
+def parse_regions_page(content: bytes) -> list[str]:
+    """
+    Function to parse the paths of each region's page from the VLR.gg rankings page
+
+    :param content: The HTML
+    :return: The paths
+    """
+    soup = BeautifulSoup(content, "lxml", parse_only=REGIONS_PAGE)
+
+    return [
+        region["href"]
+        for region in soup.find("div", class_="wf-nav mod-collapsible").find_all("a")[1:]
+        if not region["href"].endswith("/gc")
+    ]
+
+
+def parse_rankings_page(content: bytes, path: str) -> schemas.Ranking:
     """
     Function to parse team data from a region's ranking page
 
+    :param content: The HTML
     :param path: The path to the region's page on VLR
     :return: The parsed data
     """
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(RANKING_URL_REGION.format(path))
-
-    soup = BeautifulSoup(response.content, "lxml")
+    soup = BeautifulSoup(content, "lxml", parse_only=RANKINGS_PAGE)
 
     region_name = path.split("/")[-1]
     region_name = REGION_NAME_MAPPING.get(region_name.lower()) or " ".join(region_name.split("-")).title()
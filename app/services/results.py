@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime
+
+from app import metrics, parsing, schemas, store, upstream
+from app.constants import PAST_MATCHES_URL_WITH_PAGE
+from app.core.config import settings
+from app.services import matches
+
+
+async def get_results_page(page: int) -> list[schemas.Match]:
+    """
+    Function to get one page of match results from VLR
+    :param page: The page number, starting at 1
+    :return: The parsed results, empty past the last page
+    """
+    response = await upstream.get(PAST_MATCHES_URL_WITH_PAGE.format(page))
+    return await parsing.run(matches.parse_matches_page, response.content)
+
+
+async def crawl_pages(first_page: int, until: datetime | None, steady: bool = False) -> tuple[int, bool]:
+    """
+    Function to walk the results pages from a given one, storing the results on them
+    :param first_page: The page to start from
+    :param until: Stop at a result that was stored with this time or older, None to only stop at the last page
+    :param steady: Whether to fetch the first page on its own, as it's usually the only one that's needed
+    :return: The page to continue from, and whether the walk got where it was going
+    """
+    last_page = first_page + settings.RESULTS_CRAWL_MAX_PAGES
+    page = first_page
+    while page < last_page:
+        size = 1 if steady and page == first_page else settings.RESULTS_CRAWL_CONCURRENCY
+        pages = range(page, min(page + size, last_page))
+        for number, results in zip(pages, await asyncio.gather(*(get_results_page(number) for number in pages))):
+            metrics.incr("results.pages")
+            if not results:
+                return number, True
+
+            known = await store.known_results([result.id for result in results])
+            await store.save_results(results)
+            metrics.incr("results.new", len({result.id for result in results} - known))
+            # Pages shift as new results come in, so results stored by this same walk don't count
+            if until is not None and any(result.id in known and result.time <= until for result in results):
+                return number + 1, True
+        page = pages.stop
+    return page, False
+
+
+async def crawl_results() -> None:
+    """
+    Function to store the match results that came in since the last run, and to backfill older ones a bit at a time
+    :return: Nothing
+    """
+    newest = await store.newest_result_time()
+    page, done = await crawl_pages(1, newest, steady=True)
+    catch_up_page, catch_up_until = await asyncio.gather(
+        store.get_state("catch_up_page"), store.get_state("catch_up_until")
+    )
+    if catch_up_page is not None and catch_up_until is None:
+        # There's no telling where that gap ends, so it's dropped rather than walked to the last page
+        await store.set_state("catch_up_page", None)
+        catch_up_page = None
+
+    if not done:
+        # Whatever is left between here and the stored results (or the last page) gets walked over the next runs
+        if newest is None:
+            await store.set_state("backfill_page", str(page))
+        else:
+            # If an older gap is still being caught up on, walking down to where it ends covers both
+            await store.set_state("catch_up_page", str(page))
+            if catch_up_page is None:
+                await store.set_state("catch_up_until", newest.isoformat())
+    elif catch_up_page is not None and catch_up_until is not None:
+        page, done = await crawl_pages(int(catch_up_page), datetime.fromisoformat(catch_up_until))
+        await store.set_state("catch_up_page", None if done else str(page))
+        if done:
+            await store.set_state("catch_up_until", None)
+    elif (backfill_page := await store.get_state("backfill_page")) is not None:
+        page, done = await crawl_pages(int(backfill_page), None)
+        await store.set_state("backfill_page", None if done else str(page))
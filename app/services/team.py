@@ -1,33 +1,60 @@
 import asyncio
+from typing import Any
 from zoneinfo import ZoneInfo
 
 import dateutil.parser
-import httpx
 from bs4 import BeautifulSoup, element
 
-from app import utils
+from app import parsing, upstream, utils
 from app.constants import TEAM_COMPLETED_MATCHES_URL, TEAM_UPCOMING_MATCHES_URL, TEAM_URL
 
 
-async def get_team_data(id: str) -> dict:
+async def get_team_data(id: str, skip: frozenset[str] = frozenset()) -> dict:
     """
     Function get a team's data from VLR and return a parsed version
     :param id: The team's ID
+    :param skip: Sections that aren't needed and are left empty, without fetching their pages ("upcoming", "completed")
     :return: The parsed data
     """
+    urls = [TEAM_URL.format(id)]
+    if "upcoming" not in skip:
+        urls.append(TEAM_UPCOMING_MATCHES_URL.format(id))
+    if "completed" not in skip:
+        urls.append(TEAM_COMPLETED_MATCHES_URL.format(id))
+    responses = iter(await asyncio.gather(*(upstream.get(url) for url in urls)))
+
+    return await parsing.run(
+        parse_team_pages,
+        next(responses).content,
+        next(responses).content if "upcoming" not in skip else None,
+        next(responses).content if "completed" not in skip else None,
+    )
 
-    async with httpx.AsyncClient() as client:
-        response, upcoming_matches_response, completed_matches_response = await asyncio.gather(
-            *[
-                client.get(TEAM_URL.format(id)),
-                client.get(TEAM_UPCOMING_MATCHES_URL.format(id)),
-                client.get(TEAM_COMPLETED_MATCHES_URL.format(id)),
-            ]
-        )
 
-    soup = BeautifulSoup(response.content, "lxml")
-    upcoming_matches = BeautifulSoup(upcoming_matches_response, "lxml")
-    completed_matches = BeautifulSoup(completed_matches_response, "lxml")
+def skipped_sections(fields: dict[str, Any]) -> frozenset[str]:
+    """
+    Function to work out which of a team's pages don't need fetching for some fields
+    :param fields: The tree of fields wanted, see `utils.parse_fields`
+    :return: The sections to skip, see `get_team_data`
+    """
+    return frozenset(section for section in ("upcoming", "completed") if section not in fields)
+
+
+def parse_team_pages(
+    content: bytes, upcoming_matches_content: bytes | None, completed_matches_content: bytes | None
+) -> dict:
+    """
+    Function to parse a team's pages
+    :param content: The HTML of the team's page
+    :param upcoming_matches_content: The HTML of the team's upcoming matches page, None if they aren't needed
+    :param completed_matches_content: The HTML of the team's completed matches page, None if they aren't needed
+    :return: The parsed data
+    """
+    soup = BeautifulSoup(content, "lxml")
+    upcoming_matches = BeautifulSoup(upcoming_matches_content, "lxml") if upcoming_matches_content is not None else None
+    completed_matches = (
+        BeautifulSoup(completed_matches_content, "lxml") if completed_matches_content is not None else None
+    )
 
     team_info = soup.find("div", class_="team-header")
     name = team_info.find("h1").get_text().strip()
@@ -62,17 +89,6 @@ async def get_team_data(id: str) -> dict:
     else:
         region = ""
 
-    roster, upcoming_matches, completed_matches = await asyncio.gather(
-        *[
-            asyncio.gather(*[parse_player(player) for player in team_data.find_all("div", class_="team-roster-item")]),
-            asyncio.gather(
-                *[parse_match(match) for match in upcoming_matches.find_all("a", class_="wf-card fc-flex m-item")]
-            ),
-            asyncio.gather(
-                *[parse_match(match) for match in completed_matches.find_all("a", class_="wf-card fc-flex m-item")]
-            ),
-        ]
-    )
     return {
         "name": name,
         "tag": tag,
@@ -82,13 +98,17 @@ async def get_team_data(id: str) -> dict:
         "country": country,
         "rank": rank,
         "region": region,
-        "roster": roster,
-        "upcoming": upcoming_matches,
-        "completed": completed_matches,
+        "roster": [parse_player(player) for player in team_data.find_all("div", class_="team-roster-item")],
+        "upcoming": [parse_match(match) for match in upcoming_matches.find_all("a", class_="wf-card fc-flex m-item")]
+        if upcoming_matches is not None
+        else [],
+        "completed": [parse_match(match) for match in completed_matches.find_all("a", class_="wf-card fc-flex m-item")]
+        if completed_matches is not None
+        else [],
     }
 
 
-async def parse_player(player_data: element.Tag) -> dict:
+def parse_player(player_data: element.Tag) -> dict:
     """
     Function to parse a player's data from VLR
     :param player_data: The HTML data
@@ -109,7 +129,7 @@ async def parse_player(player_data: element.Tag) -> dict:
     return response
 
 
-async def parse_match(match_data: element.Tag) -> dict:
+def parse_match(match_data: element.Tag) -> dict:
     """
     Function to parse a match's data from VLR
     :param match_data: The HTML data
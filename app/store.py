@@ -0,0 +1,182 @@
+import asyncio
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from typing import AsyncIterator
+
+from app import schemas, utils
+from app.core.config import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id TEXT PRIMARY KEY,
+    time TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_by_time ON results (time DESC, id DESC);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def connect() -> sqlite3.Connection:
+    """
+    Function to open a connection to the local database of match results
+
+    Connections are cheap to open, so every operation opens its own on whichever thread it runs on.
+
+    :return: The connection
+    """
+    return sqlite3.connect(settings.RESULTS_DB_PATH, timeout=settings.RESULTS_DB_TIMEOUT)
+
+
+def _create() -> None:
+    with closing(connect()) as connection:
+        # Lets the API read while the crawler writes, from any number of processes
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+
+
+async def start() -> None:
+    """
+    Function to create the database if it isn't there yet, should be called once on startup
+
+    :return: Nothing
+    """
+    await asyncio.to_thread(_create)
+
+
+def _known_results(ids: list[str]) -> set[str]:
+    with closing(connect()) as connection:
+        # Only the placeholders are formatted into the query
+        rows = connection.execute(f"SELECT id FROM results WHERE id IN ({', '.join('?' * len(ids))})", ids)
+        return {id for (id,) in rows}
+
+
+async def known_results(ids: list[str]) -> set[str]:
+    """
+    Function to find which of the given matches are already stored
+
+    :param ids: The match IDs
+    :return: The IDs that are stored
+    """
+    return await asyncio.to_thread(_known_results, ids)
+
+
+def _newest_result_time() -> str | None:
+    with closing(connect()) as connection:
+        return connection.execute("SELECT MAX(time) FROM results").fetchone()[0]
+
+
+async def newest_result_time() -> datetime | None:
+    """
+    Function to get the time of the newest stored result
+
+    :return: The time, None if there are no results
+    """
+    if (newest := await asyncio.to_thread(_newest_result_time)) is None:
+        return None
+    return datetime.fromisoformat(newest)
+
+
+def _save_results(results: list[schemas.Match]) -> None:
+    with closing(connect()) as connection, connection:
+        connection.executemany(
+            "INSERT INTO results (id, time, data) VALUES (?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET time = excluded.time, data = excluded.data",
+            [(result.id, result.time.isoformat(), utils.to_json(result)) for result in results],
+        )
+
+
+async def save_results(results: list[schemas.Match]) -> None:
+    """
+    Function to store match results, replacing the ones that are already stored
+
+    :param results: The results
+    :return: Nothing
+    """
+    await asyncio.to_thread(_save_results, results)
+
+
+def _get_results(limit: int, cursor: str | None) -> list[tuple[str, str]]:
+    with closing(connect()) as connection:
+        if cursor is None:
+            rows = connection.execute(
+                "SELECT id, data FROM results ORDER BY time DESC, id DESC LIMIT ?",
+                (limit,),
+            )
+        else:
+            rows = connection.execute(
+                "SELECT id, data FROM results WHERE (time, id) < (SELECT time, id FROM results WHERE id = ?) "
+                "ORDER BY time DESC, id DESC LIMIT ?",
+                (cursor, limit),
+            )
+        return rows.fetchall()
+
+
+async def get_results(limit: int, cursor: str | None = None) -> tuple[list[str], str | None]:
+    """
+    Function to page through the stored results, newest first
+
+    :param limit: How many results to return
+    :param cursor: The ID of the last result of the previous page, if any
+    :return: The JSON of each result, and the cursor for the next page (None if this is the last one)
+    """
+    rows = await asyncio.to_thread(_get_results, limit, cursor)
+    return [data for _, data in rows], rows[-1][0] if len(rows) == limit else None
+
+
+async def iter_results(batch_size: int) -> AsyncIterator[list[str]]:
+    """
+    Function to read every stored result, newest first, a batch at a time
+
+    :param batch_size: How many results to read at once
+    :return: Batches of the JSON of each result
+    """
+    cursor = None
+    while True:
+        results, cursor = await get_results(batch_size, cursor)
+        if results:
+            yield results
+        if cursor is None:
+            return
+
+
+def _get_state(key: str) -> str | None:
+    with closing(connect()) as connection:
+        row = connection.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+
+
+async def get_state(key: str) -> str | None:
+    """
+    Function to read a value the crawler keeps between runs
+
+    :param key: The name of the value
+    :return: The value, None if it isn't set
+    """
+    return await asyncio.to_thread(_get_state, key)
+
+
+def _set_state(key: str, value: str | None) -> None:
+    with closing(connect()) as connection, connection:
+        if value is None:
+            connection.execute("DELETE FROM state WHERE key = ?", (key,))
+        else:
+            connection.execute(
+                "INSERT INTO state (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+
+async def set_state(key: str, value: str | None) -> None:
+    """
+    Function to store a value the crawler keeps between runs
+
+    :param key: The name of the value
+    :param value: The value, None to clear it
+    :return: Nothing
+    """
+    await asyncio.to_thread(_set_state, key, value)
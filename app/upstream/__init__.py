@@ -0,0 +1,3 @@
+from .client import *
+from .exceptions import *
+from .pages import *
@@ -0,0 +1,92 @@
+import logging
+import time
+
+import httpx
+
+from app import metrics
+from app.core.config import settings
+
+from .exceptions import Unavailable
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests for a family of pages after too many of them failed in a row
+
+    Once open, requests fail straight away until the cooldown is over. Then one request at a time is let through to
+    probe, closing the breaker again if it works.
+    """
+
+    def __init__(self, family: str):
+        self.family = family
+        self.failures = 0
+        self.open_until: float | None = None
+
+    def check(self) -> None:
+        """
+        Function to make sure a request may go through, raising Unavailable if the breaker is open
+
+        :return: Nothing
+        """
+        if self.open_until is None:
+            return
+        now = time.monotonic()
+        if now < self.open_until:
+            metrics.incr(f"upstream.breaker.{self.family}.rejected")
+            raise Unavailable(f"{self.family} pages are failing, not trying again yet", self.open_until - now)
+        # Let this one probe, and keep failing the rest until it's done
+        self.open_until = now + settings.UPSTREAM_TIMEOUT
+
+    def succeeded(self) -> None:
+        """
+        Function to record a request that worked, closing the breaker
+
+        :return: Nothing
+        """
+        if self.open_until is not None:
+            logging.info(f"Closing the circuit for {self.family} pages")
+        self.failures = 0
+        self.open_until = None
+
+    def failed(self) -> None:
+        """
+        Function to record a request that failed, opening the breaker if it's failed often enough
+
+        :return: Nothing
+        """
+        self.failures += 1
+        if self.open_until is None and self.failures < settings.UPSTREAM_BREAKER_THRESHOLD:
+            return
+        if self.open_until is None:
+            logging.warning(f"Opening the circuit for {self.family} pages after {self.failures} failures")
+            metrics.incr(f"upstream.breaker.{self.family}.opened")
+        self.open_until = time.monotonic() + settings.UPSTREAM_BREAKER_COOLDOWN
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def family(url: str) -> str:
+    """
+    Function to get which family of pages a URL belongs to, going by the first part of its path
+
+    :param url: The URL
+    :return: The family, match pages are the ones whose path starts with an ID
+    """
+    segment = httpx.URL(url).path.strip("/").split("/")[0]
+    if segment.isdigit():
+        return "match"
+    return segment or "home"
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    """
+    Function to get the breaker for the family of pages a URL belongs to
+
+    :param url: The URL
+    :return: The breaker
+    """
+    name = family(url)
+    if (breaker := _breakers.get(name)) is None:
+        breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import random
+from typing import Any
+
+import httpx
+
+from app import metrics
+from app.core.config import settings
+
+from .breaker import get_breaker
+from .exceptions import Unavailable
+from .limits import limit
+
+_client: httpx.AsyncClient | None = None
+
+
+def create_client() -> httpx.AsyncClient:
+    """
+    Function to build the HTTP client used for talking to VLR
+
+    :return: A pooled, keep-alive enabled client
+    """
+    return httpx.AsyncClient(
+        http2=settings.UPSTREAM_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(settings.UPSTREAM_TIMEOUT, connect=settings.UPSTREAM_CONNECT_TIMEOUT),
+        headers={"Accept-Encoding": "br, gzip, deflate"},
+    )
+
+
+async def start() -> None:
+    """
+    Function to create the process-wide client, should be called once on startup
+
+    :return: Nothing
+    """
+    global _client
+    if _client is None:
+        _client = create_client()
+
+
+async def stop() -> None:
+    """
+    Function to close the process-wide client and its pooled connections
+
+    :return: Nothing
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Function to get the process-wide client, creating it if startup hasn't run (scripts, shells)
+
+    :return: The client
+    """
+    global _client
+    if _client is None:
+        logging.warning("Upstream client used before startup, creating it lazily")
+        _client = create_client()
+    return _client
+
+
+def retry_delay(attempt: int) -> float:
+    """
+    Function to pick how long to wait before retrying, with exponential backoff and full jitter
+
+    :param attempt: The number of the retry, starting from 1
+    :return: The delay in seconds
+    """
+    return random.uniform(0, min(settings.UPSTREAM_RETRY_MAX_DELAY, settings.UPSTREAM_RETRY_DELAY * 2 ** (attempt - 1)))
+
+
+async def get(url: str, **kwargs: Any) -> httpx.Response:
+    """
+    Function to make a GET request to VLR over the shared client, within the rate and concurrency limits
+
+    Timeouts, connection errors, 5xx and 429 responses are retried. If they keep happening for pages like this one, its
+    circuit breaker opens and requests for them fail straight away for a while.
+
+    :param url: The URL to fetch
+    :param kwargs: Any extra arguments for httpx
+    :return: The response
+    """
+    breaker = get_breaker(url)
+    breaker.check()
+    for attempt in range(settings.UPSTREAM_RETRIES + 1):
+        if attempt:
+            metrics.incr("upstream.retry")
+            await asyncio.sleep(retry_delay(attempt))
+
+        try:
+            async with limit(url):
+                response = await get_client().get(url, **kwargs)
+        except httpx.TransportError as e:
+            logging.warning(f"Failed to fetch {url} ({attempt + 1}/{settings.UPSTREAM_RETRIES + 1}): {e!r}")
+            continue
+        if response.status_code < 500 and response.status_code != 429:
+            breaker.succeeded()
+            return response
+        logging.warning(
+            f"VLR answered {response.status_code} for {url} ({attempt + 1}/{settings.UPSTREAM_RETRIES + 1})"
+        )
+
+    breaker.failed()
+    raise Unavailable(f"Couldn't fetch {url}")
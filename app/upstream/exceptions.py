@@ -0,0 +1,16 @@
+import logging
+
+
+class NotModified(Exception):
+    def __init__(self, message: str):
+        logging.info(f"Not modified: {message}")
+
+
+class Unavailable(Exception):
+    def __init__(self, message: str, retry_after: float | None = None):
+        self.retry_after = retry_after
+        logging.warning(f"Upstream unavailable: {message}")
+
+
+class RateLimited(Unavailable):
+    pass
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+from redis.exceptions import RedisError
+
+from app import cache, metrics
+from app.core.config import settings
+
+from .exceptions import RateLimited
+
+RATE_KEY = "ratelimit:{}"
+
+# Token bucket kept as the time the bucket will be full again (GCRA). Takes a token if one is free, otherwise reserves
+# the next one and returns how long to wait for it, in milliseconds. Returns -1 if that would take longer than allowed.
+TAKE_TOKEN_SCRIPT = """
+local now = redis.call("TIME")
+now = now[1] * 1000 + now[2] / 1000
+local interval = 1000 / tonumber(ARGV[1])
+local full_at = math.max(tonumber(redis.call("GET", KEYS[1]) or now), now) + interval
+local wait = full_at - now - interval * tonumber(ARGV[2])
+if wait > tonumber(ARGV[3]) then
+    return -1
+end
+redis.call("SET", KEYS[1], full_at, "PX", math.ceil(full_at - now))
+return math.max(math.ceil(wait), 0)
+"""
+
+_semaphores: dict[str, asyncio.Semaphore] = {}
+_in_flight = 0
+
+
+async def take_token(host: str) -> None:
+    """
+    Function to wait for a token from the host's bucket, which is shared by every worker
+
+    If redis can't be reached, requests go through without a token rather than failing.
+
+    :param host: The host that's about to be requested
+    :return: Nothing
+    """
+    started = time.monotonic()
+    try:
+        wait = await cache.get_client().eval(
+            TAKE_TOKEN_SCRIPT,
+            1,
+            RATE_KEY.format(host),
+            settings.UPSTREAM_RATE,
+            settings.UPSTREAM_BURST,
+            settings.UPSTREAM_MAX_RATE_WAIT * 1000,
+        )
+    except RedisError:
+        logging.warning(f"Couldn't take a token for {host}, going ahead without one", exc_info=True)
+        metrics.incr("upstream.rate.error")
+        return
+
+    if wait < 0:
+        metrics.incr("upstream.rate.rejected")
+        raise RateLimited(
+            f"{host} is over its rate for the next {settings.UPSTREAM_MAX_RATE_WAIT}s", settings.UPSTREAM_MAX_RATE_WAIT
+        )
+    if wait:
+        await asyncio.sleep(wait / 1000)
+    metrics.observe("upstream.rate.wait", time.monotonic() - started)
+
+
+@asynccontextmanager
+async def limit(url: str) -> AsyncIterator[None]:
+    """
+    Context manager that holds a request to a URL back until its host has a free slot and a token
+
+    :param url: The URL that's about to be requested
+    :return: Nothing
+    """
+    global _in_flight
+    host = httpx.URL(url).host
+    semaphore = _semaphores.setdefault(host, asyncio.Semaphore(settings.UPSTREAM_HOST_CONCURRENCY))
+
+    started = time.monotonic()
+    async with semaphore:
+        metrics.observe("upstream.concurrency.wait", time.monotonic() - started)
+        if settings.UPSTREAM_RATE > 0:
+            await take_token(host)
+
+        _in_flight += 1
+        try:
+            yield
+        finally:
+            _in_flight -= 1
+
+
+metrics.gauge("upstream.in_flight", lambda: _in_flight)
@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+from typing import NamedTuple
+
+from app import cache, metrics
+from app.core.config import settings
+
+from .client import get
+from .exceptions import NotModified
+
+PAGE_KEY = "upstream:{}"
+
+
+class Page(NamedTuple):
+    url: str
+    content: bytes
+    digest: str
+    changed: bool
+    # Whether VLR answered 304, in which case the body is the stored one
+    not_modified: bool
+    etag: str | None
+    last_modified: str | None
+
+
+async def get_page(url: str) -> Page:
+    """
+    Function to fetch a page with a conditional request, using the validators stored the last time it was parsed
+
+    A page counts as unchanged if VLR answers 304, or if the body hashes the same as last time.
+
+    :param url: The URL to fetch
+    :return: The page, and whether it changed since it was last remembered
+    """
+    key = PAGE_KEY.format(url)
+    client = cache.get_client()
+    etag, last_modified, digest = (
+        value.decode() if value is not None else None
+        for value in await client.hmget(key, ["etag", "last_modified", "digest"])
+    )
+
+    headers = {}
+    if etag is not None:
+        headers["If-None-Match"] = etag
+    if last_modified is not None:
+        headers["If-Modified-Since"] = last_modified
+
+    response = await get(url, headers=headers)
+    if response.status_code == 304:
+        if digest is not None and (content := await client.hget(key, "content")) is not None:
+            metrics.incr("upstream.page.not_modified")
+            return Page(url, content, digest, False, True, etag, last_modified)
+        # Nothing to fall back on, so get the page itself
+        response = await get(url)
+
+    new_digest = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+    if not (changed := new_digest != digest):
+        metrics.incr("upstream.page.unchanged")
+    return Page(
+        url,
+        response.content,
+        new_digest,
+        changed,
+        False,
+        response.headers.get("ETag"),
+        response.headers.get("Last-Modified"),
+    )
+
+
+async def get_pages(*urls: str, conditional: bool = False) -> list[Page]:
+    """
+    Function to fetch the pages something is built from
+
+    :param urls: The URLs to fetch
+    :param conditional: Whether to raise NotModified if none of the pages changed since they were last remembered
+    :return: The pages
+    """
+    pages = list(await asyncio.gather(*(get_page(url) for url in urls)))
+    if conditional and not any(page.changed for page in pages):
+        # Nothing to parse, but VLR may have sent new validators
+        await remember(*pages)
+        raise NotModified(", ".join(urls))
+    return pages
+
+
+async def remember(*pages: Page) -> None:
+    """
+    Function to store the validators and body hash of pages, so that later fetches can tell whether they changed
+
+    Should only be called once changed pages were parsed, so that a page that failed to parse isn't skipped next time.
+
+    :param pages: The pages
+    :return: Nothing
+    """
+    async with cache.get_client().pipeline(transaction=False) as pipe:
+        for page in pages:
+            key = PAGE_KEY.format(page.url)
+            mapping: dict[str | bytes, str | bytes] = {"digest": page.digest}
+            if page.etag is not None:
+                mapping["etag"] = page.etag
+            if page.last_modified is not None:
+                mapping["last_modified"] = page.last_modified
+            # The body is only needed to answer a 304, so there's no point keeping it for pages without validators
+            if not page.not_modified and len(mapping) > 1:
+                mapping["content"] = page.content
+
+            if page.changed:
+                pipe.delete(key)
+            else:
+                pipe.hdel(key, "etag", "last_modified")
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, settings.UPSTREAM_PAGE_TTL)
+        await pipe.execute()
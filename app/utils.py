@@ -1,3 +1,9 @@
+import json
+from typing import Any, Callable, Literal
+
+import pydantic
+import pydantic.json
+
 from app.constants import PREFIX, VLR_IMAGE
 
 
@@ -11,3 +17,97 @@ def get_image_url(img: str) -> str:
         return f"{PREFIX}{img}"
     else:
         return f"https:{img}"
+
+
+def has_class(*classes: str) -> Callable[[str | None], bool]:
+    """
+    Build a `class_` filter for a `SoupStrainer`, so that only the parts of a page that are parsed get built (the
+    header, sidebar, footer and scripts are skipped). While parsing, strainers get the raw `class` attribute, so a plain
+    string would only match elements with exactly that class. This matches like `find_all(class_=...)` does instead: a
+    single class matches any of the element's classes, several classes have to match all of them, in order.
+    :param classes: The class(es), an element matches if it matches any of them
+    :return: The filter
+    """
+
+    def matches(value: str | None) -> bool:
+        if value is None:
+            return False
+        names = value.split()
+        return any(" ".join(names) == class_ if " " in class_ else class_ in names for class_ in classes)
+
+    return matches
+
+
+def to_json(data: Any) -> str:
+    """
+    Serialize data exactly the way FastAPI would when returning it through a `response_model`
+    :param data: The data, may contain pydantic models
+    :return: The JSON string
+    """
+    return json.dumps(
+        data,
+        default=pydantic.json.pydantic_encoder,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    )
+
+
+def parse_fields(fields: str) -> dict[str, Any]:
+    """
+    Parse a `fields` parameter, a comma separated list of dotted paths like "teams,data.map,data.teams"
+    :param fields: The parameter
+    :return: Tree of the fields, mapping each name to True to keep all of it, or to the tree of what to keep inside it
+    """
+    tree: dict[str, Any] = {}
+    for field in fields.split(","):
+        if not (field := field.strip()):
+            continue
+        *parents, name = field.split(".")
+        node = tree
+        for parent in parents:
+            if (node := node.setdefault(parent, {})) is True:
+                break
+        else:
+            node[name] = True
+    return tree
+
+
+def check_fields(model: type[pydantic.BaseModel], fields: dict[str, Any]) -> None:
+    """
+    Check that a tree of fields (see `parse_fields`) only has fields of a model, raises ValueError with the first one
+    that isn't
+    :param model: The model
+    :param fields: The tree of fields
+    :return: Nothing
+    """
+    for name, inner in fields.items():
+        if (field := model.__fields__.get(name)) is None:
+            raise ValueError(name)
+        if inner is True:
+            continue
+        if not (isinstance(field.type_, type) and issubclass(field.type_, pydantic.BaseModel)):
+            raise ValueError(f"{name}.{next(iter(inner))}")
+        try:
+            check_fields(field.type_, inner)
+        except ValueError as e:
+            raise ValueError(f"{name}.{e}")
+
+
+def prune(data: Any, fields: dict[str, Any] | Literal[True]) -> Any:
+    """
+    Keep only some of the fields of data, going into lists
+    :param data: The data, may be a pydantic model
+    :param fields: The tree of fields to keep (see `parse_fields`), True to keep everything
+    :return: The pruned data
+    """
+    if fields is True:
+        return data
+    if isinstance(data, pydantic.BaseModel):
+        data = data.dict()
+    if isinstance(data, list):
+        return [prune(item, fields) for item in data]
+    if isinstance(data, dict):
+        return {name: prune(value, fields[name]) for name, value in data.items() if name in fields}
+    return data
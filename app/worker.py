@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import signal
+import uuid
+
+import sentry_sdk
+from redis.exceptions import RedisError
+
+from app import cache, metrics, parsing, store, upstream
+from app.core.config import settings
+from app.core.logs import setup_logging
+from app.cron import arq_worker
+from app.scheduler import scheduler
+
+# Held by the one process in the deployment that runs the crons
+LEADER_KEY = "cron:leader"
+
+setup_logging()
+
+if settings.SENTRY_DSN:
+    sentry_sdk.init(dsn=settings.SENTRY_DSN, traces_sample_rate=1.0)
+
+
+async def elect(token: str) -> bool:
+    """
+    Function to try and become the cron leader
+
+    :param token: This process' token
+    :return: Whether this process is the leader now
+    """
+    try:
+        return bool(await cache.get_client().set(LEADER_KEY, token, px=int(settings.CRON_LEADER_LEASE * 1000), nx=True))
+    except RedisError:
+        logging.warning("Failed to run the cron leader election", exc_info=True)
+        return False
+
+
+async def renew(token: str) -> bool:
+    """
+    Function to extend the leader lease, if this process still holds it
+
+    :param token: This process' token
+    :return: Whether this process is still the leader
+    """
+    try:
+        return bool(
+            await cache.get_client().eval(
+                cache.EXTEND_LOCK_SCRIPT, 1, LEADER_KEY, token, int(settings.CRON_LEADER_LEASE * 1000)
+            )
+        )
+    except RedisError:
+        # Another process takes over once the lease runs out, so this one can't keep going without it
+        logging.warning("Failed to renew the cron leader lease", exc_info=True)
+        return False
+
+
+async def lead(token: str) -> None:
+    """
+    Function to run the crons for as long as this process is the leader
+
+    :param token: This process' token
+    :return: Nothing
+    """
+    logging.info("Became the cron leader, starting the scheduler and arq worker")
+    metrics.incr("cron.leader.elected")
+    await scheduler.start()
+    await arq_worker.start(handle_signals=False)
+    try:
+        while True:
+            await asyncio.sleep(settings.CRON_LEADER_RENEW_INTERVAL)
+            if not await renew(token):
+                logging.warning("Lost the cron leader lease, stopping the scheduler and arq worker")
+                metrics.incr("cron.leader.lost")
+                return
+    finally:
+        await arq_worker.stop()
+        await scheduler.stop()
+        try:
+            await cache.get_client().eval(cache.RELEASE_LOCK_SCRIPT, 1, LEADER_KEY, token)
+        except RedisError:
+            logging.warning("Failed to release the cron leader lease", exc_info=True)
+
+
+async def run() -> None:
+    """
+    Function to run the cron worker, which stands by until it's elected leader and takes over if the leader dies
+
+    :return: Nothing
+    """
+    token = uuid.uuid4().hex
+    while True:
+        if await elect(token):
+            await lead(token)
+        await asyncio.sleep(settings.CRON_LEADER_RETRY_INTERVAL)
+
+
+async def main() -> None:
+    """
+    Function to start everything the crons need, and run them until the process is told to stop
+
+    :return: Nothing
+    """
+    logging.info("Starting redis connection pool")
+    await cache.start()
+    logging.info("Starting upstream HTTP client")
+    await upstream.start()
+    await parsing.start()
+    logging.info("Opening results database")
+    await store.start()
+
+    task = asyncio.create_task(run())
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, task.cancel)
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    finally:
+        logging.info("Stopping parse executor")
+        await parsing.stop()
+        logging.info("Stopping upstream HTTP client")
+        await upstream.stop()
+        logging.info("Stopping redis connection pool")
+        await cache.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,30 @@
 #!/usr/bin/env bash
 
 cd /app || exit
-gunicorn -k uvicorn.workers.UvicornWorker --workers=$(( $(nproc) * 2 + 1 )) --bind=0.0.0.0 app.main:app
 
+# Crons run in their own process, which only runs them while it's the leader of the deployment, restarted if it dies.
+# Signals have to be passed on to it by hand, so that it gives up the leader lease when stopped instead of holding it
+# until it runs out.
+(
+    trap 'kill -TERM "$worker" 2>/dev/null; wait "$worker"; exit' TERM
+    while true; do
+        python -m app.worker &
+        worker=$!
+        wait "$worker"
+        sleep 5 &
+        wait $!
+    done
+) &
+crons=$!
+
+gunicorn -k uvicorn.workers.UvicornWorker --workers=$(( $(nproc) * 2 + 1 )) --bind=0.0.0.0 app.main:app &
+server=$!
+
+stop() {
+    kill -TERM "$server" "$crons" 2>/dev/null
+}
+trap stop TERM INT
+# Returns when either a signal comes in or gunicorn exits, and both should stop the whole thing
+wait "$server"
+stop
+wait
@@ -0,0 +1,5 @@
+#!/usr/bin/env bash
+
+set -ex
+
+python -m unittest discover -s tests -t .
@@ -0,0 +1,5 @@
+import os
+
+# The settings need these, nothing in the tests talks to redis
+os.environ.setdefault("REDIS_HOST", "localhost")
+os.environ.setdefault("REDIS_PASSWORD", "")
@@ -0,0 +1,84 @@
+import gzip
+import unittest
+
+import brotli
+import httpx
+from fastapi import FastAPI, Response
+
+from app.api.compression import BrotliMiddleware
+from app.api.responses import pick_encoding
+
+PAYLOAD = b'[{"id":"1","title":"' + b"x" * 4096 + b'"}]'
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(BrotliMiddleware, minimum_size=1024)
+
+    @app.get("/br")
+    async def precompressed_br() -> Response:
+        return Response(brotli.compress(PAYLOAD), media_type="application/json", headers={"Content-Encoding": "br"})
+
+    @app.get("/gzip")
+    async def precompressed_gzip() -> Response:
+        return Response(gzip.compress(PAYLOAD), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/plain")
+    async def plain() -> Response:
+        return Response(PAYLOAD, media_type="application/json")
+
+    return app
+
+
+class CompressionTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.client = httpx.AsyncClient(app=create_app(), base_url="http://test")
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def get_raw(self, path: str, accept_encoding: str) -> tuple[str | None, bytes]:
+        """
+        Function to make a request, without decoding the response body
+
+        :param path: The path to request
+        :param accept_encoding: The Accept-Encoding header to send
+        :return: The Content-Encoding header and the body as sent
+        """
+        async with self.client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+            return response.headers.get("content-encoding"), b"".join([chunk async for chunk in response.aiter_raw()])
+
+    async def test_precompressed_br_is_decoded_once(self) -> None:
+        encoding, body = await self.get_raw("/br", "br")
+        self.assertEqual(encoding, "br")
+        self.assertEqual(brotli.decompress(body), PAYLOAD)
+
+    async def test_precompressed_gzip_is_decoded_once(self) -> None:
+        encoding, body = await self.get_raw("/gzip", "gzip")
+        self.assertEqual(encoding, "gzip")
+        self.assertEqual(gzip.decompress(body), PAYLOAD)
+
+    async def test_plain_responses_are_still_compressed(self) -> None:
+        encoding, body = await self.get_raw("/plain", "br")
+        self.assertEqual(encoding, "br")
+        self.assertEqual(brotli.decompress(body), PAYLOAD)
+        encoding, body = await self.get_raw("/plain", "gzip")
+        self.assertEqual(encoding, "gzip")
+        self.assertEqual(gzip.decompress(body), PAYLOAD)
+
+
+class PickEncodingTest(unittest.TestCase):
+    def test_preference(self) -> None:
+        self.assertEqual(pick_encoding("gzip, deflate, br"), "br")
+        self.assertEqual(pick_encoding("gzip"), "gzip")
+        self.assertIsNone(pick_encoding("identity"))
+        self.assertIsNone(pick_encoding(""))
+
+    def test_zero_quality_is_rejected(self) -> None:
+        self.assertEqual(pick_encoding("br;q=0, gzip"), "gzip")
+        self.assertIsNone(pick_encoding("br;q=0, gzip;q=0"))
+
+    def test_wildcard_does_not_bring_back_rejected(self) -> None:
+        self.assertEqual(pick_encoding("br;q=0, *"), "gzip")
+        self.assertEqual(pick_encoding("*"), "br")
+        self.assertIsNone(pick_encoding("br;q=0, gzip;q=0, *"))
@@ -0,0 +1,81 @@
+import unittest
+from pathlib import Path
+from typing import Any, Callable
+from unittest import mock
+
+from app import metrics, parsing, utils
+from app.core.config import settings
+from app.services import events, matches, news, player, rankings, team
+
+# Trimmed down pages with the markup the parsers read from VLR
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def page(name: str) -> bytes:
+    return (FIXTURES / f"{name}.html").read_bytes()
+
+
+# Each BeautifulSoup parser, with the pages to check its lxml version against
+CASES: list[tuple[Callable[..., Any], tuple]] = [
+    (matches.parse_matches_page, (page("matches"),)),
+    (matches.parse_match_page, (page("match"),)),
+    (matches.parse_match_page, (page("match"), frozenset({"rounds", "members", "previous_encounters"}))),
+    (matches.parse_match_page, (page("match_upcoming"),)),
+    (events.parse_events_page, (page("events"),)),
+    (events.parse_event_page, (page("event"), "1188")),
+    (events.parse_event_page, (page("event_ongoing"), "1189")),
+    (events.parse_event_page, (page("event_upcoming"), "1190")),
+    (events.parse_event_matches_page, (page("event_matches"),)),
+    (news.parse_news_page, (page("news"),)),
+    (rankings.parse_regions_page, (page("rankings"),)),
+    (rankings.parse_rankings_page, (page("rank_region"), "/rankings/europe")),
+    (team.parse_team_pages, (page("team"), page("team_upcoming"), page("team_completed"))),
+    (team.parse_team_pages, (page("team"), None, None)),
+    (player.parse_player_page, (page("player"),)),
+]
+
+
+class LxmlParsersTest(unittest.TestCase):
+    def test_same_output_as_beautifulsoup(self) -> None:
+        for case, (func, args) in enumerate(CASES):
+            with self.subTest(case=case, parser=f"{func.__module__}.{func.__name__}"):
+                expected = func(*args)
+                self.assertTrue(expected, "The page should have something to parse")
+                self.assertEqual(utils.to_json(parsing.lxml_parser(func)(*args)), utils.to_json(expected))
+
+    def test_compare(self) -> None:
+        result, same = parsing.compare(news.parse_news_page, parsing.lxml_parser(news.parse_news_page), page("news"))
+        self.assertTrue(same)
+        self.assertEqual(result, news.parse_news_page(page("news")))
+
+
+class StrainersTest(unittest.TestCase):
+    def test_same_output_as_full_page(self) -> None:
+        cases = [
+            (matches, "MATCHES_PAGE", matches.parse_matches_page, (page("matches"),)),
+            (events, "EVENTS_PAGE", events.parse_events_page, (page("events"),)),
+            (news, "NEWS_PAGE", news.parse_news_page, (page("news"),)),
+            (rankings, "REGIONS_PAGE", rankings.parse_regions_page, (page("rankings"),)),
+            (rankings, "RANKINGS_PAGE", rankings.parse_rankings_page, (page("rank_region"), "/rankings/europe")),
+        ]
+        for module, strainer, func, args in cases:
+            with self.subTest(strainer=strainer):
+                strained = func(*args)
+                self.assertTrue(strained, "The page should have something to parse")
+                # Without a strainer, the whole page is built
+                with mock.patch.object(module, strainer, None):
+                    self.assertEqual(utils.to_json(func(*args)), utils.to_json(strained))
+
+
+class RunTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self) -> None:
+        await parsing.stop()
+
+    async def test_compare_is_timed_per_parser(self) -> None:
+        with (
+            mock.patch.object(settings, "PARSE_EXECUTOR", "thread"),
+            mock.patch.object(settings, "PARSER_BACKEND", "compare"),
+            mock.patch.object(metrics, "observe") as observe,
+        ):
+            await parsing.run(news.parse_news_page, page("news"))
+        self.assertIn(mock.call("parse.news.parse_news_page.compare", mock.ANY), observe.call_args_list)
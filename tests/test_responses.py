@@ -0,0 +1,74 @@
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from unittest import mock
+
+from fastapi import HTTPException, Request
+
+from app import cache, schemas
+from app.api import responses
+
+TEAM = {
+    "name": "Team",
+    "tag": "TM",
+    "img": "https://owcdn.net/img/team.png",
+    "website": None,
+    "twitter": None,
+    "country": "Europe",
+    # Scraped as text, the response model makes it a number
+    "rank": "12",
+    "region": "Europe",
+    "roster": [],
+    "upcoming": [],
+    "completed": [],
+}
+
+
+async def load(skip: frozenset[str]) -> Any:
+    raise AssertionError("Should be served from the cache")
+
+
+class EntityTest(unittest.IsolatedAsyncioTestCase):
+    async def test_fields_are_validated_before_pruning(self) -> None:
+        with mock.patch.object(cache, "read_through", mock.AsyncMock(return_value=TEAM)):
+            response = await responses.entity(
+                "team", "1", schemas.Team, load, cache.team_ttl, "name,rank", lambda fields: frozenset()
+            )
+        self.assertEqual(json.loads(response.body), {"name": "Team", "rank": 12})
+
+    async def test_partial_entity_is_cached_separately(self) -> None:
+        with (
+            mock.patch.object(cache, "get_entity", mock.AsyncMock(side_effect=cache.CacheMiss("Not cached"))),
+            mock.patch.object(cache, "read_through", mock.AsyncMock(return_value=TEAM)) as read_through,
+        ):
+            await responses.entity(
+                "team", "1", schemas.Team, load, cache.team_ttl, "name", lambda fields: frozenset({"upcoming"})
+            )
+        self.assertEqual(read_through.call_args.args[:2], ("team", "1:upcoming"))
+
+    async def test_ids_with_separator_are_rejected(self) -> None:
+        with self.assertRaises(HTTPException) as raised:
+            await responses.entity("team", "1:upcoming", schemas.Team, load, cache.team_ttl)
+        self.assertEqual(raised.exception.status_code, 422)
+
+
+def request(query_string: bytes) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": query_string})
+
+
+class ListPageTest(unittest.TestCase):
+    def test_filtering(self) -> None:
+        self.assertFalse(responses.filtering(request(b""), "status", "cursor"))
+        self.assertFalse(responses.filtering(request(b"v=2"), "status", "cursor"))
+        self.assertTrue(responses.filtering(request(b"v=2&status=live"), "status", "cursor"))
+        self.assertTrue(responses.filtering(request(b"cursor="), "status", "cursor"))
+
+    def test_timestamp(self) -> None:
+        self.assertIsNone(responses.timestamp(None))
+        self.assertEqual(responses.timestamp(datetime(2022, 10, 17, 12)), 1666008000.0)
+        self.assertEqual(responses.timestamp(datetime(2022, 10, 17, 12, tzinfo=timezone.utc)), 1666008000.0)
+        self.assertEqual(
+            responses.timestamp(datetime(2022, 10, 17, 17, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))),
+            1666008000.0,
+        )
@@ -0,0 +1,78 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+
+from app import schemas, store
+from app.core.config import settings
+from app.services import results
+
+PAGE_SIZE = 5
+START = datetime(2022, 10, 1, tzinfo=timezone.utc)
+
+
+def result(number: int) -> schemas.Match:
+    return schemas.Match(
+        id=str(number),
+        team1={"name": "A"},
+        team2={"name": "B"},
+        status="completed",
+        time=START + timedelta(hours=number),
+        event="Event",
+        series="Series",
+    )
+
+
+class CrawlResultsTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for name, value in (
+            ("RESULTS_DB_PATH", str(Path(directory.name) / "results.sqlite3")),
+            ("RESULTS_CRAWL_MAX_PAGES", 2),
+            ("RESULTS_CRAWL_CONCURRENCY", 1),
+        ):
+            patcher = mock.patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        await store.start()
+        # VLR's results, newest first
+        self.upstream: list[schemas.Match] = []
+        patcher = mock.patch.object(results, "get_results_page", self.get_results_page)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def get_results_page(self, page: int) -> list[schemas.Match]:
+        start = (page - 1) * PAGE_SIZE
+        return self.upstream[start:][:PAGE_SIZE]
+
+    def publish(self, numbers: range) -> None:
+        self.upstream = [result(number) for number in reversed(numbers)] + self.upstream
+
+    async def stored(self) -> set[str]:
+        return await store.known_results([match.id for match in self.upstream])
+
+    async def test_gaps_opening_during_a_catch_up_are_all_filled(self) -> None:
+        self.publish(range(0, 10))
+        await results.crawl_results()
+        await results.crawl_results()
+        self.assertEqual(await self.stored(), {str(number) for number in range(10)})
+
+        # More results than one run walks come in, twice before the first gap is filled
+        self.publish(range(10, 40))
+        await results.crawl_results()
+        self.publish(range(40, 70))
+        await results.crawl_results()
+        for _ in range(10):
+            await results.crawl_results()
+        self.assertEqual(await self.stored(), {match.id for match in self.upstream})
+        self.assertIsNone(await store.get_state("catch_up_page"))
+        self.assertIsNone(await store.get_state("catch_up_until"))
+
+    async def test_catch_up_without_until_is_dropped(self) -> None:
+        self.publish(range(0, 5))
+        await results.crawl_results()
+        await store.set_state("catch_up_page", "3")
+        await results.crawl_results()
+        self.assertIsNone(await store.get_state("catch_up_page"))
@@ -0,0 +1,41 @@
+import unittest
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from app import utils
+
+PAGE = b"""<html><body>
+<div class="wf-card">plain</div>
+<div class="wf-card mod-dark">dark</div>
+<div class="wf-label mod-large">label</div>
+<div class="rank-item wf-card fc-flex">rank</div>
+<div class="wf-card-body">body</div>
+<div>none</div>
+</body></html>"""
+
+
+class HasClassTest(unittest.TestCase):
+    def test_values(self) -> None:
+        matches = utils.has_class("wf-card")
+        self.assertTrue(matches("wf-card"))
+        self.assertTrue(matches("wf-card mod-dark"))
+        self.assertTrue(matches("  mod-dark\twf-card "))
+        self.assertFalse(matches("wf-card-body"))
+        self.assertFalse(matches(""))
+        self.assertFalse(matches(None))
+
+    def test_several_classes(self) -> None:
+        matches = utils.has_class("wf-label", "rank-item wf-card fc-flex")
+        self.assertTrue(matches("wf-label mod-large"))
+        self.assertTrue(matches("rank-item  wf-card fc-flex"))
+        self.assertFalse(matches("wf-card fc-flex rank-item"))
+        self.assertFalse(matches("rank-item wf-card"))
+
+    def test_strains_like_find_all(self) -> None:
+        for classes in ("wf-card", "wf-label", "rank-item wf-card fc-flex", "wf-card mod-dark"):
+            with self.subTest(classes=classes):
+                strained = BeautifulSoup(PAGE, "lxml", parse_only=SoupStrainer("div", class_=utils.has_class(classes)))
+                found = BeautifulSoup(PAGE, "lxml").find_all("div", class_=classes)
+                self.assertEqual(
+                    [div.get_text() for div in strained.find_all("div")], [div.get_text() for div in found]
+                )